@@ -187,7 +187,46 @@ async def run_fetch_only_benchmark(
     return results
 
 
+async def run_mixed_benchmark(db_thread=False, slow_requests=20, fast_requests=200) -> None:
+    """Measure /healthz tail latency while slow renders run concurrently."""
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "slow.pageql").write_text("{%reactive off%}{{slow(50)}}")
+        app = PageQLApp(":memory:", tmp, create_db=True, should_reload=False, quiet=True, db_thread=db_thread)
+        app.conn.create_function("slow", 1, lambda ms: time.sleep(ms / 1000))
+        config = Config(app, host="127.0.0.1", port=0, log_level="warning")
+        server = Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        async def timed(path):
+            start = time.perf_counter()
+            await _http_get(f"http://127.0.0.1:{port}{path}")
+            return (time.perf_counter() - start) * 1000
+
+        async def fast():
+            latencies = []
+            for _ in range(fast_requests):
+                latencies.append(await timed("/healthz"))
+                await asyncio.sleep(0.005)
+            return latencies
+
+        slow_tasks = [asyncio.create_task(timed("/slow")) for _ in range(slow_requests)]
+        latencies = sorted(await fast())
+        await asyncio.gather(*slow_tasks)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"db_thread={db_thread}: /healthz p50 {p50:.2f}ms p99 {p99:.2f}ms max {latencies[-1]:.2f}ms")
+
+        server.should_exit = True
+        await server_task
+
+
 if __name__ == "__main__":
+    asyncio.run(run_mixed_benchmark(db_thread=False))
+    asyncio.run(run_mixed_benchmark(db_thread=True))
     asyncio.run(run_fetch_only_benchmark(http_disconnect_cleanup_timeout=0.05, parallel=False, iterations=10000))
     asyncio.run(run_fetch_only_benchmark(http_disconnect_cleanup_timeout=10, parallel=False, iterations=10000))
     asyncio.run(run_benchmark())
@@ -2,6 +2,7 @@ import os
 import time
 import tempfile
 import asyncio
+import threading
 from pageql.pageql import PageQL
 
 ITERATIONS = 100
@@ -31,6 +32,27 @@ async def _stop_server(server: asyncio.base_events.Server) -> None:
     server.close()
     await server.wait_closed()
 
+def _start_server_thread():
+    """Run the fetch server on its own loop so blocking ``#fetch`` can reach it."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        holder["server"], holder["port"] = loop.run_until_complete(_start_server())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return loop, holder["server"], holder["port"]
+
+
+def _stop_server_thread(loop, server):
+    asyncio.run_coroutine_threadsafe(_stop_server(server), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
 # helper to reset sample table
 
 def reset_items(db):
@@ -56,6 +78,8 @@ MODULES = {
     's12_update': "{%update items set name='upd' where id=1%}{%update items set name='upd0' where id=1%}",
     's13_fetch': "{%fetch d from 'http://127.0.0.1:'||:port%}{{d__body}}",
     's21_slow_fetch': "{%fetch d from 'http://127.0.0.1:'||:port%}{{d__body}}",
+    's22_slow_fetch_x3': "{%fetch a from 'http://127.0.0.1:'||:port%}{%fetch b from 'http://127.0.0.1:'||:port%}"
+                         "{%fetch c from 'http://127.0.0.1:'||:port%}{{a__body}}{{b__body}}{{c__body}}",
     's14_render_partial': "{%partial public greet%}hi {{who}}{%endpartial%}{%render greet who='Bob'%}",
     's15_param': "{%partial public greet%}{%param who required%}{{who}}{%endpartial%}{%render greet who='Ann'%}",
     's16_create': "{%create table if not exists t (id int)%}done",
@@ -78,41 +102,53 @@ PARAMS = {
 def bench_factory(name):
     def bench(pql):
         params = PARAMS.get(name, {}).copy()
-        if name in ('s13_fetch', 's21_slow_fetch'):
+        if name in FETCH_SCENARIOS:
             params['port'] = FETCH_PORT
         return pql.render('/' + name, params)
     return bench
 
+FETCH_SCENARIOS = ('s13_fetch', 's21_slow_fetch', 's22_slow_fetch_x3')
+
 SCENARIOS = [
     (n, bench_factory(n))
     for n in MODULES
-    if n not in ('other', 's13_fetch', 's21_slow_fetch')
+    if n not in ('other',) + FETCH_SCENARIOS
 ]
+# fetch scenarios talk to the local server started by run_benchmarks
+FETCH_BENCHMARKS = [(n, bench_factory(n)) for n in FETCH_SCENARIOS]
 
 
 async def run_benchmarks(db_path):
     global FETCH_PORT, SLOW_FETCH
-    server, port = await _start_server()
+    server_loop, server, port = _start_server_thread()
     FETCH_PORT = port
     print(f"Running benchmarks for {db_path} ...")
     pql = PageQL(db_path)
     results = {}
-    for name, _ in SCENARIOS:
+    for name, _ in SCENARIOS + FETCH_BENCHMARKS:
         reset_items(pql.db)
         for m, src in MODULES.items():
             if m != 'other' and m != name:
                 continue
             pql.load_module(m, src)
         bench = bench_factory(name)
-        SLOW_FETCH = name == 's21_slow_fetch'
-        start = time.perf_counter()
-        for _ in range(ITERATIONS):
+        SLOW_FETCH = name in ('s21_slow_fetch', 's22_slow_fetch_x3')
+        times = []
+        # compare compiled templates with the process_node interpreter
+        for compiled in (True, False):
+            pql.compiled = compiled
             bench(pql)
-        results[name] = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(ITERATIONS):
+                bench(pql)
+            times.append(time.perf_counter() - start)
+        pql.compiled = True
+        results[name] = times
     pql.db.close()
-    await _stop_server(server)
-    for k, v in results.items():
-        print(f"{k:20s}: {(v/ITERATIONS)*1000:.4f}ms")
+    _stop_server_thread(server_loop, server)
+    print(f"{'':20s}  {'compiled':>10s}  {'interpreted':>11s}")
+    for k, (c, i) in results.items():
+        print(f"{k:20s}: {(c/ITERATIONS)*1000:8.4f}ms  {(i/ITERATIONS)*1000:9.4f}ms")
 
 
 async def _run_scenario_parallel(name: str, db_path: str) -> float:
@@ -149,7 +185,7 @@ async def run_benchmarks_parallel(db_path: str) -> None:
     print(f"Running parallel benchmarks for {db_path} ...")
     results = {}
     for name, _ in SCENARIOS:
-        SLOW_FETCH = name == 's21_slow_fetch'
+        SLOW_FETCH = name in ('s21_slow_fetch', 's22_slow_fetch_x3')
         elapsed = await _run_scenario_parallel(name, db_path)
         results[name] = elapsed
     await _stop_server(server)
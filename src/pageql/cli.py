@@ -62,6 +62,13 @@ def run_pageql_parse(templates_dir: str) -> bool:
             with open(file_path, "r", encoding="utf-8") as f:
                 engine.load_module(module_name, f.read())
 
+    for module, stats in sorted(engine.fold_stats.items()):
+        if stats:
+            print(
+                f"{module}: folded {stats.get('expressions', 0)} expressions, "
+                f"{stats.get('ifs', 0)} #if conditions, merged {stats.get('merged', 0)} text nodes, "
+                f"{stats.get('static_partials', 0)} static partials"
+            )
     return not engine._parse_errors
 
 def main():
@@ -93,6 +100,76 @@ def main():
         metavar='SECONDS',
         help='Delay before cleaning up HTTP disconnects.',
     )
+    parser.add_argument(
+        '--read-pool-size',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Render non-reactive read-only GET pages on N threads with their own connections.',
+    )
+    parser.add_argument(
+        '--read-pool-queue',
+        type=int,
+        default=64,
+        metavar='N',
+        help='Maximum renders waiting for the read pool before using the main connection.',
+    )
+    parser.add_argument(
+        '--group-commit-window',
+        type=float,
+        default=0,
+        metavar='MS',
+        help='Share one commit between write requests arriving within MS milliseconds.',
+    )
+    parser.add_argument(
+        '--group-commit-batch',
+        type=int,
+        default=32,
+        metavar='N',
+        help='Commit early once N write requests are waiting.',
+    )
+    for name, help_text in (
+        ('mmap-size', 'SQLite mmap_size in bytes'),
+        ('cache-size', 'SQLite cache_size (pages, or KiB when negative)'),
+        ('busy-timeout', 'SQLite busy_timeout in milliseconds'),
+        ('wal-autocheckpoint', 'SQLite wal_autocheckpoint in pages'),
+        ('cached-statements', 'Size of the prepared statement cache per connection'),
+    ):
+        parser.add_argument(f'--{name}', type=int, metavar='N', help=help_text)
+    parser.add_argument('--temp-store', choices=['DEFAULT', 'FILE', 'MEMORY'], help='SQLite temp_store')
+    parser.add_argument(
+        '--checkpoint-interval',
+        type=float,
+        default=0,
+        metavar='SECONDS',
+        help='Run passive WAL checkpoints in the background while idle instead of inline.',
+    )
+    parser.add_argument(
+        '--stream-threshold',
+        type=int,
+        default=0,
+        metavar='CHARS',
+        help='Stream read-pool pages at #from rows once this many characters are buffered.',
+    )
+    parser.add_argument(
+        '--db-thread',
+        action='store_true',
+        help='Render on a dedicated database thread instead of the event loop.',
+    )
+    parser.add_argument(
+        '--http-cache',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Cache up to N GET responses from #fetch and --fallback-url upstreams.',
+    )
+    parser.add_argument(
+        '--page-cache',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Cache up to N rendered read-only GET pages until the tables they read change.',
+    )
     parser.add_argument('--log-level', default='info', help="Log level")
     parser.add_argument(
         '--debug',
@@ -133,6 +210,31 @@ def main():
         "http_disconnect_cleanup_timeout": args.http_disconnect_cleanup_timeout,
         "static_html": args.static_html,
     }
+    if args.read_pool_size:
+        kwargs["read_pool_size"] = args.read_pool_size
+        kwargs["read_pool_queue"] = args.read_pool_queue
+    profile = {
+        k: getattr(args, k)
+        for k in ('mmap_size', 'cache_size', 'busy_timeout', 'wal_autocheckpoint', 'temp_store')
+        if getattr(args, k) is not None
+    }
+    if profile:
+        kwargs["sqlite_profile"] = profile
+    if args.cached_statements:
+        kwargs["cached_statements"] = args.cached_statements
+    if args.checkpoint_interval:
+        kwargs["checkpoint_interval"] = args.checkpoint_interval
+    if args.db_thread:
+        kwargs["db_thread"] = True
+    if args.http_cache:
+        kwargs["http_cache_size"] = args.http_cache
+    if args.page_cache:
+        kwargs["page_cache_size"] = args.page_cache
+    if args.stream_threshold:
+        kwargs["stream_threshold"] = args.stream_threshold
+    if args.group_commit_window:
+        kwargs["group_commit_window"] = args.group_commit_window / 1000
+        kwargs["group_commit_batch"] = args.group_commit_batch
     app = PageQLApp(args.db_file, args.templates_dir, **kwargs)
     app.log_level = args.log_level
 
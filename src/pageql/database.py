@@ -1,7 +1,13 @@
 # Database utilities extracted from pageql.py
 
+import asyncio
+import functools
 import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 from pageql.reactive import (
@@ -10,21 +16,59 @@ from pageql.reactive import (
     DerivedSignal2,
     derive_signal2,
     OneValue,
-    get_dependencies,
     Tables,
     ReadOnly,
-    _convert_dot_sql,
+    set_statement_cache_size,
+    StatsConnection,
 )
 from pageql.reactive_sql import parse_reactive
-import sqlglot
+from pageql.pyexpr import ExprPlan, Unsupported, plan_expr
 
 
 # cache for DerivedSignal2 instances used by evalone
 _DV_CACHE: dict[tuple[int, str, tuple], DerivedSignal2] = {}
 
 
-def connect_database(db_path: str):
-    """Return ``(connection, dialect)`` for the given path or URL."""
+# PRAGMAs applied to SQLite connections on every startup
+SQLITE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": 10000,
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "wal_autocheckpoint": 1000,
+}
+
+
+def apply_sqlite_profile(conn, profile=None, skip=()):
+    """Apply ``SQLITE_PROFILE`` updated with *profile* to *conn*.
+
+    Returns the applied settings. Keys in *skip* are left untouched.
+
+    >>> c = sqlite3.connect(":memory:")
+    >>> apply_sqlite_profile(c, {"busy_timeout": 100})["busy_timeout"]
+    100
+    >>> c.execute("PRAGMA busy_timeout").fetchone()[0]
+    100
+    """
+    settings = {**SQLITE_PROFILE, **(profile or {})}
+    for k, v in settings.items():
+        if k not in skip and v is not None:
+            conn.execute(f"PRAGMA {k}={v}")
+    return settings
+
+
+# sqlite3 defaults to 128 cached statements which reactive pages easily exceed
+DEFAULT_CACHED_STATEMENTS = 512
+
+
+def connect_database(db_path: str, cached_statements: int = DEFAULT_CACHED_STATEMENTS):
+    """Return ``(connection, dialect)`` for the given path or URL.
+
+    *cached_statements* sets the prepared statement cache size of SQLite
+    connections.
+    """
     if db_path.startswith("postgres://") or db_path.startswith("postgresql://"):
         try:
             import psycopg
@@ -70,7 +114,11 @@ def connect_database(db_path: str):
                 )
     if db_path.startswith("sqlite://"):
         db_path = db_path.split("://", 1)[1]
-    conn = sqlite3.connect(db_path)
+    # PageQLApp may hand the connection to its DB thread after setup
+    conn = sqlite3.connect(
+        db_path, cached_statements=cached_statements, check_same_thread=False, factory=StatsConnection
+    )
+    set_statement_cache_size(conn, cached_statements)
     try:
         conn.execute("PRAGMA foreign_keys=ON")
     except sqlite3.Error:
@@ -78,6 +126,311 @@ def connect_database(db_path: str):
     return conn, "sqlite"
 
 
+class ReadPool:
+    """Thread pool where each worker owns state built by *factory*.
+
+    Used to run non-reactive renders on per-thread read-only connections.
+    ``submit`` returns ``None`` when ``size + max_queue`` jobs are already
+    pending so the caller can fall back to the owner connection.
+    """
+
+    def __init__(self, factory, size=4, max_queue=64):
+        self.factory = factory
+        self.size = size
+        self.max_queue = max_queue
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(size, thread_name_prefix="pageql-read")
+
+    def _run(self, fn, args):
+        try:
+            state = getattr(self._local, "state", None)
+            if state is None:
+                state = self._local.state = self.factory()
+            return fn(state, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def submit(self, fn, *args):
+        """Run ``fn(state, *args)`` on a worker and return an awaitable."""
+        with self._lock:
+            if self.pending >= self.size + self.max_queue:
+                self.rejected += 1
+                return None
+            self.pending += 1
+        return asyncio.wrap_future(self._executor.submit(self._run, fn, args))
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class DbThread:
+    """Single worker thread owning the main database connection.
+
+    Renders and other connection work are submitted here so slow queries or
+    a synchronous ``#fetch`` don't block the event loop.
+    """
+
+    def __init__(self):
+        self.pending = 0
+        self.completed = 0
+        self.max_wait_ms = 0.0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="pageql-db")
+
+    def _run(self, queued, fn, args):
+        wait_ms = (time.perf_counter() - queued) * 1000
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def submit(self, fn, *args):
+        """Run ``fn(*args)`` on the DB thread and return an awaitable."""
+        with self._lock:
+            self.pending += 1
+        return asyncio.wrap_future(self.executor.submit(self._run, time.perf_counter(), fn, args))
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class GroupCommit:
+    """Share one ``COMMIT`` between writes made within *window* seconds.
+
+    Callers await :meth:`wait` after writing; the transaction is committed
+    when the window expires or *max_batch* callers are waiting.  With an
+    *executor* the commit runs there, on the thread owning *conn*.
+    """
+
+    def __init__(self, conn, window=0.002, max_batch=32, executor=None):
+        self.conn = conn
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.waiters = []
+        self.commits = 0
+        self.requests = 0
+        self._timer = None
+
+    async def wait(self, changed=True):
+        """Wait until the current transaction is committed.
+
+        Read-only callers (``changed=False``) only commit directly when no
+        writer is waiting, which ends their read transaction cheaply.
+        """
+        if not changed:
+            if not self.waiters:
+                if self.executor is None:
+                    self.conn.commit()
+                else:
+                    await asyncio.wrap_future(self.executor.submit(self.conn.commit))
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        if len(self.waiters) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        await fut
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        waiters, self.waiters = self.waiters, []
+        if self.executor is None:
+            self._finish(waiters, self._commit())
+        else:
+            fut = asyncio.wrap_future(self.executor.submit(self._commit))
+            fut.add_done_callback(lambda f: self._finish(waiters, f.result()))
+
+    def _commit(self):
+        try:
+            self.conn.commit()
+        except Exception as e:
+            # don't let the failed batch's writes be committed with the next one
+            self.conn.rollback()
+            return e
+        return None
+
+    def _finish(self, waiters, err):
+        self.commits += 1
+        self.requests += len(waiters)
+        for fut in waiters:
+            if fut.done():
+                continue
+            if err:
+                fut.set_exception(err)
+            else:
+                fut.set_result(None)
+
+    def stats(self):
+        return {"commits": self.commits, "requests": self.requests, "pending": len(self.waiters)}
+
+
+class Checkpointer:
+    """Run ``PRAGMA wal_checkpoint(PASSIVE)`` outside of request handling.
+
+    ``idle`` returns ``True`` when no request is in flight. A checkpoint is
+    forced after *max_delay* seconds so the WAL can't grow without bound
+    under constant load.  Failures are reported to ``on_error(message)``.
+    """
+
+    def __init__(self, conn, interval=1.0, idle=lambda: True, max_delay=30.0, executor=None, on_error=print):
+        self.conn = conn
+        self.on_error = on_error
+        self.executor = executor
+        self.interval = interval
+        self.idle = idle
+        self.max_delay = max_delay
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.last_frames = None
+        self._last = time.monotonic()
+
+    def checkpoint(self):
+        start = time.perf_counter()
+        busy, frames, done = self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.max_ms = max(self.max_ms, self.last_ms)
+        self.total_ms += self.last_ms
+        self.count += 1
+        self.last_frames = (frames, done)
+        self._last = time.monotonic()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.idle() or time.monotonic() - self._last >= self.max_delay:
+                try:
+                    if self.executor is None:
+                        self.checkpoint()
+                    else:
+                        await asyncio.wrap_future(self.executor.submit(self.checkpoint))
+                except sqlite3.Error as e:
+                    self.on_error(f"WAL checkpoint failed: {e}")
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "last_ms": round(self.last_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "wal_frames": self.last_frames,
+        }
+
+
+# SQL functions whose result can change while the tables stay the same.
+VOLATILE_FUNCS = frozenset({
+    "random", "randomblob", "changes", "total_changes", "last_insert_rowid",
+    "date", "time", "datetime", "julianday", "unixepoch", "strftime", "timediff",
+    "current_date", "current_time", "current_timestamp",
+})
+
+
+class PageCache:
+    """LRU of rendered output, each entry valid while the tables it read are unchanged.
+
+    ``versions`` is the ``{table: counter}`` dict shared with
+    :class:`~pageql.reactive.Tables`; ``ReactiveTable`` writes bump a
+    table's counter and schema changes bump ``None``.  An entry stores the
+    counters of the tables its render read and is dropped once any of them
+    moved or its optional TTL ran out.
+
+    >>> cache = PageCache(2, {"t": 1})
+    >>> cache.put("k", "page", {"t"}, cache.snapshot())
+    >>> cache.get("k")
+    'page'
+    >>> cache.versions["t"] += 1
+    >>> cache.get("k") is None, cache.stats()["hits"]
+    (True, 1)
+    """
+
+    def __init__(self, size=256, versions=None):
+        self.size = size
+        self.versions = {} if versions is None else versions
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Return the current counters, taken before a render starts."""
+        return self.versions.copy()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, tables, expires = entry
+            versions = self.versions
+            if (expires is not None and time.monotonic() >= expires) or any(
+                versions.get(t, 0) != v for t, v in tables
+            ):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, tables, snapshot, ttl=None):
+        """Store *value* for *key* as read from *tables* at *snapshot*."""
+        deps = tuple((t, snapshot.get(t, 0)) for t in (None, *tables))
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, deps, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def drop(self, name):
+        """Forget entries whose key starts with module *name*."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == name]:
+                del self._entries[key]
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+        }
+
+
 def flatten_params(params):
     """Recursively flatten a nested dictionary using ``__`` separators."""
     result = {}
@@ -111,17 +464,25 @@ def parse_param_attrs(s):
     return attrs
 
 
-def db_execute_dot(db, exp, params):
-    """Execute SQL replacing dotted parameter names with ``__``."""
+@functools.lru_cache(maxsize=4096)
+def _dot_statement(exp):
+    """Return ``(converted_sql, param_names, bind_all)`` for :func:`db_execute_dot`."""
     converted_exp = re.sub(
         r":([a-zA-Z0-9_]+(?:\.[a-zA-Z0-9_]+)+)",
         lambda m: ":" + m.group(1).replace(".", "__"),
         exp,
     )
-    param_names = [
+    param_names = tuple(
         m.replace(".", "__")
         for m in re.findall(r":([a-zA-Z0-9_]+(?:\.[a-zA-Z0-9_]+)*)", exp)
-    ]
+    )
+    # ``@name`` and ``$name`` placeholders are not in param_names
+    return converted_exp, param_names, "@" in exp or "$" in exp
+
+
+def db_execute_dot(db, exp, params):
+    """Execute SQL replacing dotted parameter names with ``__``."""
+    converted_exp, param_names, bind_all = _dot_statement(exp)
     missing = [n for n in param_names if n not in params]
     if missing:
         raise ValueError(
@@ -130,7 +491,8 @@ def db_execute_dot(db, exp, params):
         )
 
     converted_params = {}
-    for k, v in params.items():
+    for k in (params.keys() if bind_all else param_names):
+        v = params[k]
         converted_params[k] = v.value if isinstance(v, Signal) else v
     try:
         return db.execute(converted_exp, converted_params)
@@ -141,13 +503,12 @@ def db_execute_dot(db, exp, params):
 
 
 def evalone(db, exp, params, reactive=False, tables=None, expr=None):
-    exp = exp.strip()
-    if exp.upper() == "NULL":
-        return ReadOnly(None) if reactive else None
     dialect = getattr(tables, "dialect", "sqlite") if tables is not None else "sqlite"
-    if re.match("^:?[a-zA-z._][a-zA-z._0-9]*$", exp):
-        original = exp[1:] if exp.startswith(":") else exp
-        name = original.replace(".", "__")
+    plan = exp if type(exp) is ExprPlan else plan_expr(exp, dialect)
+    if plan.kind == "null":
+        return ReadOnly(None) if reactive else None
+    if plan.kind == "param":
+        name = plan.name
         if name in params:
             val = params[name]
             if reactive:
@@ -160,17 +521,15 @@ def evalone(db, exp, params, reactive=False, tables=None, expr=None):
                 return signal
             return val.value if isinstance(val, Signal) else val
         raise ValueError(
-            f"Missing parameter '{original}' for expression `{exp}`."
+            f"Missing parameter '{plan.original}' for expression `{plan.text}`."
         )
 
-    if not re.match(r"(?i)^\s*(select|\(select)", exp):
-        exp = "select " + exp
-
+    exp = plan.sql
     if reactive:
-        sql = _convert_dot_sql(exp)
+        sql = plan.dot_sql
         if tables is None:
             tables = Tables(db, dialect)
-        dep_names = [name.replace(".", "__") for name in get_dependencies(sql)]
+        dep_names = plan.deps
         missing = [n for n in dep_names if n not in params]
         if missing:
             raise ValueError(
@@ -188,16 +547,20 @@ def evalone(db, exp, params, reactive=False, tables=None, expr=None):
             if isinstance(val, Signal) and not isinstance(val, ReadOnly):
                 deps.append(val)
             dep_keys.append(val.value if isinstance(val, ReadOnly) else id(val))
+        if not deps and plan.py is not None:
+            try:
+                return ReadOnly(plan.py(params))
+            except Unsupported:
+                pass
 
         def _build():
-            nonlocal expr
-            if expr is None:
-                expr = sqlglot.parse_one(sql, read=dialect)
-            comp = parse_reactive(expr, tables, params, one_value=True)
+            comp = parse_reactive(
+                expr if expr is not None else plan.tree, tables, params, one_value=True
+            )
             return comp
 
         cache_key = (id(tables), sql, tuple(dep_keys))
-        cache_allowed = "randomblob" not in sql.lower()
+        cache_allowed = plan.cacheable
         dv = _DV_CACHE.get(cache_key) if cache_allowed else None
         if dv is not None:
             if not hasattr(dv, "listeners") or dv.listeners:
@@ -207,6 +570,12 @@ def evalone(db, exp, params, reactive=False, tables=None, expr=None):
             _DV_CACHE[cache_key] = dv
         return dv
 
+    if plan.py is not None:
+        try:
+            return plan.py(params)
+        except Unsupported:
+            pass
+
     try:
         r = db_execute_dot(db, exp, params).fetchone()
         if len(r) != 1:
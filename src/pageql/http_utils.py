@@ -1,11 +1,19 @@
 """Utility helpers for async HTTP interactions."""
 
 import asyncio
+import concurrent.futures
+import http.client
 import re
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import urlparse, parse_qs, urljoin
 from typing import Dict, List, Tuple, Callable, Awaitable
 
 __all__ = [
+    "HttpPool",
+    "ResponseCache",
+    "http_pool",
     "_http_get",
     "fetch",
     "fetch_sync",
@@ -114,58 +122,386 @@ async def _parse_form_data(
             log_func(f"Warning: Unsupported Content-Type: {content_type}")
 
 
-async def _http_get(
-    url: str,
-    method: str = "GET",
-    headers: Dict[str, str] | None = None,
-    body: bytes | None = None,
-) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
-    """Perform a minimal async HTTP request."""
-    parsed = urlparse(url)
-    host = parsed.hostname or ""
-    port = parsed.port or (443 if parsed.scheme == "https" else 80)
-    path = parsed.path or "/"
-    if parsed.query:
-        path += "?" + parsed.query
-    reader, writer = await asyncio.open_connection(
-        host, port, ssl=parsed.scheme == "https"
-    )
-    hdrs = {"Host": host, "Connection": "close"}
-    if headers:
-        hdrs.update(headers)
-    body_bytes = body or b""
-    if body_bytes and "Content-Length" not in hdrs:
-        hdrs["Content-Length"] = str(len(body_bytes))
-    header_lines = "".join(f"{k}: {v}\r\n" for k, v in hdrs.items())
-    request = f"{method} {path} HTTP/1.1\r\n{header_lines}\r\n"
-    writer.write(request.encode() + body_bytes)
-    await writer.drain()
+Response = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> str | None:
+    for k, v in headers:
+        if k == name:
+            return v.decode()
+    return None
+
+
+def _max_age(cache_control: str) -> float | None:
+    """Return the freshness lifetime of a ``Cache-Control`` value.
+
+    >>> _max_age("public, max-age=60"), _max_age("no-cache"), _max_age("")
+    (60.0, 0.0, None)
+    """
+    directives = [d.strip().lower() for d in cache_control.split(",")]
+    if "no-cache" in directives:
+        return 0.0
+    for d in directives:
+        if d.startswith("max-age="):
+            try:
+                return float(d[8:])
+            except ValueError:
+                return 0.0
+    return None
+
+
+class ResponseCache:
+    """LRU cache of GET responses honouring ``Cache-Control`` and ``ETag``.
 
+    Responses are keyed by URL and request headers.  Fresh entries are
+    served directly; stale entries with an ``ETag`` are revalidated with
+    ``If-None-Match`` and reused on ``304``.  ``size`` 0 disables caching.
+    """
+
+    def __init__(self, size: int = 0):
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def lookup(self, key, headers):
+        """Return ``(response, headers_to_send, entry)`` for a request.
+
+        ``response`` is set for a fresh hit; otherwise ``headers_to_send``
+        may carry ``If-None-Match`` for the stale ``entry``.
+        """
+        entry = self._entries.get(key) if self.size else None
+        if entry is None:
+            if self.size:
+                self.misses += 1
+            return None, headers, None
+        self._entries.move_to_end(key)
+        response, expires, etag = entry
+        if time.monotonic() < expires:
+            self.hits += 1
+            return response, headers, entry
+        if etag:
+            headers = dict(headers or {})
+            headers["If-None-Match"] = etag
+        self.misses += 1
+        return None, headers, entry
+
+    def update(self, key, entry, response: Response) -> Response:
+        """Store ``response`` if cacheable and return the response to use."""
+        if not self.size:
+            return response
+        status, headers, _ = response
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            response = entry[0]
+        elif status != 200:
+            return response
+        cache_control = _header(headers, b"cache-control") or ""
+        if "no-store" in cache_control.lower() or _header(headers, b"vary") == "*":
+            self._entries.pop(key, None)
+            return response
+        max_age = _max_age(cache_control)
+        etag = _header(headers, b"etag") or (entry[2] if status == 304 else None)
+        if max_age is None and not etag:
+            return response
+        self._entries[key] = (response, time.monotonic() + (max_age or 0), etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+
+async def _exchange(reader, writer, request: bytes, method: str):
+    """Send ``request`` and read one response; return it with a keep-alive flag."""
+    writer.write(request)
+    await writer.drain()
     status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed before response")
     parts = status_line.decode().split()
     status = int(parts[1]) if len(parts) > 1 else 502
     resp_headers: List[Tuple[bytes, bytes]] = []
     hdr_dict = {}
     while True:
         line = await reader.readline()
-        if line == b"\r\n":
+        if line in (b"\r\n", b""):
             break
         key, val = line.decode().split(":", 1)
         val = val.strip()
         resp_headers.append((key.lower().encode(), val.encode()))
         hdr_dict[key.lower()] = val
 
-    if hdr_dict.get("transfer-encoding") == "chunked":
+    keep = parts[0] == "HTTP/1.1" and hdr_dict.get("connection", "").lower() != "close"
+    if method == "HEAD" or status in (204, 304) or status < 200:
+        body = b""
+    elif hdr_dict.get("transfer-encoding") == "chunked":
         body = await _read_chunked_body(reader)
     elif "content-length" in hdr_dict:
         length = int(hdr_dict["content-length"])
         body = await reader.readexactly(length)
     else:
         body = await reader.read()
+        keep = False
+    return (status, resp_headers, body), keep
+
 
-    writer.close()
-    await writer.wait_closed()
-    return status, resp_headers, body
+# Methods resent once when a reused keep-alive connection turns out dead;
+# others may already have been processed by the server.
+_RETRY_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class HttpPool:
+    """Shared keep-alive HTTP/1.1 connections for outgoing requests.
+
+    Connections are reused per ``(scheme, host, port)`` with at most
+    ``max_per_host`` requests in flight to each host.  Async connections are
+    additionally keyed by their event loop; synchronous requests use
+    :mod:`http.client`.  Identical concurrent GETs share one upstream call
+    and ``cache`` optionally stores their responses.
+    """
+
+    def __init__(self, max_per_host: int = 8, timeout: float = 30.0,
+                 idle_timeout: float = 30.0, cache_size: int = 0):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.cache = ResponseCache(cache_size)
+        self._idle: Dict[tuple, list] = {}
+        self._limits: Dict[tuple, object] = {}
+        self._flights: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0, "connections": 0, "reused": 0, "deduplicated": 0,
+        }
+
+    @staticmethod
+    def _target(url: str):
+        parsed = urlparse(url)
+        host = parsed.hostname or ""
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        return (parsed.scheme, host, port), path
+
+    @staticmethod
+    def _cache_key(url, method, headers, body):
+        if method != "GET" or body:
+            return None
+        return url, tuple(sorted((k.lower(), v) for k, v in (headers or {}).items()))
+
+    def _limit(self, key, factory):
+        with self._lock:
+            sem = self._limits.get(key)
+            if sem is None:
+                sem = self._limits[key] = factory(self.max_per_host)
+            return sem
+
+    def _take(self, key, alive):
+        """Pop a live idle connection for ``key``, closing stale ones."""
+        now = time.monotonic()
+        conn = None
+        stale = []
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                c, used = idle.pop()
+                if now - used < self.idle_timeout and alive(c):
+                    conn = c
+                    self.counters["reused"] += 1
+                    break
+                stale.append(c)
+        for c in stale:
+            self._close(c)
+        return conn
+
+    def _put(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            (conn[1] if isinstance(conn, tuple) else conn).close()
+        except Exception:
+            pass
+
+    def _purge_closed_loops(self):
+        with self._lock:
+            for d in (self._idle, self._limits, self._flights):
+                for k in [k for k in d if k[0] is not None and k[0].is_closed()]:
+                    del d[k]
+
+    async def request(self, url: str, method: str = "GET",
+                      headers: Dict[str, str] | None = None,
+                      body: bytes | None = None) -> Response:
+        """Perform an async request, deduplicating and caching GETs."""
+        key = self._cache_key(url, method, headers, body)
+        if key is None:
+            return await self._send(url, method, headers, body)
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get((loop, key))
+        if flight is not None:
+            self.counters["deduplicated"] += 1
+            return await asyncio.shield(flight)
+        fut = self._flights[(loop, key)] = loop.create_future()
+        try:
+            with self._lock:
+                response, send_headers, entry = self.cache.lookup(key, headers)
+            if response is None:
+                response = await self._send(url, method, send_headers, body)
+                with self._lock:
+                    response = self.cache.update(key, entry, response)
+            fut.set_result(response)
+            return response
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(e)
+                fut.exception()
+            raise
+        finally:
+            self._flights.pop((loop, key), None)
+
+    async def _send(self, url, method, headers, body) -> Response:
+        loop = asyncio.get_running_loop()
+        self._purge_closed_loops()
+        target, path = self._target(url)
+        scheme, host, port = target
+        hdrs = {"Host": host}
+        if headers:
+            hdrs.update(headers)
+        body_bytes = body or b""
+        if body_bytes and "Content-Length" not in hdrs:
+            hdrs["Content-Length"] = str(len(body_bytes))
+        header_lines = "".join(f"{k}: {v}\r\n" for k, v in hdrs.items())
+        request = f"{method} {path} HTTP/1.1\r\n{header_lines}\r\n".encode() + body_bytes
+        key = (loop, target)
+        self.counters["requests"] += 1
+        async with self._limit(key, asyncio.Semaphore):
+            while True:
+                conn = self._take(key, lambda c: not c[1].is_closing() and not c[0].at_eof())
+                reused = conn is not None
+                if conn is None:
+                    conn = await asyncio.wait_for(
+                        asyncio.open_connection(host, port, ssl=scheme == "https"),
+                        self.timeout,
+                    )
+                    self.counters["connections"] += 1
+                try:
+                    response, keep = await asyncio.wait_for(
+                        _exchange(*conn, request, method), self.timeout
+                    )
+                except ConnectionResetError:
+                    self._close(conn)
+                    if reused and method.upper() in _RETRY_METHODS:
+                        continue
+                    raise
+                except BaseException:
+                    self._close(conn)
+                    raise
+                if keep:
+                    self._put(key, conn)
+                else:
+                    self._close(conn)
+                return response
+
+    def request_sync(self, url: str, method: str = "GET",
+                     headers: Dict[str, str] | None = None,
+                     body: bytes | None = None) -> Response:
+        """Blocking variant of :meth:`request` for use from worker threads."""
+        key = self._cache_key(url, method, headers, body)
+        if key is None:
+            return self._send_sync(url, method, headers, body)
+        with self._lock:
+            flight = self._flights.get((None, key))
+            if flight is None:
+                fut = self._flights[(None, key)] = concurrent.futures.Future()
+        if flight is not None:
+            self.counters["deduplicated"] += 1
+            return flight.result()
+        try:
+            with self._lock:
+                response, send_headers, entry = self.cache.lookup(key, headers)
+            if response is None:
+                response = self._send_sync(url, method, send_headers, body)
+                with self._lock:
+                    response = self.cache.update(key, entry, response)
+            fut.set_result(response)
+            return response
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop((None, key), None)
+
+    def _send_sync(self, url, method, headers, body) -> Response:
+        target, path = self._target(url)
+        scheme, host, port = target
+        key = (None, target)
+        self.counters["requests"] += 1
+        with self._limit(key, threading.BoundedSemaphore):
+            while True:
+                conn = self._take(key, lambda c: c.sock is not None)
+                reused = conn is not None
+                if conn is None:
+                    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                    conn = cls(host, port, timeout=self.timeout)
+                    self.counters["connections"] += 1
+                try:
+                    conn.request(method, path, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    if reused and method.upper() in _RETRY_METHODS:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                resp_headers = [(k.lower().encode(), v.encode()) for k, v in resp.getheaders()]
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self._put(key, conn)
+                return resp.status, resp_headers, data
+
+    def stats(self) -> Dict[str, object]:
+        """Return connection pool and response cache counters."""
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+        return {"pool": dict(self.counters, idle=idle), "cache": self.cache.stats()}
+
+
+http_pool = HttpPool()
+
+
+async def _http_get(
+    url: str,
+    method: str = "GET",
+    headers: Dict[str, str] | None = None,
+    body: bytes | None = None,
+    pool: HttpPool | None = None,
+) -> Response:
+    """Perform a minimal async HTTP request over *pool*, by default the shared
+    :data:`http_pool`."""
+    return await (pool or http_pool).request(url, method=method, headers=headers, body=body)
 
 
 async def fetch(
@@ -175,17 +511,19 @@ async def fetch(
     body: bytes | None = None,
     *,
     base_url: str | None = None,
+    pool: HttpPool | None = None,
 ) -> Dict[str, object]:
     """Return a mapping with ``status_code``, ``headers`` and decoded ``body``.
 
-    If *url* is relative, it must be resolved against *base_url*.
+    If *url* is relative, it must be resolved against *base_url*.  Requests
+    go through *pool*, by default the shared :data:`http_pool`.
     """
     if url.startswith("/") and not urlparse(url).scheme:
         if not base_url:
             raise ValueError("Relative URL requires base_url")
         url = urljoin(base_url.rstrip("/"), url)
     print(f"fetching {url}")
-    status, headers, body = await _http_get(url, method=method, headers=headers, body=body)
+    status, headers, body = await _http_get(url, method=method, headers=headers, body=body, pool=pool)
     print(f"fetched {url} with status: {status}")
     try:
         body = body.decode("utf-8")
@@ -201,28 +539,30 @@ def fetch_sync(
     body: bytes | None = None,
     *,
     base_url: str | None = None,
+    pool: HttpPool | None = None,
 ) -> Dict[str, object]:
-    """Synchronous variant of :func:`fetch` using ``urllib``.
+    """Synchronous variant of :func:`fetch`, by default over :data:`http_pool`.
 
-    Relative URLs are resolved the same way as :func:`fetch`.
+    Relative URLs are resolved the same way as :func:`fetch` and redirects
+    are followed like ``urllib`` does.
     """
     if url.startswith("/") and not urlparse(url).scheme:
         if not base_url:
             raise ValueError("Relative URL requires base_url")
         url = urljoin(base_url.rstrip("/"), url)
-    from urllib.request import urlopen, Request
-    from urllib.error import HTTPError
-
-    req = Request(url, data=body, headers=headers or {}, method=method)
-    try:
-        with urlopen(req) as resp:
-            status = resp.status
-            headers = [(k.lower().encode(), v.encode()) for k, v in resp.getheaders()]
-            body_bytes = resp.read()
-    except HTTPError as e:
-        status = e.code
-        headers = [(k.lower().encode(), v.encode()) for k, v in e.headers.items()]
-        body_bytes = e.read()
+    for _ in range(10):
+        status, resp_headers, body_bytes = (pool or http_pool).request_sync(
+            url, method=method, headers=headers, body=body
+        )
+        location = _header(resp_headers, b"location")
+        if status not in (301, 302, 303, 307, 308) or not location:
+            break
+        if method not in ("GET", "HEAD"):
+            if status in (307, 308):
+                break
+            method, body = "GET", None
+        url = urljoin(url, location)
+    headers = resp_headers
     try:
         body = body_bytes.decode("utf-8")
     except Exception:
@@ -11,10 +11,10 @@ Classes:
 
 # Instructions for LLMs and devs: Keep the code short. Make changes minimal. Don't change even tests too much.
 
-import re, time, sys, json, hashlib, base64
+import re, time, sys, json, hashlib, base64, copy, contextlib, itertools
+from concurrent.futures import ThreadPoolExecutor
 import doctest
 import sqlite3
-import os
 import html
 import pathlib
 from urllib.parse import urlparse
@@ -23,7 +23,7 @@ if __package__ is None:                      # script / doctest-by-path
     sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
 
-from pageql.parser import tokenize, parsefirstword, build_ast, add_reactive_elements
+from pageql.parser import tokenize, parsefirstword, build_ast, add_reactive_elements, RenderPlan, plan_render
 from pageql.reactive import (
     Signal,
     DerivedSignal,
@@ -36,25 +36,35 @@ from pageql.reactive import (
     _convert_dot_sql,
     Order,
     set_log_level,
+    set_statement_cache_size,
+    StatsConnection,
+    table_version_key,
 )
 from pageql.render_context import (
     RenderContext,
     RenderResult,
     RenderResultException,
     embed_html_in_js,
+    escape_script,
+    html_patch,
 )
 from pageql.highlighter import highlight_block
 from pageql.reactive_sql import parse_reactive, _replace_placeholders
 from pageql.database import (
     connect_database,
+    DEFAULT_CACHED_STATEMENTS,
+    apply_sqlite_profile,
     flatten_params,
     parse_param_attrs,
     db_execute_dot,
     evalone,
+    PageCache,
+    VOLATILE_FUNCS,
 )
 
 from pageql.params import handle_param
-from pageql.http_utils import fetch_sync, fetch
+from pageql.scope import Scope
+from pageql.http_utils import fetch_sync, fetch, http_pool
 import sqlglot
 
 
@@ -62,7 +72,19 @@ import sqlglot
 
 
 _ONEVENT_CACHE: dict[tuple[int, int, str, tuple], str] = {}
+# Directives that write to the database or have side effects outside it
+_WRITE_DIRECTIVES = {
+    '#insert', '#update', '#delete', '#create', '#merge', '#attach', '#fetch', '#import',
+}
+# Directives that change status, headers or cookies.
+_LATE_DIRECTIVES = {
+    '#header', '#cookie', '#statuscode', '#respond', '#redirect', '#error',
+}
+# Rows fetched per step when ``#from`` iterates its cursor.
+FROM_BATCH_SIZE = 256
 tasks: list = []
+# worker threads for concurrent synchronous #fetch, see ``_process_fetch_group``
+_FETCH_POOL = ThreadPoolExecutor(8, thread_name_prefix="pageql-fetch")
 
 # Short descriptions for valid PageQL directives. Each entry includes a
 # minimal syntax reminder to make the help output more useful.
@@ -71,7 +93,7 @@ DIRECTIVE_HELP: dict[str, str] = {
     "#delete from <table> where <cond>": "execute an SQL DELETE query",
     "#dump <table>": "dump a table's contents",
     "#showsource": "display highlighted source code",
-    "#from <select>": "iterate SQL query results",
+    "#from <select> [infinite [window <n>]]": "iterate SQL query results",
     "#if <expr>": "conditional block",
     "#ifdef <var>": "branch if variable defined",
     "#ifndef <var>": "branch if variable not defined",
@@ -81,7 +103,7 @@ DIRECTIVE_HELP: dict[str, str] = {
     "#merge <sql>": "execute an SQL MERGE",
     "#attach database <db> as <name>": "attach a SQLite database",
     "#param <name> [type] [attrs]": "declare and validate a request parameter",
-    "#partial <name>": "define a reusable partial block",
+    "#partial <name> [cache]": "define a reusable partial block, optionally memoized",
     "#reactive on|off": "toggle reactive rendering mode",
     "#test <name>": "define a unit test",
     "#redirect <url>": "issue an HTTP redirect",
@@ -94,6 +116,7 @@ DIRECTIVE_HELP: dict[str, str] = {
     "#cookie <name> <expr> [opts]": "set an HTTP cookie",
     "#update <table> set <expr> where <cond>": "execute an SQL UPDATE",
     "#fetch [async] <var> from <url> [header=<expr>]": "fetch a remote URL into a variable",
+    "#cache <seconds>|off": "set the page cache TTL of this module or disable caching",
 }
 
 def format_unknown_directive(directive: str) -> str:
@@ -154,6 +177,113 @@ def _normalize_param_name(name: str) -> str:
     return name.replace(".", "__")
 
 
+_MISSING = object()
+# Entries kept for ``#partial ... cache`` output per database.
+PARTIAL_CACHE_SIZE = 1024
+
+
+def _memo_key(memo_id, names, params, http_verb):
+    """Return the ``partial_cache`` key of a ``#memo`` body, ``None`` if unhashable.
+
+    >>> _memo_key(1, ("a",), {"a": ReadOnly(2), "c": 3}, None)
+    (1, None, (2,))
+    """
+    if names is None:
+        items = params.to_dict() if isinstance(params, Scope) else params
+        values = tuple(sorted((k, _unwrap(v)[0]) for k, v in items.items()))
+    else:
+        values = tuple(_unwrap(params.get(n, _MISSING))[0] for n in names)
+    key = (memo_id, http_verb, values)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _fetch_batches(cursor, size=FROM_BATCH_SIZE):
+    """Yield the rows of *cursor*, fetching *size* rows at a time.
+
+    >>> conn = sqlite3.connect(":memory:")
+    >>> list(_fetch_batches(conn.execute("select 1 union all select 2"), 1))
+    [(1,), (2,)]
+    """
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _writes(nodes):
+    """Return ``True`` if *nodes* may write while an enclosing cursor is open.
+
+    ``#render`` counts as writing since the partial isn't known statically.
+
+    >>> _writes([('text', 'a'), ['#if', ('1', None), [('#render', 'p')]]]), _writes([('text', 'a')])
+    (True, False)
+    """
+    for n in nodes:
+        if n[0] in _WRITE_DIRECTIVES or n[0] == '#render':
+            return True
+        if isinstance(n, list) and any(_writes(p) for p in n[1:] if isinstance(p, list)):
+            return True
+    return False
+
+
+def _assigned(nodes, out):
+    """Add the parameter names ``#let``/``#param`` assign anywhere in *nodes* to *out*."""
+    for n in nodes:
+        if n[0] == '#let':
+            out.add(_normalize_param_name(n[1][0]))
+        elif n[0] == '#param':
+            out.add(_normalize_param_name(parsefirstword(n[1])[0]))
+        elif isinstance(n, list):
+            for p in n[1:]:
+                if isinstance(p, list):
+                    _assigned(p, out)
+    return out
+
+
+def _inner_from(node, assigned):
+    """Return how a ``#from`` nested in another one can load many outer rows at once.
+
+    The result is ``(node, deps, key, sql)`` where *deps* are the query's
+    parameters.  For queries of the form ``<table> where <col> = :key`` *sql*
+    selects the rows of all keys of a batch, with ``{keys}`` standing for the
+    ``VALUES`` list of keys, and prefixes each row with its key.  ``None`` is
+    returned when the query reads a parameter the outer body assigns.
+
+    >>> n = ['#from', ('items where oid = :id order by name', sqlglot.parse_one(
+    ...     'SELECT * FROM items where oid = :id order by name')), set(), [], False]
+    >>> _inner_from(n, set())[1:]
+    ({'id'}, 'id', 'SELECT __pql_k.column1, items.* FROM (VALUES {keys}) AS __pql_k JOIN items ON items.oid = __pql_k.column1 ORDER BY name')
+    """
+    query, expr = node[1]
+    deps = set(get_dependencies(_convert_dot_sql("SELECT * FROM " + query)))
+    if deps & assigned:
+        return None
+    key = sql = None
+    where = expr.args.get("where")
+    table = expr.args.get("from") and expr.args["from"].this
+    if (isinstance(where, sqlglot.exp.Where) and isinstance(where.this, sqlglot.exp.EQ)
+            and isinstance(table, sqlglot.exp.Table)
+            and not any(expr.args.get(k) for k in ("joins", "group", "having", "limit", "offset", "distinct", "with"))):
+        col, ph = where.this.this, where.this.expression
+        if isinstance(col, sqlglot.exp.Placeholder):
+            col, ph = ph, col
+        if isinstance(col, sqlglot.exp.Column) and isinstance(ph, sqlglot.exp.Placeholder) and deps == {ph.name}:
+            alias = table.alias_or_name
+            if not col.table:
+                col = sqlglot.exp.column(col.name, table=alias)
+            order = expr.args.get("order")
+            key = ph.name
+            sql = (f"SELECT __pql_k.column1, {alias}.* FROM (VALUES {{keys}}) AS __pql_k "
+                   f"JOIN {table.sql(dialect='sqlite')} ON {col.sql(dialect='sqlite')} = __pql_k.column1"
+                   + (" " + order.sql(dialect="sqlite") if order else ""))
+    return node, deps, key, sql
+
+
 def _row_hash(row) -> str:
     """Return a stable short hash for a result row."""
     return base64.b64encode(
@@ -161,10 +291,310 @@ def _row_hash(row) -> str:
     )[:8].decode()
 
 
+_KEY_RE = re.compile(r"[A-Za-z0-9.:-]{1,64}")
+
+
+def _key_indexes(comp, col_names):
+    """Return the positions of the narrowest unique key of *comp* in *col_names*.
+
+    Returns ``None`` when no unique column set of *comp* is fully selected.
+    """
+    positions = {c: i for i, c in enumerate(col_names)}
+    best = None
+    for key in getattr(comp, "unique_columns", ()):
+        cols = (key,) if isinstance(key, str) else key
+        if all(c in positions for c in cols) and (best is None or len(cols) < len(best)):
+            best = cols
+    return None if best is None else tuple(positions[c] for c in best)
+
+
+def _row_id(mid, row, key=None) -> str:
+    """Return the marker id of *row*, keyed by its unique columns when possible.
+
+    Text values are prefixed with ``~`` so ``1`` and ``'1'`` in an untyped
+    column get different ids.
+    """
+    if key is not None:
+        values = [row[i] for i in key]
+        if all(type(v) in (int, str) and _KEY_RE.fullmatch(str(v)) for v in values):
+            return f"{mid}_{','.join(str(v) if type(v) is int else '~' + v for v in values)}"
+    return f"{mid}_{_row_hash(row)}"
+
+
+def _update_script(mid, old, new, key, content, rendered=None):
+    """Return the script replacing row *old* with *new* rendered as *content*.
+
+    Rows keeping their id are updated in place.  When *rendered* holds the
+    previous HTML of the row, only the changed attributes and texts are sent,
+    and ``None`` is returned if nothing changed.
+    """
+    old_id = _row_id(mid, old, key)
+    new_id = _row_id(mid, new, key)
+    safe_json = embed_html_in_js(content)
+    if old_id != new_id:
+        if rendered is not None:
+            rendered.pop(old_id, None)
+            rendered[new_id] = content
+        return f"pupdate('{old_id}','{new_id}',{safe_json})"
+    if rendered is not None:
+        prev = rendered.get(new_id)
+        rendered[new_id] = content
+        patch = html_patch(prev, content) if prev is not None else None
+        if patch == []:
+            return None
+        if patch is not None:
+            patch_json = escape_script(json.dumps(patch))
+            if len(patch_json) < len(safe_json):
+                return f"ppatch('{new_id}',{patch_json})"
+    return f"pset('{new_id}',{safe_json})"
+
+
+# Node type -> PageQL handler name, resolved once by the template compiler.
+_NODE_HANDLERS = {
+    'render_expression': '_process_render_expression_node',
+    'render_param': '_process_render_param_node',
+    'render_raw': '_process_render_raw_node',
+    '#param': '_process_param_directive',
+    '#let': '_process_let_directive',
+    '#render': '_process_render_directive',
+    '#reactive': '_process_reactive_directive',
+    '#redirect': '_process_redirect_directive',
+    '#error': '_process_error_directive',
+    '#statuscode': '_process_statuscode_directive',
+    '#respond': '_process_respond_directive',
+    '#header': '_process_header_directive',
+    '#cookie': '_process_cookie_directive',
+    '#fetch': '_process_fetch_directive',
+    '#attach': '_process_attach_directive',
+    '#import': '_process_import_directive',
+    '#log': '_process_log_directive',
+    '#dump': '_process_dump_directive',
+    '#showsource': '_process_showsource_directive',
+    '#cache': '_process_cache_directive',
+    '#memo': '_process_memo_directive',
+    '#reactiveelement': '_process_reactiveelement_directive',
+    '#if': '_process_if_directive',
+    '#ifdef': '_process_ifdef_directive',
+    '#ifndef': '_process_ifndef_directive',
+    '#from': '_process_from_directive',
+    '#each': '_process_each_directive',
+}
+_TYPED_HANDLERS = {
+    '#update': '_process_update_directive',
+    '#insert': '_process_update_directive',
+    '#delete': '_process_update_directive',
+    '#create': '_process_schema_directive',
+    '#merge': '_process_schema_directive',
+}
+
+
+# Deterministic functions that may be evaluated once at load time.
+_CONSTANT_FUNCS = (
+    sqlglot.exp.Case, sqlglot.exp.If, sqlglot.exp.Coalesce, sqlglot.exp.Nullif,
+    sqlglot.exp.Upper, sqlglot.exp.Lower, sqlglot.exp.Length, sqlglot.exp.Abs,
+    sqlglot.exp.Round, sqlglot.exp.Substring, sqlglot.exp.Trim, sqlglot.exp.Replace,
+    sqlglot.exp.Cast,
+)
+
+
+def _is_constant(expr) -> bool:
+    """Return True if the parsed ``SELECT`` *expr* needs no params or tables.
+
+    >>> _is_constant(sqlglot.parse_one("select 'a' || upper('b') = 'aB'"))
+    True
+    >>> _is_constant(sqlglot.parse_one("select :a + 1"))
+    False
+    >>> _is_constant(sqlglot.parse_one("select random()"))
+    False
+    """
+    if not isinstance(expr, sqlglot.exp.Select) or len(expr.expressions) != 1:
+        return False
+    if any(expr.args.get(k) for k in expr.args if k != "expressions"):
+        return False
+    for node in expr.expressions[0].walk():
+        if isinstance(node, (sqlglot.exp.Column, sqlglot.exp.Placeholder, sqlglot.exp.Parameter,
+                             sqlglot.exp.Star, sqlglot.exp.Query, sqlglot.exp.Table)):
+            return False
+        if isinstance(node, sqlglot.exp.Func) and not isinstance(node, _CONSTANT_FUNCS):
+            return False
+    return True
+
+
+def fold_constants(nodes, db, stats, dialect="sqlite"):
+    """Return *nodes* with parameter and table free expressions prerendered.
+
+    ``{{...}}`` expressions and ``#if`` conditions that are constant are
+    evaluated once through *db*, decided branches are inlined and adjacent
+    text nodes merged.  Counts are added to the *stats* dict.
+
+    >>> stats = {}
+    >>> fold_constants([('text', 'a'), ('render_expression', '1+1'),
+    ...                 ['#if', ('0', sqlglot.parse_one('select 0')), [('text', 'x')], [('text', '!')]]],
+    ...                sqlite3.connect(':memory:'), stats)
+    [('text', 'a2!')]
+    >>> sorted(stats.items())
+    [('expressions', 1), ('ifs', 1), ('merged', 2)]
+    """
+    def add(key, n=1):
+        stats[key] = stats.get(key, 0) + n
+
+    def constant(sql, expr=None):
+        try:
+            if expr is None:
+                expr = sqlglot.parse_one("SELECT " + sql, read=dialect)
+            if _is_constant(expr):
+                return True, evalone(db, sql, {})
+        except Exception:
+            pass
+        return False, None
 
+    out = []
 
+    def emit(node):
+        if isinstance(node, tuple) and node[0] == 'text' and out and isinstance(out[-1], tuple) and out[-1][0] == 'text':
+            out[-1] = ('text', out[-1][1] + node[1])
+            add('merged')
+        else:
+            out.append(node)
+
+    for node in nodes:
+        if isinstance(node, tuple) and node[0] in ('render_expression', 'render_raw'):
+            ok, value = constant(node[1])
+            if ok:
+                add('expressions')
+                emit(('text', html.escape(str(value)) if node[0] == 'render_expression' else str(value)))
+                continue
+        elif isinstance(node, list):
+            node = [fold_constants(n, db, stats, dialect) if isinstance(n, list) else n for n in node]
+            if node[0] == '#if':
+                branches = node[1:]
+                while len(branches) > 1:
+                    ok, value = constant(branches[0][0], branches[0][1])
+                    if not ok:
+                        break
+                    add('ifs')
+                    branches = [branches[1]] if value else branches[2:]
+                if not branches:
+                    continue
+                if len(branches) == 1:
+                    for n in branches[0]:
+                        emit(n)
+                    continue
+                node = ['#if'] + branches
+        emit(node)
+    return out
+
+
+class CompiledNodes(list):
+    """A node list carrying ``ops`` compiled by :func:`compile_nodes`.
+
+    ``streamed`` is set on ``#from`` bodies whose rows can be read from the
+    cursor in batches and ``inner`` lists their nested ``#from`` blocks that
+    can be loaded for a batch of rows at once, see :func:`_inner_from`.
+    """
+    ops = None
+    streamed = False
+    inner = ()
 
 
+def _typed_op(name, node_type):
+    handler = getattr(PageQL, name)
+
+    def op(self, node_content, params, path, includes, http_verb, reactive, ctx):
+        return handler(self, node_content, params, path, includes, http_verb, reactive, ctx, node_type)
+    return op
+
+
+_SAFE_FETCH_METHOD_RE = re.compile(r"""\s*(['"])(?i:get|head)\1\s*""")
+
+
+def _fetch_group(nodes, start):
+    """Return the end of the run of independent sync ``#fetch`` at *start*.
+
+    The run may contain text between fetches; a fetch whose expressions
+    mention an earlier fetch's variable ends it.  Only ``GET`` and ``HEAD``
+    requests join a run, others keep running one at a time in order.
+    """
+    names = []
+    end = start
+    for i in range(start, len(nodes)):
+        node = nodes[i]
+        if not isinstance(node, tuple):
+            break
+        if node[0] == 'text':
+            continue
+        if node[0] != '#fetch' or node[1][2]:
+            break
+        if node[1][4] and not _SAFE_FETCH_METHOD_RE.fullmatch(node[1][4]):
+            break
+        exprs = " ".join(str(e) for e in (node[1][1], node[1][3], node[1][4], node[1][5]) if e)
+        if any(re.search(rf"\b{re.escape(n)}(?:__|\.|\b)", exprs) for n in names):
+            break
+        names.append(_normalize_param_name(node[1][0]))
+        end = i + 1
+    return end if len(names) > 1 else start
+
+
+def compile_nodes(nodes):
+    """Compile *nodes* and nested bodies into :class:`CompiledNodes`.
+
+    ``ops`` is a list of ``(handler, arg)`` pairs called as ``handler(engine,
+    arg, params, path, includes, http_verb, reactive, ctx)``; a ``None``
+    handler appends the text *arg*.  Adjacent text nodes are merged, closing
+    tags dropped and handlers looked up once.
+
+    >>> c = compile_nodes([('text', 'a'), ('text', 'b'), ('render_expression', '1')])
+    >>> c == [('text', 'a'), ('text', 'b'), ('render_expression', '1')], len(c.ops)
+    (True, 2)
+    """
+    out = CompiledNodes(nodes)
+    ops = []
+    text = []
+    skip = 0
+    for i, node in enumerate(out):
+        if skip > i:
+            continue
+        if isinstance(node, tuple) and node[0] == '#fetch':
+            skip = _fetch_group(out, i)
+            if skip > i:
+                if text:
+                    ops.append((None, "".join(text)))
+                    text = []
+                ops.append((PageQL._process_fetch_group, tuple(out[i:skip])))
+                continue
+        if isinstance(node, tuple) and node[0] == 'text':
+            text.append(node[1])
+            continue
+        if text:
+            ops.append((None, "".join(text)))
+            text = []
+        if isinstance(node, list):
+            for i in range(1, len(node)):
+                if isinstance(node[i], list):
+                    node[i] = compile_nodes(node[i])
+            if node[0] == '#from':
+                # rows may be streamed from the cursor unless the body writes
+                body = node[3] if isinstance(node[2], set) else node[2]
+                body.streamed = not _writes(body)
+                if body.streamed:
+                    assigned = _assigned(body, set())
+                    inner = (_inner_from(n, assigned) for n in body if isinstance(n, list) and n[0] == '#from')
+                    body.inner = tuple(i for i in inner if i is not None)
+            kind, arg = node[0], node
+        else:
+            kind, arg = node
+        if kind in _TYPED_HANDLERS:
+            ops.append((_typed_op(_TYPED_HANDLERS[kind], kind), arg))
+        elif kind in _NODE_HANDLERS:
+            ops.append((getattr(PageQL, _NODE_HANDLERS[kind]), arg))
+        elif not kind.startswith('/'):
+            # unknown directives raise when rendered, as in the interpreter
+            ops.append((PageQL.process_node, node))
+    if text:
+        ops.append((None, "".join(text)))
+    out.ops = ops
+    return out
+
 
 class PageQL:
     """
@@ -176,17 +606,21 @@ class PageQL:
         dialect: SQL dialect used by the connected database.
     """
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, sqlite_profile=None, cached_statements=DEFAULT_CACHED_STATEMENTS):
         """
         Initializes the PageQL engine instance.
 
         Args:
             db_path: Path to the SQLite database file or database URL.
+            sqlite_profile: Optional PRAGMA overrides for ``SQLITE_PROFILE``.
+            cached_statements: Size of the sqlite3 prepared statement cache.
         """
         self._modules = {} # Store parsed node lists here later
         self._parse_errors = {} # Store errors here
         self.tests = {}
         self._sources = {}
+        # Load-time optimization counts per module, see ``fold_constants``.
+        self.fold_stats = {}
         sqlite_file = None
         if not (
             db_path.startswith("postgres://")
@@ -196,21 +630,151 @@ class PageQL:
             sqlite_file = db_path
             if sqlite_file.startswith("sqlite://"):
                 sqlite_file = sqlite_file.split("://", 1)[1]
-        new_db = False
-        if sqlite_file is not None:
-            new_db = sqlite_file == ":memory:" or not os.path.exists(sqlite_file)
-        self.db, self.dialect = connect_database(db_path)
+        self.sqlite_file = sqlite_file
+        self.cached_statements = cached_statements
+        self.db, self.dialect = connect_database(db_path, cached_statements)
         set_log_level(self.db, "info")
-        if isinstance(self.db, sqlite3.Connection) and new_db:
+        self.sqlite_profile = None
+        if isinstance(self.db, sqlite3.Connection):
             # Configure SQLite for web server usage
             with self.db:
-                self.db.execute("PRAGMA journal_mode=WAL")
-                self.db.execute("PRAGMA synchronous=NORMAL")
-                self.db.execute("PRAGMA temp_store=MEMORY")
-                self.db.execute("PRAGMA cache_size=10000")
+                self.sqlite_profile = apply_sqlite_profile(self.db, sqlite_profile)
         self.tables = Tables(self.db, self.dialect)
         self._from_cache = {}
         self._attached = {}
+        # Optional ``PageCache`` of non-reactive GET pages and the per-module
+        # ``(ttl, param names, read only)`` rules it is keyed by.
+        self.page_cache = None
+        self._page_rules = {}
+        self.partial_cache = PageCache(PARTIAL_CACHE_SIZE, self.tables.versions)
+        # ``(tables, functions, outer)`` recorded by ``_track_reads``.
+        self._reads = None
+        # Connection whose open transactions readers must not cache around.
+        self.writer_db = self.db
+        # When True top level renders run inside savepoints and committing
+        # is left to the caller (see ``GroupCommit``).
+        self.group_commit = False
+        # ``HttpPool`` used by ``#fetch``; PageQLApp gives each app its own.
+        self.http_pool = http_pool
+        # Run ops compiled at load time; False uses the process_node interpreter.
+        self.compiled = True
+        # ``DbThread`` owning ``self.db``; async #fetch results are applied there.
+        self.executor = None
+
+    def _commit(self):
+        if not self.group_commit:
+            self.db.commit()
+
+    def reader(self):
+        """Return a copy sharing loaded modules but using a new ``query_only`` connection."""
+        if self.sqlite_file in (None, ":memory:"):
+            raise ValueError("reader() requires a file backed SQLite database")
+        r = copy.copy(self)
+        # state a render mutates is per reader; modules, rules and the page
+        # and partial caches (which lock) stay shared
+        r._reads = None
+        r.db = sqlite3.connect(self.sqlite_file, cached_statements=self.cached_statements, factory=StatsConnection)
+        set_statement_cache_size(r.db, self.cached_statements)
+        apply_sqlite_profile(r.db, self.sqlite_profile, skip=("journal_mode", "wal_autocheckpoint"))
+        r.db.execute("PRAGMA query_only=ON")
+        set_log_level(r.db, "info")
+        r.tables = Tables(r.db, self.dialect, self.tables.versions)
+        r._from_cache = {}
+        r._attached = {}
+        r.group_commit = False
+        r.executor = None
+        return r
+
+    def is_read_only(self, name, reactive=True):
+        """Return ``True`` if module *name* renders non-reactively without writes.
+
+        >>> r = PageQL(":memory:")
+        >>> r.load_module("a", "{%reactive off%}{{1}}")
+        >>> r.load_module("b", "{%reactive off%}{%insert into t values (1)%}")
+        >>> r.is_read_only("a"), r.is_read_only("b"), r.is_read_only("a/p")
+        (True, False, False)
+        """
+        rule = self._page_rules.get(name)
+        return rule is not None and rule[2][bool(reactive)]
+
+    def _scan_read_only(self, body, partials, reactive):
+        """Return ``True`` if *body* and *partials* render without writes,
+        for :meth:`is_read_only`, which looks the result up."""
+        if reactive:
+            first = next((n for n in body if n[0] not in ('text', '#cache')), None)
+            if first != ('#reactive', 'off'):
+                return False
+
+        def safe(nodes):
+            for n in nodes:
+                if n[0] in _WRITE_DIRECTIVES or n == ('#reactive', 'on'):
+                    return False
+                if isinstance(n, list) and not all(safe(p) for p in n[1:] if isinstance(p, list)):
+                    return False
+            return True
+
+        def safe_partials(parts):
+            return all(safe(v[-2]) and safe_partials(v[-1]) for v in parts.values())
+
+        return safe(body) and safe_partials(partials)
+
+    def is_streamable(self, name):
+        """Return ``True`` if module *name* can be flushed at ``#from`` rows.
+
+        The page needs a ``#from`` and must not set status, headers or cookies
+        once the first ``#from`` has started.  Pages using ``#render`` are
+        not streamed, as a partial may hold both.
+
+        >>> r = PageQL(":memory:")
+        >>> r.load_module("a", "{%header X 1%}{%from t%}{{x}}{%endfrom%}")
+        >>> r.load_module("b", "{%from t%}{{x}}{%endfrom%}{%statuscode 201%}")
+        >>> r.load_module("c", "{%render p%}{%from t%}{{x}}{%endfrom%}")
+        >>> r.is_streamable("a"), r.is_streamable("b"), r.is_streamable("c")
+        (True, False, False)
+        """
+        if name not in self._modules:
+            return False
+        seen_from = False
+
+        def safe(nodes):
+            nonlocal seen_from
+            for n in nodes:
+                # a rendered partial may both stream and set headers
+                if (seen_from and n[0] in _LATE_DIRECTIVES) or n[0] == '#render':
+                    return False
+                if isinstance(n, list):
+                    seen_from = seen_from or n[0] == '#from'
+                    if not all(safe(p) for p in n[1:] if isinstance(p, list)):
+                        return False
+            return True
+
+        return safe(self._modules[name][0]) and seen_from
+
+    def _page_cache_rule(self, name, body, source):
+        """Return ``(ttl, param names, read only)`` used to cache module *name*.
+
+        ``ttl`` comes from a top level ``{%cache <seconds>|off%}``: ``0``
+        disables caching and ``None`` keeps entries until their tables
+        change.  Pages calling volatile SQL functions such as ``random()``
+        are only cached with an explicit TTL.
+
+        >>> r = PageQL(":memory:")
+        >>> r.load_module("a", "{%cache 30%}{%reactive off%}{{:id}}")
+        >>> ttl, names, read_only = r._page_rules["a"]
+        >>> ttl, "id" in names, read_only
+        (30.0, True, {True: True, False: True})
+        """
+        ttl = None
+        for node in body:
+            if node[0] == '#cache':
+                arg = node[1].strip().lower()
+                try:
+                    ttl = 0 if arg == 'off' else float(arg)
+                except ValueError:
+                    raise ValueError(f"Invalid cache directive: {node[1]}")
+        names = frozenset(re.findall(r"\w+", source.lower()))
+        partials = self._modules[name][1]
+        return ttl, names, {r: self._scan_read_only(body, partials, r) for r in (True, False)}
 
     def load_module(self, name, source):
         """
@@ -244,29 +808,45 @@ class PageQL:
             del self.tests[name]
         if name in self._sources:
             del self._sources[name]
+        self.fold_stats.pop(name, None)
+        self._page_rules.pop(name, None)
+        if self.page_cache is not None:
+            self.page_cache.drop(name)
         # Tokenize the source and build AST
         try:
             tokens = tokenize(source)
             tests = {}
             body, partials = build_ast(tokens, self.dialect, tests)
-            body = add_reactive_elements(body)
+            stats = {}
+
+            def _optimize(nodes):
+                nodes = fold_constants(add_reactive_elements(nodes), self.db, stats, self.dialect)
+                return compile_nodes(nodes)
+
+            body = _optimize(body)
 
             def _apply(parts):
                 for k, v in parts.items():
                     if k[0] == ':':
-                        v[1] = add_reactive_elements(v[1])
+                        v[1] = _optimize(v[1])
                         _apply(v[2])
                     else:
-                        v[0] = add_reactive_elements(v[0])
+                        v[0] = _optimize(v[0])
                         _apply(v[1])
+                    part_body = v[1] if k[0] == ':' else v[0]
+                    if all(isinstance(n, tuple) and n[0] == 'text' for n in part_body):
+                        stats['static_partials'] = stats.get('static_partials', 0) + 1
 
             _apply(partials)
+            self.fold_stats[name] = stats
             self._modules[name] = [body, partials]
             self._sources[name] = source
+            self._page_rules[name] = self._page_cache_rule(name, body, source)
             if tests:
                 self.tests[name] = tests
         except Exception as e:
             print(f"Error parsing module {name}: {e}")
+            self._modules.pop(name, None)
             self._parse_errors[name] = e
         
 
@@ -286,9 +866,10 @@ class PageQL:
         Returns:
             The rendered content as a string
         """
-        partial_name_str, args_str = parsefirstword(node_content)
+        plan = node_content if type(node_content) is RenderPlan else plan_render(node_content, self.dialect)
+        partial_name_str, args = plan.name, plan.args
         partial_names = []
-        render_params = params.copy()
+        render_params = Scope(params) if isinstance(params, Scope) else params.copy()
         
         # Use uppercase HTTP verb for consistency
         if http_verb:
@@ -313,41 +894,21 @@ class PageQL:
             # Not found as an import, try all in local module
             partial_names = partial_name_str.split('/')
         
-        # Parse key=value expressions from args_str and update render_params
-        if args_str:
-            # Simple parsing: find key=, evaluate value expression until next key= or end
-            current_pos = 0
-            while current_pos < len(args_str):
-                args_part = args_str[current_pos:].lstrip()
-                if not args_part: break
-                eq_match = re.search(r"=", args_part)
-                if not eq_match: break # Malformed args
-
-                key = args_part[:eq_match.start()].strip()
-                if not key or not key.isidentifier(): break # Invalid key
-
-                value_start_pos = eq_match.end()
-                # Find where the value expression ends (before next ' key=' or end)
-                next_key_match = re.search(r"\s+[a-zA-Z_][a-zA-Z0-9_.]*\s*=", args_part[value_start_pos:])
-                value_end_pos = value_start_pos + next_key_match.start() if next_key_match else len(args_part)
-                value_expr = args_part[value_start_pos:value_end_pos].strip()
-                # Advance scanner position based on the slice we just processed
-                current_pos += value_end_pos
-
-                if value_expr:
-                    try:
-                        evaluated_value = evalone(
-                            self.db, value_expr, params, reactive, self.tables
-                        )
-                        if isinstance(evaluated_value, Signal) and ctx:
-                            ctx.add_dependency(evaluated_value)
-                        render_params[key] = evaluated_value
-                    except Exception as e:
-                        raise Exception(
-                            f"Warning: Error evaluating SQL expression `{value_expr}` for key `{key}` in #render: {e}"
-                        )
-                else:
-                    raise Exception(f"Warning: Empty value expression for key `{key}` in #render args")
+        # Evaluate key=value expressions from args_str into render_params
+        for key, value_expr in args:
+            if not value_expr:
+                raise Exception(f"Warning: Empty value expression for key `{key}` in #render args")
+            try:
+                evaluated_value = evalone(
+                    self.db, value_expr, params, reactive, self.tables
+                )
+                if isinstance(evaluated_value, Signal) and ctx:
+                    ctx.add_dependency(evaluated_value)
+                render_params[key] = evaluated_value
+            except Exception as e:
+                raise Exception(
+                    f"Warning: Error evaluating SQL expression `{value_expr}` for key `{key}` in #render: {e}"
+                )
 
         # Perform the recursive render call with the potentially modified parameters
         result = self.render(
@@ -549,10 +1110,9 @@ class PageQL:
         ctx.cookies.append((name, value, attrs))
         return reactive
 
-    def _process_fetch_directive(self, node_content, params, path, includes,
-                                 http_verb, reactive, ctx):
+    def _fetch_request(self, node_content, params, reactive):
+        """Evaluate a ``#fetch`` node into ``(url, headers, method, body, base_url)``."""
         var, expr, is_async, header_exprs, method_expr, body_expr = node_content
-        var = _normalize_param_name(var)
         url = evalone(self.db, expr, params, reactive, self.tables)
         if isinstance(url, Signal):
             url = url.value
@@ -612,9 +1172,16 @@ class PageQL:
                 req_body = req_body.value
             if isinstance(req_body, str):
                 req_body = req_body.encode()
+        return url, req_headers, method, req_body, base_url
+
+    def _process_fetch_directive(self, node_content, params, path, includes,
+                                 http_verb, reactive, ctx):
+        var, _expr, is_async = node_content[:3]
+        var = _normalize_param_name(var)
+        url, req_headers, method, req_body, base_url = self._fetch_request(node_content, params, reactive)
         # Commit any pending database changes so the fetch callback sees
         # a consistent view of the database before performing the HTTP request
-        self.db.commit()
+        self._commit()
         if is_async:
             body_sig = Signal(None)
             status_sig = Signal(None)
@@ -624,15 +1191,48 @@ class PageQL:
             params[f"{var}__headers"] = headers_sig
 
             async def do_fetch(url=url, b=body_sig, s=status_sig, h=headers_sig, headers=req_headers, meth=method, body=req_body, base=base_url):
-                data = await fetch(str(url), headers=headers, method=meth, body=body, base_url=base)
-                b.set_value(data.get("body"))
-                s.set_value(data.get("status_code"))
-                h.set_value(data.get("headers"))
+                data = await fetch(str(url), headers=headers, method=meth, body=body, base_url=base,
+                                   pool=self.http_pool)
+
+                def apply():
+                    b.set_value(data.get("body"))
+                    s.set_value(data.get("status_code"))
+                    h.set_value(data.get("headers"))
+
+                if self.executor is None:
+                    apply()
+                else:
+                    await self.executor.submit(apply)
 
             print(f"queued async fetch for {url}")
             tasks.append(do_fetch())
         else:
-            data = fetch_sync(str(url), headers=req_headers, method=method, body=req_body, base_url=base_url)
+            data = fetch_sync(str(url), headers=req_headers, method=method, body=req_body, base_url=base_url,
+                              pool=self.http_pool)
+            for k, v in flatten_params(data).items():
+                params[f"{var}__{k}"] = v
+        return reactive
+
+    def _process_fetch_group(self, nodes, params, path, includes,
+                             http_verb, reactive, ctx):
+        """Run independent synchronous ``#fetch`` nodes concurrently.
+
+        *nodes* holds the fetches and the text between them, see
+        :func:`compile_nodes`.  Requests are evaluated in order, then issued
+        together; each result is joined before the node after it renders.
+        """
+        requests = [self._fetch_request(n[1], params, reactive) for n in nodes if n[0] == '#fetch']
+        self._commit()
+        futures = [
+            _FETCH_POOL.submit(fetch_sync, str(url), headers=h, method=m, body=b, base_url=base, pool=self.http_pool)
+            for url, h, m, b, base in requests
+        ]
+        for node in nodes:
+            if node[0] == 'text':
+                ctx.out.append(node[1])
+                continue
+            data = futures.pop(0).result()
+            var = _normalize_param_name(node[1][0])
             for k, v in flatten_params(data).items():
                 params[f"{var}__{k}"] = v
         return reactive
@@ -645,6 +1245,7 @@ class PageQL:
     def _process_schema_directive(self, node_content, params, path, includes,
                                   http_verb, reactive, ctx, node_type):
         _run_sql(lambda sql, p: db_execute_dot(self.db, sql, p), node_type, node_content, params)
+        self.tables.invalidate()
         return reactive
 
     def _process_attach_directive(self, node_content, params, path, includes,
@@ -675,6 +1276,7 @@ class PageQL:
             params,
         )
         self._attached[alias] = db_path
+        self.tables.invalidate()
         return reactive
 
     def _process_import_directive(self, node_content, params, path, includes,
@@ -737,31 +1339,37 @@ class PageQL:
         if reactive and ctx:
             mid = ctx.marker_id()
             ctx.append_script(f"pstart({mid})")
+            key = _key_indexes(comp, col_names)
+            # last HTML sent for each keyed row, to patch updates in place
+            rendered = {} if key is not None else None
             for row in rows_all:
-                row_id = f"{mid}_{_row_hash(row)}"
+                row_id = _row_id(mid, row, key)
+                row_content = '<tr>' + ''.join(f'<td>{c}</td>' for c in row) + '</tr>'
+                if rendered is not None:
+                    rendered[row_id] = row_content
                 ctx.append_script(f"pstart('{row_id}')")
-                ctx.out.append("<tr>")
-                for cell in row:
-                    ctx.out.append("<td>" + str(cell) + "</td>")
-                ctx.out.append("</tr>")
+                ctx.out.append(row_content)
                 ctx.append_script(f"pend('{row_id}')")
             ctx.append_script(f"pend({mid})")
 
-            def on_event(ev, *, mid=mid, ctx=ctx):
+            def on_event(ev, *, mid=mid, ctx=ctx, key=key, rendered=rendered):
                 if ev[0] == 2:
-                    rid = f"{mid}_{_row_hash(ev[1])}"
+                    rid = _row_id(mid, ev[1], key)
+                    if rendered is not None:
+                        rendered.pop(rid, None)
                     ctx.append_script(f"pdelete('{rid}')")
                 elif ev[0] == 1:
-                    rid = f"{mid}_{_row_hash(ev[1])}"
+                    rid = _row_id(mid, ev[1], key)
                     row_content = '<tr>' + ''.join(f'<td>{c}</td>' for c in ev[1]) + '</tr>'
+                    if rendered is not None:
+                        rendered[rid] = row_content
                     safe_json = embed_html_in_js(row_content)
                     ctx.append_script(f"pinsert('{rid}',{safe_json})")
                 elif ev[0] == 3:
-                    old_id = f"{mid}_{_row_hash(ev[1])}"
-                    new_id = f"{mid}_{_row_hash(ev[2])}"
                     row_content = '<tr>' + ''.join(f'<td>{c}</td>' for c in ev[2]) + '</tr>'
-                    safe_json = embed_html_in_js(row_content)
-                    ctx.append_script(f"pupdate('{old_id}','{new_id}',{safe_json})")
+                    script = _update_script(mid, ev[1], ev[2], key, row_content, rendered)
+                    if script:
+                        ctx.append_script(script)
 
             ctx.add_listener(comp, on_event)
         else:
@@ -786,6 +1394,11 @@ class PageQL:
         ctx.out.append(highlight_block(source))
         return reactive
 
+    def _process_cache_directive(self, node_content, params, path, includes,
+                                 http_verb, reactive, ctx):
+        # Read by ``load_module``, see ``_page_cache_rule``.
+        return reactive
+
     def _process_reactiveelement_directive(self, node, params, path, includes,
                                            http_verb, reactive, ctx):
         prev = ctx.reactiveelement
@@ -878,19 +1491,26 @@ class PageQL:
                     mid = ctx.marker_id()
                     ctx.append_script(f"pstart({mid})")
 
-                    if idx is not None:
-                        reactive = self.process_nodes(bodies[idx], params, path, includes, http_verb, reactive, ctx)
+                    # the shown branch renders in its own scope, released
+                    # when the condition switches branches
+                    parent = ctx.scope
+                    with ctx.child_scope() as branch:
+                        if idx is not None:
+                            reactive = self.process_nodes(bodies[idx], params, path, includes, http_verb, reactive, ctx)
 
                     ctx.append_script(f"pend({mid})")
 
                     def listener(_=None, *, mid=mid, ctx=ctx):
+                        nonlocal branch
                         new_idx = pick_index()
                         buf = []
-                        if new_idx is not None:
-                            prev = ctx.rendering
-                            ctx.rendering = True
-                            self.process_nodes(bodies[new_idx], params, path, includes, http_verb, True, ctx, out=buf)
-                            ctx.rendering = prev
+                        branch.release()
+                        with ctx.child_scope(parent) as branch:
+                            if new_idx is not None:
+                                prev = ctx.rendering
+                                ctx.rendering = True
+                                self.process_nodes(bodies[new_idx], params, path, includes, http_verb, True, ctx, out=buf)
+                                ctx.rendering = prev
                         html_content = "".join(buf).strip()
                         safe_json = embed_html_in_js(html_content)
                         ctx.append_script(f"pset({mid},{safe_json})")
@@ -957,39 +1577,56 @@ class PageQL:
                 if cache_allowed:
                     self._from_cache[cache_key] = comp
             if infinite:
+                window = None if infinite is True else infinite
                 if isinstance(comp, Order):
                     limit = comp.limit if comp.limit is not None else 50
                     comp = Order(
                         comp.parent,
                         comp.order_sql,
-                        limit=limit,
+                        limit=min(limit, window or limit),
                         offset=getattr(comp, "offset", 0),
                     )
                 else:
-                    comp = Order(comp, "", limit=100)
-            if comp.sql is not None:
+                    comp = Order(comp, "", limit=min(100, window or 100))
+                comp.window = window
+            if comp.sql is not None and not isinstance(comp, Order):
                 try:
                     cursor = self.db.execute(comp.sql, converted_params)
                 except sqlite3.Error as e:
                     raise ValueError(
                         f"Error executing SQL `{comp.sql}`: {e}"
                     )
-                rows = cursor.fetchall()
+                rows = _fetch_batches(cursor) if getattr(body, 'streamed', False) else cursor.fetchall()
             else:
+                # Order keeps its current rows, no need to query them again
                 rows = list(comp.value)
             col_names = comp.columns if not isinstance(comp.columns, str) else [comp.columns]
         else:
-            cursor = db_execute_dot(self.db, "select * from " + query, params)
-            col_names = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
+            rows = None
+            pre = ctx.prefetched.get(id(node)) if ctx is not None and ctx.prefetched else None
+            if pre is not None:
+                key, col_names, found = pre
+                rows = found if key is None else found.get(_unwrap(params.get(key))[0])
+            if rows is None:
+                cursor = db_execute_dot(self.db, "select * from " + query, params)
+                col_names = [col[0] for col in cursor.description]
+                rows = _fetch_batches(cursor) if getattr(body, 'streamed', False) else cursor.fetchall()
         order_rows = list(rows) if reactive and isinstance(comp, Order) else None
         mid = None
         order_mid = None
+        key = None
         if ctx and reactive:
             mid = ctx.marker_id()
             ctx.append_script(f"pstart({mid})")
             if isinstance(comp, Order):
                 order_mid = ctx.marker_id()
+            else:
+                key = _key_indexes(comp, col_names)
+        # last HTML sent for each keyed row, to patch updates in place
+        rendered = {} if key is not None else None
+        # listener scopes of the rendered rows, released when a row goes away
+        row_scopes = {}
+        order_scopes = []
         saved_params = params.copy()
         extra_cache_key = ""
         if ctx and reactive:
@@ -1005,135 +1642,230 @@ class PageQL:
                         v = v.value
                     extra_cache_values[k] = v
                 extra_cache_key = json.dumps(extra_cache_values, sort_keys=True)
+        columns = {col_name: i for i, col_name in enumerate(col_names)}
+        inner = () if reactive or ctx is None else getattr(body, 'inner', ())
+        if inner:
+            rows = self._prefetch_inner(rows, inner, columns, saved_params, ctx)
         first = True
         for row in rows:
-            row_params = params.copy()
-            row_params["__first_row"] = ReadOnly(first)
+            row_params = Scope(saved_params, columns, row, {"__first_row": ReadOnly(first)})
             first = False
-            for i, col_name in enumerate(col_names):
-                row_params[col_name] = ReadOnly(row[i])
 
             row_buffer = []
-            self.process_nodes(body, row_params, path, includes, http_verb, reactive, ctx, out=row_buffer)
+            if ctx and reactive:
+                with ctx.child_scope() as row_scope:
+                    self.process_nodes(body, row_params, path, includes, http_verb, reactive, ctx, out=row_buffer)
+                if row_scope.empty():
+                    row_scope.release()
+                    row_scope = None
+            else:
+                self.process_nodes(body, row_params, path, includes, http_verb, reactive, ctx, out=row_buffer)
             row_content = ''.join(row_buffer).strip()
             if ctx and reactive:
                 if isinstance(comp, Order):
+                    order_scopes.append(row_scope)
                     ctx.append_script(f"pstart({order_mid})")
                     ctx.out.append(row_content)
                     ctx.append_script(f"pend({order_mid})")
                 else:
-                    row_id = f"{mid}_{_row_hash(row)}"
+                    row_id = _row_id(mid, row, key)
+                    if rendered is not None:
+                        rendered[row_id] = row_content
+                    if row_scope is not None:
+                        row_scopes.setdefault(row_id, []).append(row_scope)
                     ctx.append_script(f"pstart('{row_id}')")
                     ctx.out.append(row_content)
                     ctx.append_script(f"pend('{row_id}')")
             else:
                 ctx.out.append(row_content)
             ctx.out.append('\n')
+            ctx.maybe_flush()
 
         if ctx and reactive:
             ctx.append_script(f"pend({mid})")
             if len(node) > 4 and node[4]:
-                ctx.append_script(f"maybe_load_more(document.body, {mid})")
+                if comp.window is None:
+                    ctx.append_script(f"maybe_load_more(document.body, {mid})")
+                else:
+                    ctx.append_script(f"maybe_load_more(document.body, {mid}, 1)")
                 if not isinstance(comp, Order):
                     raise ValueError(f"Error: infinite_load_more: {comp.__class__.__name__}: {comp} not an Order")
                 else:
                     ctx.infinites[mid] = comp
 
+            def render_row(row, kind, *, parent=ctx.scope):
+                return self._render_row_body(
+                    body, Scope(saved_params, columns, row), path, includes,
+                    http_verb, ctx, parent, (id(comp), kind, extra_cache_key, tuple(row)),
+                )
+
+            def release(scopes, row_id):
+                scope = scopes.get(row_id)
+                if scope:
+                    scope.pop().release()
+                    if not scope:
+                        del scopes[row_id]
+
             def on_event(ev, *, mid=mid, ctx=ctx,
-                           body=body, col_names=col_names, path=path,
-                           includes=includes, http_verb=http_verb,
-                           saved_params=saved_params,
                            extra_cache_key=extra_cache_key,
                            order_rows=order_rows,
-                           order_mid=order_mid):
+                           order_mid=order_mid, key=key,
+                           rendered=rendered):
                 if isinstance(comp, Order):
                     if ev[0] == 2:
                         order_rows.pop(ev[1])
+                        scope = order_scopes.pop(ev[1])
+                        if scope is not None:
+                            scope.release()
                         ctx.append_script(f"orderdelete({order_mid},{ev[1]})")
                     elif ev[0] == 1:
                         idx, row = ev[1], ev[2]
                         order_rows.insert(idx, row)
-                        cache_key = (id(comp), 1, extra_cache_key, tuple(row))
-                        row_content = _ONEVENT_CACHE.get(cache_key)
-                        if row_content is None:
-                            row_params = saved_params.copy()
-                            for i, col_name in enumerate(col_names):
-                                row_params[col_name] = ReadOnly(row[i])
-                            row_buf = []
-                            prev = ctx.rendering
-                            ctx.rendering = True
-                            self.process_nodes(body, row_params, path, includes, http_verb, True, ctx, out=row_buf)
-                            ctx.rendering = prev
-                            row_content = ''.join(row_buf).strip()
-                            _ONEVENT_CACHE[cache_key] = row_content
+                        row_content, scope = render_row(row, 1)
+                        order_scopes.insert(idx, scope)
                         safe_json = embed_html_in_js(row_content)
                         ctx.append_script(f"orderinsert({order_mid},{idx},{safe_json})")
                     else:
                         old_idx, new_idx, row = ev[1], ev[2], ev[3]
                         order_rows.pop(old_idx)
                         order_rows.insert(new_idx, row)
-                        cache_key = (id(comp), 3, extra_cache_key, tuple(row))
-                        row_content = _ONEVENT_CACHE.get(cache_key)
-                        if row_content is None:
-                            row_params = saved_params.copy()
-                            for i, col_name in enumerate(col_names):
-                                row_params[col_name] = ReadOnly(row[i])
-                            row_buf = []
-                            prev = ctx.rendering
-                            ctx.rendering = True
-                            self.process_nodes(body, row_params, path, includes, http_verb, True, ctx, out=row_buf)
-                            ctx.rendering = prev
-                            row_content = ''.join(row_buf).strip()
-                            _ONEVENT_CACHE[cache_key] = row_content
+                        scope = order_scopes.pop(old_idx)
+                        if scope is not None:
+                            scope.release()
+                        row_content, scope = render_row(row, 3)
+                        order_scopes.insert(new_idx, scope)
                         safe_json = embed_html_in_js(row_content)
                         ctx.append_script(f"orderupdate({order_mid},{old_idx},{new_idx},{safe_json})")
                 else:
                     if ev[0] == 2:
-                        row_id = f"{mid}_{_row_hash(ev[1])}"
+                        row_id = _row_id(mid, ev[1], key)
+                        if rendered is not None:
+                            rendered.pop(row_id, None)
+                        release(row_scopes, row_id)
                         ctx.append_script(f"pdelete('{row_id}')")
                     elif ev[0] == 1:
-                        row_id = f"{mid}_{_row_hash(ev[1])}"
-                        cache_key = (id(comp), 1, extra_cache_key, tuple(ev[1]))
-                        row_content = _ONEVENT_CACHE.get(cache_key)
-                        if row_content is None:
-                            row_params = saved_params.copy()
-                            for i, col_name in enumerate(col_names):
-                                row_params[col_name] = ReadOnly(ev[1][i])
-                            row_buf = []
-                            prev = ctx.rendering
-                            ctx.rendering = True
-                            self.process_nodes(body, row_params, path, includes, http_verb, True, ctx, out=row_buf)
-                            ctx.rendering = prev
-                            row_content = ''.join(row_buf).strip()
-                            _ONEVENT_CACHE[cache_key] = row_content
+                        row_id = _row_id(mid, ev[1], key)
+                        row_content, scope = render_row(ev[1], 1)
+                        if scope is not None:
+                            row_scopes.setdefault(row_id, []).append(scope)
+                        if rendered is not None:
+                            rendered[row_id] = row_content
                         safe_json = embed_html_in_js(row_content)
                         ctx.append_script(f"pinsert('{row_id}',{safe_json})")
                     elif ev[0] == 3:
-                        old_id = f"{mid}_{_row_hash(ev[1])}"
-                        new_id = f"{mid}_{_row_hash(ev[2])}"
-                        cache_key = (id(comp), 3, extra_cache_key, tuple(ev[2]))
-                        row_content = _ONEVENT_CACHE.get(cache_key)
-                        if row_content is None:
-                            row_params = saved_params.copy()
-                            for i, col_name in enumerate(col_names):
-                                row_params[col_name] = ReadOnly(ev[2][i])
-                            row_buf = []
-                            #print("processing node for update", body)
-                            prev = ctx.rendering
-                            ctx.rendering = True
-                            self.process_nodes(body, row_params, path, includes, http_verb, True, ctx, out=row_buf)
-                            ctx.rendering = prev
-                            row_content = ''.join(row_buf).strip()
-                            _ONEVENT_CACHE[cache_key] = row_content
-                        safe_json = embed_html_in_js(row_content)
-                        ctx.append_script(f"pupdate('{old_id}','{new_id}',{safe_json})")
+                        release(row_scopes, _row_id(mid, ev[1], key))
+                        row_content, scope = render_row(ev[2], 3)
+                        if scope is not None:
+                            row_scopes.setdefault(_row_id(mid, ev[2], key), []).append(scope)
+                        script = _update_script(mid, ev[1], ev[2], key, row_content, rendered)
+                        if script:
+                            ctx.append_script(script)
 
             ctx.add_listener(comp, on_event)
 
-        params.clear()
-        params.update(saved_params)
         return reactive
 
+    def _render_row_body(self, body, params, path, includes, http_verb, ctx,
+                         parent, cache_key):
+        """Render a reactive ``#from`` row *body* for an update event.
+
+        Returns ``(html, scope)`` where *scope* holds the listeners the body
+        registered under *parent*, or ``None`` if it registered none.  Only
+        bodies without listeners are cached in ``_ONEVENT_CACHE``.
+        """
+        row_content = _ONEVENT_CACHE.get(cache_key)
+        if row_content is not None:
+            return row_content, None
+        row_buf = []
+        prev = ctx.rendering
+        ctx.rendering = True
+        with ctx.child_scope(parent) as scope:
+            self.process_nodes(body, params, path, includes, http_verb, True, ctx, out=row_buf)
+        ctx.rendering = prev
+        row_content = ''.join(row_buf).strip()
+        if not scope.empty():
+            return row_content, scope
+        scope.release()
+        _ONEVENT_CACHE[cache_key] = row_content
+        return row_content, None
+
+    def _process_memo_directive(self, node, params, path, includes,
+                                http_verb, reactive, ctx):
+        """Render the body of a ``#partial ... cache``, reusing earlier output.
+
+        Output is keyed by the values of the parameters the body can name and
+        kept in ``partial_cache`` until a table it read changes.  Reactive
+        renders aren't memoized because their output carries per-render
+        element ids; their signals are already shared through ``evalone``.
+        """
+        memo_id, names = node[1]
+        body = node[2]
+        key = None
+        if not reactive and ctx.stream is None and not self.writer_db.in_transaction:
+            key = _memo_key(memo_id, names, params, http_verb)
+        if key is None:
+            return self.process_nodes(body, params, path, includes, http_verb, reactive, ctx)
+        hit = self.partial_cache.get(key)
+        if hit is not None:
+            out, tables = hit
+            ctx.out.append(out)
+            if self._reads is not None:
+                # enclosing trackers (e.g. the page cache) depend on them too
+                self._reads[0].update(tables)
+            return reactive
+        snapshot = self.partial_cache.snapshot()
+        mark = len(ctx.out)
+        with self._track_reads() as (tables, funcs):
+            reactive = self.process_nodes(body, params, path, includes, http_verb, reactive, ctx)
+        if not funcs & VOLATILE_FUNCS:
+            self.partial_cache.put(key, ("".join(ctx.out[mark:]), frozenset(tables)), tables, snapshot)
+        return reactive
+
+    def _prefetch_inner(self, rows, inner, columns, params, ctx):
+        """Yield *rows*, loading the rows of nested ``#from`` blocks in bulk.
+
+        Nested queries that don't read the outer row run once; queries keyed
+        by an equality on an outer column run once per batch of outer rows
+        (see :func:`_inner_from`).  Results go to ``ctx.prefetched`` where
+        ``_process_from_directive`` picks them up.
+        """
+        outer = set(columns) | {"__first_row"}
+        invariant, keyed = [], []
+        for node, deps, key, sql in inner:
+            if not deps & outer:
+                invariant.append(node)
+            elif sql is not None and key in columns and self.dialect == "sqlite":
+                keyed.append((node, columns[key], key, sql))
+        if not invariant and not keyed:
+            yield from rows
+            return
+        prefetched = ctx.prefetched
+        saved = {id(n): prefetched.get(id(n)) for n in invariant + [k[0] for k in keyed]}
+        try:
+            it = iter(rows)
+            while True:
+                chunk = list(itertools.islice(it, FROM_BATCH_SIZE))
+                if not chunk:
+                    break
+                for node in invariant:
+                    cursor = db_execute_dot(self.db, "select * from " + node[1][0], params)
+                    prefetched[id(node)] = (None, [c[0] for c in cursor.description], cursor.fetchall())
+                invariant = ()
+                for node, i, key, sql in keyed:
+                    keys = list(dict.fromkeys(row[i] for row in chunk))
+                    cursor = self.db.execute(sql.format(keys=", ".join(["(?)"] * len(keys))), keys)
+                    found = {k: [] for k in keys}
+                    for row in cursor:
+                        found[row[0]].append(row[1:])
+                    prefetched[id(node)] = (key, [c[0] for c in cursor.description[1:]], found)
+                yield from chunk
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    prefetched.pop(k, None)
+                else:
+                    prefetched[k] = v
+
     def _process_each_directive(self, node, params, path, includes,
                                 http_verb, reactive, ctx):
         param_name = _normalize_param_name(node[1].strip())
@@ -1182,73 +1914,22 @@ class PageQL:
             None (output is appended to *out* or ctx.out)
         """
         if isinstance(node, tuple):
-            node_type, node_content = node
-            if node_type == 'text':
-                return self._process_text_node(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == 'render_expression':
-                return self._process_render_expression_node(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == 'render_param':
-                return self._process_render_param_node(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == 'render_raw':
-                return self._process_render_raw_node(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#param':
-                return self._process_param_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#let':
-                return self._process_let_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#render':
-                return self._process_render_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#reactive':
-                return self._process_reactive_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#redirect':
-                return self._process_redirect_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#error':
-                return self._process_error_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#statuscode':
-                return self._process_statuscode_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#respond':
-                return self._process_respond_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#header':
-                return self._process_header_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#cookie':
-                return self._process_cookie_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#fetch':
-                return self._process_fetch_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#attach':
-                return self._process_attach_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type in ('#update', '#insert', '#delete'):
-                return self._process_update_directive(node_content, params, path, includes, http_verb, reactive, ctx, node_type)
-            elif node_type in ('#create', '#merge'):
-                return self._process_schema_directive(node_content, params, path, includes, http_verb, reactive, ctx, node_type)
-            elif node_type == '#import':
-                return self._process_import_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#log':
-                return self._process_log_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#dump':
-                return self._process_dump_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            elif node_type == '#showsource':
-                return self._process_showsource_directive(node_content, params, path, includes, http_verb, reactive, ctx)
-            else:
-                if not node_type.startswith('/'):
-                    raise ValueError(format_unknown_directive(node_type))
-                return reactive
+            kind, arg = node
+            if kind == 'text':
+                return self._process_text_node(arg, params, path, includes, http_verb, reactive, ctx)
         elif isinstance(node, list):
-            directive = node[0]
-            if directive == '#reactiveelement':
-                return self._process_reactiveelement_directive(node, params, path, includes, http_verb, reactive, ctx)
-            elif directive == '#if':
-                return self._process_if_directive(node, params, path, includes, http_verb, reactive, ctx)
-            elif directive == '#ifdef':
-                return self._process_ifdef_directive(node, params, path, includes, http_verb, reactive, ctx)
-            elif directive == '#ifndef':
-                return self._process_ifndef_directive(node, params, path, includes, http_verb, reactive, ctx)
-            elif directive == '#from':
-                return self._process_from_directive(node, params, path, includes, http_verb, reactive, ctx)
-            elif directive == '#each':
-                return self._process_each_directive(node, params, path, includes, http_verb, reactive, ctx)
-            else:
-                if not directive.startswith('/'):
-                    raise ValueError(format_unknown_directive(directive))
-                return reactive
+            kind, arg = node[0], node
+        else:
+            return reactive
+        # same tables compile_nodes resolves handlers from
+        if kind in _TYPED_HANDLERS:
+            handler = getattr(self, _TYPED_HANDLERS[kind])
+            return handler(arg, params, path, includes, http_verb, reactive, ctx, kind)
+        if kind in _NODE_HANDLERS:
+            handler = getattr(self, _NODE_HANDLERS[kind])
+            return handler(arg, params, path, includes, http_verb, reactive, ctx)
+        if not kind.startswith('/'):
+            raise ValueError(format_unknown_directive(kind))
         return reactive
 
     def process_nodes(self, nodes, params, path, includes, http_verb=None, reactive=False, ctx=None, out=None):
@@ -1269,8 +1950,16 @@ class PageQL:
         if out is not None:
             ctx.out = out
 
-        for node in nodes:
-            reactive = self.process_node(node, params, path, includes, http_verb, reactive, ctx)
+        ops = getattr(nodes, "ops", None) if self.compiled else None
+        if ops is None:
+            for node in nodes:
+                reactive = self.process_node(node, params, path, includes, http_verb, reactive, ctx)
+        else:
+            for handler, arg in ops:
+                if handler is None:
+                    ctx.out.append(arg)
+                else:
+                    reactive = handler(self, arg, params, path, includes, http_verb, reactive, ctx)
         ctx.out = oldout
         return reactive
 
@@ -1284,18 +1973,112 @@ class PageQL:
         reactive=True,
         ctx=None,
         update_params: bool = False,
+        stream=None,
+        stream_threshold: int = 65536,
     ):
-        """Render a module synchronously."""
-        return self._render_impl(
-            path,
-            params,
-            partial,
-            http_verb,
-            in_render_directive,
-            reactive,
-            ctx,
-            update_params,
-        )
+        """Render a module synchronously.
+
+        In ``group_commit`` mode top level renders are wrapped in a savepoint
+        so a failing render only rolls back its own changes, and
+        ``result.changed`` tells whether it wrote anything.  The transaction
+        is left open for the caller to commit (``PageQLApp`` does so through
+        its ``GroupCommit``).  With *stream*
+        set, output is passed to ``stream(ctx, chunk)`` at ``#from`` row
+        boundaries and the result body only holds the remaining tail.
+        """
+        args = (path, params, partial, http_verb, in_render_directive, reactive, ctx, update_params,
+                stream, stream_threshold)
+        if not in_render_directive:
+            self.tables.check_schema()
+            # update_params callers (``_before`` modules) need the params the render sets
+            if self.page_cache is not None and ctx is None and stream is None and not update_params:
+                key = self._page_cache_key(path, params, partial, http_verb, reactive)
+                if key is not None:
+                    return self._render_cached(key, args)
+        if not self.group_commit or in_render_directive:
+            return self._render_impl(*args)
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN")
+        self.db.execute("SAVEPOINT pageql_render")
+        changes = self.db.total_changes
+        try:
+            result = self._render_impl(*args)
+        except BaseException:
+            self.db.execute("ROLLBACK TO pageql_render")
+            self.db.execute("RELEASE pageql_render")
+            raise
+        result.changed = self.db.total_changes != changes
+        self.db.execute("RELEASE pageql_render")
+        return result
+
+    def _page_cache_key(self, path, params, partial, http_verb, reactive):
+        """Return the ``page_cache`` key of a render or ``None`` if it can't be cached.
+
+        Only GETs of read-only modules are cached.  Request params are part
+        of the key if their name occurs anywhere in the module source.
+        """
+        name = path.strip('/')
+        rule = self._page_rules.get(name)
+        if (rule is None or rule[0] == 0 or not rule[2][bool(reactive)] or self.dialect != 'sqlite'
+                or (http_verb or '').upper() != 'GET'):
+            return None
+        names = rule[1]
+        flat = params.to_dict() if isinstance(params, Scope) else flatten_params(params)
+        key = (name, partial, bool(reactive), tuple(sorted(
+            (k, v) for k, v in flat.items() if k.split('__', 1)[0].lower() in names
+        )))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _render_cached(self, key, args):
+        """Serve a render from ``page_cache`` or render it while recording the tables it reads."""
+        cache = self.page_cache
+        hit = cache.get(key)
+        if hit is not None:
+            status, headers, body = hit
+            return RenderResult(status, list(headers), [], body)
+        snapshot = cache.snapshot()
+        if self.writer_db.in_transaction:
+            # Uncommitted writes may be visible here or missing on readers.
+            return self._render_impl(*args)
+        with self._track_reads() as (tables, funcs):
+            result = self._render_impl(*args)
+        ttl = self._page_rules[key[0]][0]
+        if (result.status_code == 200 and not result.cookies and not result.streamed
+                and (ttl is not None or not funcs & VOLATILE_FUNCS)):
+            cache.put(key, (result.status_code, tuple(result.headers), result.body), tables, snapshot, ttl)
+        return result
+
+    @contextlib.contextmanager
+    def _track_reads(self):
+        """Yield sets filled with the tables read and SQL functions called meanwhile.
+
+        Uses a SQLite authorizer; nested trackers also add to the outer sets.
+        """
+        outer = self._reads
+        self._reads = (set(), set(), outer)
+        if outer is None:
+            self.db.set_authorizer(self._authorize)
+        try:
+            yield self._reads[:2]
+        finally:
+            tables, funcs, _ = self._reads
+            self._reads = outer
+            if outer is None:
+                self.db.set_authorizer(None)
+            else:
+                outer[0].update(tables)
+                outer[1].update(funcs)
+
+    def _authorize(self, action, arg1, arg2, db, trigger):
+        if action == sqlite3.SQLITE_READ:
+            self._reads[0].add(table_version_key(arg1))
+        elif action == sqlite3.SQLITE_FUNCTION:
+            self._reads[1].add(arg2.lower())
+        return sqlite3.SQLITE_OK
 
     def _render_impl(
         self,
@@ -1307,6 +2090,8 @@ class PageQL:
         reactive=True,
         ctx=None,
         update_params: bool = False,
+        stream=None,
+        stream_threshold: int = 65536,
     ):
         """
         Renders a module using its parsed AST.
@@ -1326,7 +2111,7 @@ class PageQL:
         """
         module_name = path.strip('/')
         orig_params = params
-        params = flatten_params(params)
+        params = Scope(params) if isinstance(params, Scope) else flatten_params(params)
         if reactive:
             for k, v in list(params.items()):
                 if not isinstance(v, Signal):
@@ -1364,6 +2149,8 @@ class PageQL:
                 own_ctx = ctx is None
                 if own_ctx:
                     ctx = RenderContext()
+                    ctx.stream = stream
+                    ctx.stream_threshold = stream_threshold
                 includes = {None: module_name}  # Dictionary to track imported modules
                 module_body, partials = self._modules[module_name]
                 
@@ -1411,7 +2198,9 @@ class PageQL:
                     # Render the entire module
                     reactive = self.process_nodes(module_body, params, path, includes, http_verb, reactive, ctx)
 
-                result.body = "".join(ctx.out)
+                result.body = ctx.stream_tail() if ctx.streamed else "".join(ctx.out)
+                result.streamed = ctx.streamed
+                ctx.stream = None
                 ctx.clear_output()
 
                 # Store the render context so callers can keep it if needed
@@ -1431,9 +2220,9 @@ class PageQL:
                 result.status_code = 404
                 result.body = f"Module {original_module_name} not found"
         except RenderResultException as e:
-            self.db.commit()
+            self._commit()
             return e.render_result
-        self.db.commit()
+        self._commit()
         _ONEVENT_CACHE.clear()
         if update_params:
             orig_params.clear()
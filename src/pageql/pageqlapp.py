@@ -1,5 +1,6 @@
 import asyncio
 import os, time
+import threading
 import sqlite3
 import mimetypes
 import base64
@@ -10,63 +11,187 @@ from urllib.parse import urlparse, parse_qs
 from watchfiles import awatch
 import uuid
 import traceback
-from collections import defaultdict
+from collections import defaultdict, deque
 from collections.abc import Iterable
-from typing import Callable, Awaitable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 # Assuming pageql.py is in the same directory or Python path
 from . import pageql
-from .pageql import PageQL
-from .reactive import set_log_level
+from .pageql import PageQL, RenderResult
+from .render_context import coalesce_scripts, coalesce_stats
+from .reactive import set_log_level, statement_stats
 from .http_utils import (
     _http_get,
+    HttpPool,
     _read_chunked_body,
     _parse_cookies,
     _parse_form_data,
 )
 from .jws_utils import jws_serialize_compact, jws_deserialize_compact
 from .client_script import client_script
-from .database import flatten_params
-
-scripts_by_send: defaultdict = defaultdict(list)
-_idle_task: Optional[asyncio.Task] = None
-
-async def _flush_ws_scripts() -> None:
-    global scripts_by_send, _idle_task
-    await asyncio.sleep(0)
-    current = scripts_by_send
-    scripts_by_send = defaultdict(list)
-    _idle_task = None
-    async def _send_safe(send, text):
-        try:
-            await send({"type": "websocket.send", "text": text})
-        except Exception:
-            print(f"Failed to send websocket script: {text!r}")
-            traceback.print_exc()
+from .database import flatten_params, ReadPool, GroupCommit, Checkpointer, DbThread, PageCache
 
-    await asyncio.gather(
-        *(_send_safe(send, ";".join(scripts))
-          for send, scripts in current.items() if scripts),
-        return_exceptions=True,
-    )
-    if current:
-        print(f"_flush_ws_scripts sent {sum(len(s) for s in current.values())} scripts")
+# event loop serving the app; scripts queued from the DB thread hop back to it
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
 
+# Send all scripts queued for a websocket as one message instead of one each.
 BATCH_WS_SCRIPTS = False
 
-def queue_ws_script(send: Callable[[dict], Awaitable[None]], script: str, log_level: str = "info") -> None:
-    if not BATCH_WS_SCRIPTS:
-        if log_level == "debug":
-            print(f"queue_ws_script sending {script!r}")
-        asyncio.create_task(send({"type": "websocket.send", "text": script}))
-        return
+# Rows appended per ``infinite_load_more`` when the client sends no page
+# size hint, and the largest hint accepted.
+DEFAULT_LOAD_MORE = 100
+MAX_LOAD_MORE = 500
+
+# Outbound websocket queue limits in queued characters, see ``WsWriter``.
+WS_LOW_WATER = 1 << 18
+WS_HIGH_WATER = 1 << 20
+WS_RELOAD_WATER = 1 << 22
+# Seconds a single websocket send may take before the client is dropped.
+WS_SEND_TIMEOUT = 30.0
+# Characters a DB thread streaming render may have queued for a slow client
+# before it stops streaming and buffers the rest of the page.
+STREAM_QUEUE_LIMIT = 1 << 20
+
+
+def _schedule_flush(fn) -> None:
+    """Run *fn* on the next event loop iteration, so scripts queued by the
+    same batch of updates are coalesced into one websocket message."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        loop.call_soon(fn)
+    elif _main_loop is not None and not _main_loop.is_closed():
+        _main_loop.call_soon_threadsafe(fn)
+    else:
+        fn()
+
+
+class WsWriter:
+    """Ordered outbound script queue of one websocket.
+
+    A single task drains the queue in order.  Slow clients are handled in
+    steps: past ``high_water`` queued characters the backlog is coalesced
+    into one message and later scripts are appended to it until the queue
+    drains below ``low_water``; past ``reload_water`` the backlog is replaced
+    by a ``reload`` request and later scripts are dropped; a send taking
+    longer than ``send_timeout`` closes the connection.
+    """
+
+    def __init__(self, send, log_level="info", *, low_water=WS_LOW_WATER,
+                 high_water=WS_HIGH_WATER, reload_water=WS_RELOAD_WATER,
+                 send_timeout=WS_SEND_TIMEOUT):
+        self.send = send
+        self.log_level = log_level
+        self.low_water = low_water
+        self.high_water = high_water
+        self.reload_water = reload_water
+        self.send_timeout = send_timeout
+        self.queue: deque = deque()  # (text, time queued)
+        self.pending = 0  # characters queued or being sent
+        self._sending = 0  # characters being sent
+        self.state = "ok"  # "ok", "coalescing", "reloading" or "closed"
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.reloads = 0
+        self.max_depth = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def put(self, script: str) -> None:
+        """Queue *script* for sending; may be called from the DB thread."""
+        if _main_loop is not None and threading.current_thread() is not threading.main_thread():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                _main_loop.call_soon_threadsafe(self.put, script)
+                return
+        if self.state in ("reloading", "closed"):
+            return
+        if self.log_level == "debug":
+            print(f"WsWriter queued {script!r}")
+        now = time.perf_counter()
+        if self.state == "coalescing" and self.queue:
+            text, queued = self.queue[-1]
+            self.queue[-1] = (text + ";" + script, queued)
+            self.pending += len(script) + 1
+            self.coalesced += 1
+        else:
+            self.queue.append((script, now))
+            self.pending += len(script)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        if self.pending > self.reload_water:
+            self.state = "reloading"
+            self.reloads += 1
+            self.queue.clear()
+            self.queue.append(("reload", now))
+            self.pending = self._sending + len("reload")
+        elif self.pending > self.high_water and self.state == "ok":
+            # fewer, larger messages let a slow client catch up
+            self.state = "coalescing"
+            self.coalesced += len(self.queue) - 1
+            self.pending += len(self.queue) - 1
+            queued = self.queue[0][1]
+            self.queue = deque([(";".join(text for text, _ in self.queue), queued)])
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while self.queue and self.state != "closed":
+            if BATCH_WS_SCRIPTS and len(self.queue) > 1:
+                self.pending += len(self.queue) - 1
+                queued = self.queue[0][1]
+                self.queue = deque([(";".join(text for text, _ in self.queue), queued)])
+            text, queued = self.queue.popleft()
+            self._sending = len(text)
+            try:
+                await asyncio.wait_for(
+                    self.send({"type": "websocket.send", "text": text}), self.send_timeout
+                )
+            except asyncio.TimeoutError:
+                print(f"Closing websocket: send took over {self.send_timeout}s")
+                await self.close()
+                return
+            except Exception:
+                print(f"Failed to send websocket script: {text!r}")
+                traceback.print_exc()
+            latency = time.perf_counter() - queued
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            self.sent += 1
+            self.pending -= len(text)
+            self._sending = 0
+            if self.state == "coalescing" and self.pending <= self.low_water:
+                self.state = "ok"
+
+    def stop(self) -> None:
+        """Drop queued scripts and ignore new ones, e.g. after a disconnect."""
+        self.state = "closed"
+        self.queue.clear()
+        self.pending = 0
+
+    async def close(self) -> None:
+        """Drop queued scripts and close the websocket."""
+        self.stop()
+        try:
+            await asyncio.wait_for(self.send({"type": "websocket.close", "code": 1013}), 1)
+        except Exception:
+            pass
 
-    global _idle_task
-    scripts_by_send[send].append(script)
-    if log_level == "debug":
-        print(f"queue_ws_script queued {script!r}")
-    if _idle_task is None or _idle_task.done():
-        _idle_task = asyncio.create_task(_flush_ws_scripts())
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "depth": len(self.queue),
+            "pending": self.pending,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "reloads": self.reloads,
+            "avg_latency_ms": self._latency_total * 1000 / self.sent if self.sent else 0.0,
+            "max_latency_ms": self._latency_max * 1000,
+        }
 
 
 def run_tasks(log_level: str = "info") -> None:
@@ -139,6 +264,41 @@ class PageQLApp:
     csrf_protect : bool, optional
         Enable CSRF protection on state-changing requests.
         Pass ``--no-csrf`` on the command line to disable.
+    read_pool_size : int, optional
+        Number of threads rendering non-reactive, read-only GET pages on
+        their own ``query_only`` connections. ``0`` disables the pool.
+    read_pool_queue : int, optional
+        Maximum number of renders waiting for a pool thread before requests
+        fall back to the main connection.
+    group_commit_window : float, optional
+        Seconds during which writes of different requests share one commit.
+        Responses are sent after the commit. ``0`` commits every request.
+        Code calling ``pageql_engine.render`` directly while this is set
+        must commit its writes itself (see ``RenderResult.changed``).
+    group_commit_batch : int, optional
+        Commit early once this many write requests are waiting.
+    sqlite_profile : dict, optional
+        PRAGMA overrides (``mmap_size``, ``cache_size``, ``busy_timeout``,
+        ``wal_autocheckpoint``, ``temp_store``...) for ``SQLITE_PROFILE``.
+    cached_statements : int, optional
+        Size of the sqlite3 prepared statement cache per connection.
+    checkpoint_interval : float, optional
+        When set, disable inline WAL auto-checkpoints and run passive
+        checkpoints every *checkpoint_interval* seconds while idle.
+    stream_threshold : int, optional
+        Stream read-only pages rendered on the read pool, flushing at
+        ``#from`` rows once this many characters are buffered.  ``0``
+        buffers whole responses.
+    db_thread : bool, optional
+        Run renders and all other work on the main connection on a
+        dedicated thread so the event loop stays responsive.  GET pages
+        are then streamed too when ``stream_threshold`` is set.
+    http_cache_size : int, optional
+        Cache up to this many GET responses from ``#fetch`` and
+        ``fallback_url`` requests according to ``Cache-Control``/``ETag``.
+    page_cache_size : int, optional
+        Cache up to this many rendered GET pages of read-only modules until
+        a table they read is written.  ``0`` disables the cache.
     """
     def __init__(
         self,
@@ -154,6 +314,17 @@ class PageQLApp:
         csrf_protect: bool = True,
         http_disconnect_cleanup_timeout: float = 10.0,
         static_html: bool = False,
+        read_pool_size: int = 0,
+        read_pool_queue: int = 64,
+        group_commit_window: float = 0,
+        group_commit_batch: int = 32,
+        sqlite_profile: Optional[dict] = None,
+        cached_statements: Optional[int] = None,
+        checkpoint_interval: float = 0,
+        stream_threshold: int = 0,
+        db_thread: bool = False,
+        http_cache_size: int = 0,
+        page_cache_size: int = 0,
     ):
         self.stop_event = None
         self.notifies = []
@@ -166,6 +337,8 @@ class PageQLApp:
         self.before_all_hooks = []
         self.render_contexts = defaultdict(list)
         self.websockets = {}
+        # client id -> WsWriter queueing scripts for its websocket
+        self.ws_writers = {}
         self._body_waiters = {}
         self.template_dir = template_dir
         self.quiet = quiet
@@ -175,8 +348,91 @@ class PageQLApp:
         self.csrf_protect = csrf_protect
         self.http_disconnect_cleanup_timeout = http_disconnect_cleanup_timeout
         self.static_html = static_html
+        self.read_pool = None
+        self.group_commit = None
+        self.checkpointer = None
+        self.sqlite_profile = sqlite_profile
+        self.cached_statements = cached_statements
+        self._active_requests = 0
+        self.stream_threshold = stream_threshold
+        self.db_thread = None
+        # outgoing requests of this app, with its own connections and cache
+        self.http_pool = HttpPool(cache_size=http_cache_size)
         self.load_builtin_static()
         self.prepare_server(db_path, template_dir, create_db)
+        self.pageql_engine.http_pool = self.http_pool
+        if page_cache_size:
+            engine = self.pageql_engine
+            engine.page_cache = PageCache(page_cache_size, engine.tables.versions)
+        if db_thread:
+            self.db_thread = DbThread()
+            self.pageql_engine.executor = self.db_thread
+            self._log("Renders run on the pageql-db thread")
+        executor = self.db_thread.executor if self.db_thread else None
+        if read_pool_size and self.pageql_engine.sqlite_file not in (None, ":memory:"):
+            self.read_pool = ReadPool(self._make_reader, read_pool_size, read_pool_queue)
+            self._log(f"Read pool: {read_pool_size} threads, queue depth {read_pool_queue}")
+        if group_commit_window and self.pageql_engine.dialect == "sqlite":
+            self.group_commit = GroupCommit(self.conn, group_commit_window, group_commit_batch, executor)
+            self.pageql_engine.group_commit = True
+        if checkpoint_interval and self.pageql_engine.sqlite_file not in (None, ":memory:"):
+            self.conn.execute("PRAGMA wal_autocheckpoint=0")
+            self.checkpointer = Checkpointer(
+                self.conn, checkpoint_interval, lambda: self._active_requests == 0, executor=executor,
+                on_error=self._error,
+            )
+
+    def _make_reader(self):
+        engine = self.pageql_engine.reader()
+        set_log_level(engine.db, self.log_level)
+        self._register_functions(engine.db)
+        return engine
+
+    async def _db(self, fn, *args):
+        """Run ``fn(*args)`` on the DB thread if there is one, else inline."""
+        if self.db_thread is None:
+            return fn(*args)
+        global _main_loop
+        _main_loop = asyncio.get_running_loop()
+        return await self.db_thread.submit(fn, *args)
+
+    async def _render_main(self, path_cleaned, params, method):
+        """Render *path_cleaned*, using the read pool when the page allows it."""
+        engine = self.pageql_engine
+        if self.read_pool and method == 'GET' and engine.is_read_only(path_cleaned, self.reactive_default):
+            fut = self.read_pool.submit(
+                lambda eng: eng.render(path_cleaned, params, None, method, reactive=self.reactive_default)
+            )
+            if fut is not None:
+                return await fut
+        return await self._db(
+            lambda: engine.render(path_cleaned, params, None, method, reactive=self.reactive_default)
+        )
+
+    def stats(self):
+        """Return runtime statistics for the app's pools and queues."""
+        return {
+            "read_pool": self.read_pool.stats() if self.read_pool else None,
+            "group_commit": self.group_commit.stats() if self.group_commit else None,
+            "checkpoint": self.checkpointer.stats() if self.checkpointer else None,
+            "db_thread": self.db_thread.stats() if self.db_thread else None,
+            "statements": statement_stats(self.conn),
+            "http": self.http_pool.stats(),
+            "page_cache": self.pageql_engine.page_cache.stats() if self.pageql_engine.page_cache else None,
+            "partial_cache": self.pageql_engine.partial_cache.stats(),
+            "websockets": {cid: w.stats() for cid, w in self.ws_writers.items()},
+            "coalescing": coalesce_stats(),
+        }
+
+    def _ws_writer(self, client_id):
+        """Return the outbound queue of *client_id*'s websocket, if connected."""
+        send = self.websockets.get(client_id)
+        if send is None:
+            return None
+        writer = self.ws_writers.get(client_id)
+        if writer is None or writer.send is not send:
+            writer = self.ws_writers[client_id] = WsWriter(send, self.log_level)
+        return writer
 
     def _log(self, msg):
         if not self.quiet:
@@ -328,16 +584,15 @@ class PageQLApp:
             client_id = qs[b"clientId"][0].decode()
             self._log(f"Client connected with id: {client_id}")
             self.websockets[client_id] = send
-
-            def sender(sc, send=send):
-                queue_ws_script(send, sc, self.log_level)
+            writer = self._ws_writer(client_id)
 
             for ctx in self.render_contexts.get(client_id, []):
-                ctx.send_script = sender
-                scripts = list(ctx.scripts)
+                ctx.send_script = writer.put
+                ctx.schedule_flush = _schedule_flush
+                scripts = coalesce_scripts(ctx.scripts)
                 ctx.scripts.clear()
-                for sc in scripts:
-                    queue_ws_script(send, sc, self.log_level)
+                if scripts:
+                    writer.put(";".join(scripts))
         fut = asyncio.Event()
         self.notifies.append(fut)
         receive_task = asyncio.create_task(receive())
@@ -356,18 +611,30 @@ class PageQLApp:
                             fut_waiter.set_result(result.get("text", ""))
                     if client_id:
                         text = result.get("text", "")
-                        if text.startswith("infinite_load_more"):
+                        if text.startswith("infinite_window"):
+                            # "infinite_window <mid> <first visible row> <visible rows>"
+                            try:
+                                mid, first, visible = (int(p) for p in text.split()[1:])
+                            except ValueError:
+                                mid = None
+                                print(f"Error: infinite_window: {client_id} invalid message '{text}'")
+                            if mid is not None:
+                                for ctx in self.render_contexts.get(client_id, []):
+                                    comp = ctx.infinites.get(mid)
+                                    if comp is not None and comp.window:
+                                        await self._db(comp.move_window, max(first, 0), max(visible, 1))
+                        elif text.startswith("infinite_load_more"):
+                            # "infinite_load_more <mid> [page size hint]"
                             try:
-                                mid = int(text.split()[1])
+                                mid, *hint = (int(p) for p in text.split()[1:3])
+                                page_size = min(max(hint[0], 1), MAX_LOAD_MORE) if hint else DEFAULT_LOAD_MORE
                             except Exception:
                                 mid = None
                                 err = (
                                     f"Error: infinite_load_more: {client_id} invalid message '{text}'"
                                 )
                                 print(err)
-                                queue_ws_script(
-                                    send, f"console.error({json.dumps(err)})", self.log_level
-                                )
+                                writer.put(f"console.error({json.dumps(err)})")
                             if self.log_level == "debug":
                                 print(f"infinite_load_more: {client_id} mid: {mid}")
                             if mid is not None:
@@ -378,23 +645,15 @@ class PageQLApp:
                                             f"Error: infinite_load_more: {client_id} mid: {mid} not found, possible infinites: {ctx.infinites.keys()}"
                                         )
                                         print(err)
-                                        queue_ws_script(
-                                            send,
-                                            f"console.error({json.dumps(err)})",
-                                            self.log_level,
-                                        )
+                                        writer.put(f"console.error({json.dumps(err)})")
                                         continue
                                     if comp is not None and comp.limit is not None:
                                         if self.log_level == "debug":
                                             print(
-                                                f"infinite_load_more set_limit: {client_id} mid: {mid} limit: {comp.limit}"
+                                                f"infinite_load_more load_more: {client_id} mid: {mid} limit: {comp.limit} page_size: {page_size}"
                                             )
-                                        comp.set_limit(comp.limit + 100)
-                                        queue_ws_script(
-                                            send,
-                                            f"maybe_load_more(document.body, {mid})",
-                                            self.log_level,
-                                        )
+                                        await self._db(comp.load_more, page_size)
+                                        writer.put(f"maybe_load_more(document.body, {mid})")
                     receive_task = asyncio.create_task(receive())
                     continue
                 if isinstance(result, dict) and result.get("type") == "websocket.disconnect":
@@ -407,8 +666,10 @@ class PageQLApp:
                             )
                         for ctx in contexts:
                             ctx.send_script = None
-                            ctx.cleanup()
-                        scripts_by_send.pop(send, None)
+                            await self._db(ctx.cleanup)
+                        writer.stop()
+                        if self.ws_writers.get(client_id) is writer:
+                            del self.ws_writers[client_id]
                     return
                 elif result is True:
                     await send({"type": "websocket.send", "text": "reload"})
@@ -433,7 +694,7 @@ class PageQLApp:
                     contexts = self.render_contexts.pop(client_id, [])
                     for ctx in contexts:
                         ctx.send_script = None
-                        ctx.cleanup()
+                        await self._db(ctx.cleanup)
 
             asyncio.create_task(cleanup_later())
 
@@ -465,39 +726,159 @@ class PageQLApp:
             await send({'type': 'http.response.body', 'body': result.body.encode('utf-8')})
             self._log(f"Redirecting to: {result.redirect_to} (Status: {result.status_code})")
         else:
-            headers = []
-            content_type = None
-            for name, value in result.headers:
-                if name.lower() == 'content-type':
-                    content_type = value
-                    continue
-                headers.append((str(name).encode('utf-8'), str(value).encode('utf-8')))
-
-            if content_type is None:
-                content_type = 'text/html; charset=utf-8'
-            headers.insert(0, (b'Content-Type', str(content_type).encode('utf-8')))
-
-            for name, value, opts in result.cookies:
-                parts = [f"{name}={value}"]
-                for k, v in opts.items():
-                    parts.append(k if v is True else f"{k}={v}")
-                headers.append((b'Set-Cookie', '; '.join(parts).encode('utf-8')))
-
+            content_type, headers = self._response_headers(result.headers, result.cookies)
             await send({'type': 'http.response.start', 'status': result.status_code, 'headers': headers})
+            prefix, suffix = self._body_wrap(result.body, content_type, include_scripts, client_id)
+            await send({'type': 'http.response.body', 'body': (prefix + result.body + suffix).encode('utf-8')})
+
+    def _response_headers(self, result_headers, cookies):
+        """Return ``(content_type, headers)`` for a rendered page."""
+        headers = []
+        content_type = None
+        for name, value in result_headers:
+            if name.lower() == 'content-type':
+                content_type = value
+                continue
+            headers.append((str(name).encode('utf-8'), str(value).encode('utf-8')))
+
+        if content_type is None:
+            content_type = 'text/html; charset=utf-8'
+        headers.insert(0, (b'Content-Type', str(content_type).encode('utf-8')))
+
+        for name, value, opts in cookies:
+            parts = [f"{name}={value}"]
+            for k, v in opts.items():
+                parts.append(k if v is True else f"{k}={v}")
+            headers.append((b'Set-Cookie', '; '.join(parts).encode('utf-8')))
+        return content_type, headers
+
+    def _body_wrap(self, body, content_type, include_scripts, client_id):
+        """Return the ``(prefix, suffix)`` placed around an HTML *body*."""
+        if not content_type.lower().startswith('text/html'):
+            return '', ''
+        prefix = client_script(client_id) if include_scripts else ''
+        suffix = ''
+        low = body.lower()
+        if '<body' not in low:
+            prefix, suffix = '<body>' + prefix, suffix + '</body>'
+        if '<html' not in low:
+            prefix, suffix = '<html>' + prefix, suffix + '</html>'
+        return prefix, suffix
+
+    async def _render_streaming(self, path_cleaned, params, method, include_scripts, client_id, send,
+                                before_headers=(), before_cookies=()):
+        """Render off the event loop, sending chunks while ``#from`` rows render.
+
+        Read-only pages use the read pool, others the DB thread.  Returns
+        ``None`` when neither can take the render.  When ``result.streamed``
+        is set the response has started and only ``result.body`` is left to
+        send, followed by ``result.suffix``.  Read pool workers wait for a
+        slow client to drain chunks; the DB thread never does, so other
+        renders and writes are not held up.  Once ``STREAM_QUEUE_LIMIT``
+        characters wait there, the rest of the page is rendered buffered.
+        """
+        loop = asyncio.get_running_loop()
+        queue = None
+        closed = False
+        queued = 0  # characters queued by the DB thread and not yet sent
+        queued_lock = threading.Lock()
+
+        def stream(ctx, chunk):
+            nonlocal queued
+            if closed:
+                raise ConnectionError("client went away during streaming render")
+            item = (list(before_headers) + ctx.headers, list(before_cookies) + ctx.cookies, chunk)
+            if queue.maxsize:
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+                return
+            with queued_lock:
+                queued += len(chunk)
+                if queued > STREAM_QUEUE_LIMIT:
+                    ctx.stream = None
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def render(engine):
+            return engine.render(path_cleaned, params, None, method, reactive=self.reactive_default,
+                                 stream=stream, stream_threshold=self.stream_threshold)
+
+        fut = None
+        if self.read_pool and self.pageql_engine.is_read_only(path_cleaned, self.reactive_default):
+            queue = asyncio.Queue(maxsize=4)
+            fut = self.read_pool.submit(render)
+        if fut is None and self.db_thread and not self.group_commit:
+            queue = asyncio.Queue()  # bounded by STREAM_QUEUE_LIMIT
+            global _main_loop
+            _main_loop = loop
+            fut = self.db_thread.submit(render, self.pageql_engine)
+        if fut is None:
+            return None
+        task = asyncio.ensure_future(fut)
+        suffix = None
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    if queue.empty():
+                        break
+                    item = queue.get_nowait()
+                else:
+                    item = getter.result()
+                headers, cookies, chunk = item
+                if suffix is None:
+                    content_type, start_headers = self._response_headers(headers, cookies)
+                    await send({'type': 'http.response.start', 'status': 200, 'headers': start_headers})
+                    prefix, suffix = self._body_wrap(chunk, content_type, include_scripts, client_id)
+                    chunk = prefix + chunk
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+                with queued_lock:
+                    queued -= len(item[2])
+        finally:
+            closed = True
+            while not task.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.wait({task}, timeout=0.01)
+        try:
+            result = task.result()
+        except Exception as e:
+            if suffix is None:
+                raise
+            # the status line is gone already, so just end the body
+            self._error(f"ERROR: Streaming render failed: {e}")
+            result = RenderResult()
+            result.streamed = True
+        result.suffix = suffix or ''
+        return result
 
-            is_html = content_type.lower().startswith('text/html')
-            scripts = client_script(client_id) if include_scripts and is_html else ''
-            body_content = scripts + result.body
-            if is_html:
-                low = result.body.lower()
-                if '<body' not in low:
-                    body_content = '<body>' + body_content + '</body>'
-                if '<html' not in low:
-                    body_content = '<html>' + body_content + '</html>'
+    async def _render_and_send(self, parsed_path, path_cleaned, params, include_scripts, client_id, method, scope, receive, send):
+        gc = self.group_commit
+        if gc is None:
+            return await self._render_and_send_now(parsed_path, path_cleaned, params, include_scripts, client_id, method, scope, receive, send)
+        held = []
 
-            await send({'type': 'http.response.body', 'body': body_content.encode('utf-8')})
+        async def hold(msg):
+            held.append(msg)
 
-    async def _render_and_send(self, parsed_path, path_cleaned, params, include_scripts, client_id, method, scope, receive, send):
+        changed = []
+        client_id = await self._render_and_send_now(parsed_path, path_cleaned, params, include_scripts, client_id, method, scope, receive, hold, changed)
+        try:
+            await gc.wait(any(changed))
+        except sqlite3.Error as e:
+            self._error(f"ERROR: Group commit failed: {e}")
+            held = [
+                {'type': 'http.response.start', 'status': 500, 'headers': [(b'content-type', b'text/plain')]},
+                {'type': 'http.response.body', 'body': f"Database Error: {e}".encode('utf-8')},
+            ]
+        for msg in held:
+            await send(msg)
+        return client_id
+
+    async def _render_and_send_now(self, parsed_path, path_cleaned, params, include_scripts, client_id, method, scope, receive, send,
+                                   changed=None):
+        """Render and send the response; ``result.changed`` of each render is
+        appended to *changed* when given."""
         try:
             t = time.time()
             params = _expand_array_params(params)
@@ -506,15 +887,17 @@ class PageQLApp:
             before_headers = []
             before_cookies = []
             for bmod in self._collect_before_modules(path_cleaned):
-                before_result = self.pageql_engine.render(
+                before_result = await self._db(lambda bmod=bmod: self.pageql_engine.render(
                     bmod,
                     params,
                     None,
                     method,
                     reactive=self.reactive_default,
                     update_params=True,
-                )
+                ))
                 run_tasks(self.log_level)
+                if changed is not None:
+                    changed.append(before_result.changed)
                 before_headers.extend(before_result.headers)
                 before_cookies.extend(before_result.cookies)
                 if before_result.status_code != 200:
@@ -523,14 +906,17 @@ class PageQLApp:
             if path in self.before_hooks:
                 self._log(f"Before hook for {path}")
                 await self.before_hooks[path](params)
-            result = self.pageql_engine.render(
-                path_cleaned,
-                params,
-                None,
-                method,
-                reactive=self.reactive_default,
-            )
+            result = None
+            if self.stream_threshold and method == 'GET' and self.pageql_engine.is_streamable(path_cleaned):
+                result = await self._render_streaming(
+                    path_cleaned, params, method, include_scripts, client_id, send,
+                    before_headers, before_cookies,
+                )
+            if result is None:
+                result = await self._render_main(path_cleaned, params, method)
             run_tasks(self.log_level)
+            if changed is not None:
+                changed.append(result.changed)
 
             if result.status_code == 404:
                 if self.fallback_app is not None:
@@ -541,22 +927,24 @@ class PageQLApp:
                     if scope.get('query_string'):
                         qs = scope['query_string'].decode()
                         url += '?' + qs
-                    status, headers, body = await _http_get(url)
+                    status, headers, body = await _http_get(url, pool=self.http_pool)
                     await send({'type': 'http.response.start', 'status': status, 'headers': headers})
                     await send({'type': 'http.response.body', 'body': body})
                     return None
 
             if client_id and result.context is not None:
                 self.render_contexts[client_id].append(result.context)
-                ws = self.websockets.get(client_id)
-                if ws:
-                    def sender(sc, send=ws):
-                        queue_ws_script(send, sc, self.log_level)
-
-                    result.context.send_script = sender
+                writer = self._ws_writer(client_id)
+                if writer:
+                    result.context.send_script = writer.put
+                    result.context.schedule_flush = _schedule_flush
             self._log(f"{method} {path_cleaned} ({(time.time() - t) * 1000:.2f} ms)")
             self._log(f"Result: {result.status_code} {result.redirect_to} {result.headers}")
 
+            if result.streamed:
+                await send({'type': 'http.response.body', 'body': (result.body + result.suffix).encode('utf-8')})
+                return client_id
+
             if before_headers or before_cookies:
                 result.headers = before_headers + result.headers
                 result.cookies = before_cookies + result.cookies
@@ -584,7 +972,7 @@ class PageQLApp:
                 if scope.get('query_string'):
                     qs = scope['query_string'].decode()
                     url += '?' + qs
-                status, headers, body = await _http_get(url)
+                status, headers, body = await _http_get(url, pool=self.http_pool)
                 await send({'type': 'http.response.start', 'status': status, 'headers': headers})
                 await send({'type': 'http.response.body', 'body': body})
                 return None
@@ -606,7 +994,7 @@ class PageQLApp:
 
         while self.to_reload:
             f = self.to_reload.pop()
-            self.load(self.template_dir, f)
+            await self._db(self.load, self.template_dir, f)
 
         parsed_path = urlparse(scope['path'])
         path_cleaned = parsed_path.path.strip('/') or 'index'
@@ -696,9 +1084,19 @@ class PageQLApp:
             if message["type"] == "lifespan.startup":
                 if self.should_reload:
                     asyncio.create_task(self.watch_directory(self.template_dir, self.stop_event))
+                if self.checkpointer:
+                    self._checkpoint_task = asyncio.create_task(self.checkpointer.run())
                 await send({"type": "lifespan.startup.complete"})
 
             elif message["type"] == "lifespan.shutdown":
+                if self.checkpointer:
+                    self._checkpoint_task.cancel()
+                if self.read_pool:
+                    self.read_pool.close()
+                if self.group_commit:
+                    self.group_commit.flush()
+                if self.db_thread:
+                    self.db_thread.close()
                 if self.pageql_engine and self.pageql_engine.db:
                     self.pageql_engine.db.close()
                 for n in self.notifies:
@@ -707,6 +1105,36 @@ class PageQLApp:
                 await send({"type": "lifespan.shutdown.complete"})
                 break
         
+    def _register_functions(self, conn):
+        """Register PageQL's SQL helper functions on *conn*."""
+        try:
+            conn.create_function(
+                "base64_encode", 1,
+                lambda blob: base64.b64encode(blob).decode("utf-8") if blob is not None else None,
+            )
+            conn.create_function(
+                "base64_decode", 1,
+                lambda txt: base64.b64decode(txt).decode("utf-8") if txt is not None else None,
+            )
+            conn.create_function(
+                "jws_serialize_compact", 1,
+                lambda payload: jws_serialize_compact(payload),
+            )
+            conn.create_function(
+                "jws_deserialize_compact", 1,
+                lambda token: jws_deserialize_compact(token),
+            )
+            conn.create_function(
+                "query_param", 2,
+                _query_param,
+            )
+            conn.create_function(
+                "html_escape", 1,
+                lambda txt: html.escape(str(txt)) if txt is not None else None,
+            )
+        except Exception as e:
+            self._log(f"Warning: could not register base64_encode: {e}")
+
     def prepare_server(self, db_path, template_dir, create_db):
         """Loads templates and starts the HTTP server."""
         self.stop_event = asyncio.Event()
@@ -738,36 +1166,11 @@ class PageQLApp:
         self._log(f"Loading database from: {db_path}")
 
         try:
-            self.pageql_engine = PageQL(db_path)
+            engine_kwargs = {"cached_statements": self.cached_statements} if self.cached_statements else {}
+            self.pageql_engine = PageQL(db_path, self.sqlite_profile, **engine_kwargs)
             self.conn = self.pageql_engine.db
             set_log_level(self.conn, self.log_level)
-            try:
-                self.conn.create_function(
-                    "base64_encode", 1,
-                    lambda blob: base64.b64encode(blob).decode("utf-8") if blob is not None else None,
-                )
-                self.conn.create_function(
-                    "base64_decode", 1,
-                    lambda txt: base64.b64decode(txt).decode("utf-8") if txt is not None else None,
-                )
-                self.conn.create_function(
-                    "jws_serialize_compact", 1,
-                    lambda payload: jws_serialize_compact(payload),
-                )
-                self.conn.create_function(
-                    "jws_deserialize_compact", 1,
-                    lambda token: jws_deserialize_compact(token),
-                )
-                self.conn.create_function(
-                    "query_param", 2,
-                    _query_param,
-                )
-                self.conn.create_function(
-                    "html_escape", 1,
-                    lambda txt: html.escape(str(txt)) if txt is not None else None,
-                )
-            except Exception as e:
-                self._log(f"Warning: could not register base64_encode: {e}")
+            self._register_functions(self.conn)
         except Exception as e:
             self._error(f"Error initializing PageQL engine: {e}")
             exit(1)
@@ -810,7 +1213,11 @@ class PageQLApp:
         else:
             if self.log_level == "debug":
                 print(f"scope: {scope}, calling http_disconnect")
-            client_id = await self.pageql_handler(scope, receive, send)
+            self._active_requests += 1
+            try:
+                client_id = await self.pageql_handler(scope, receive, send)
+            finally:
+                self._active_requests -= 1
             if client_id is not None:
                 await self._handle_http_disconnect(receive, client_id)
 
@@ -1,14 +1,20 @@
+import functools
 import re
 from pageql.parser import parsefirstword
 from pageql.database import parse_param_attrs
 from pageql.reactive import ReadOnly
 
 
+@functools.lru_cache(maxsize=1024)
+def _param_spec(node_content: str) -> tuple[str, dict]:
+    """Return the parameter name and parsed attributes of a ``#param`` directive."""
+    param_name, attrs_str = parsefirstword(node_content)
+    return param_name.replace('.', '__'), parse_param_attrs(attrs_str)
+
+
 def handle_param(node_content: str, params: dict) -> tuple[str, object | None]:
     """Validate a ``#param`` directive and return its name and value."""
-    param_name, attrs_str = parsefirstword(node_content)
-    param_name = param_name.replace('.', '__')
-    attrs = parse_param_attrs(attrs_str)
+    param_name, attrs = _param_spec(node_content)
 
     is_required = attrs.get('required', not attrs.__contains__('optional'))
     param_value = params.get(param_name)
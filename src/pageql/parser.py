@@ -1,6 +1,9 @@
+import functools
+import itertools
 import re
 import sqlglot
 from .reactive import get_dependencies, _convert_dot_sql
+from .pyexpr import plan_expr
 
 
 def quote_state(text: str, start_state: str | None = None) -> str | None:
@@ -30,6 +33,93 @@ def parsefirstword(s):
     return parts[0], parts[1].strip()
 
 
+class RenderPlan(str):
+    """``#render`` directive text with its partial ``name`` and ``args`` parsed.
+
+    ``args`` holds ``(key, ExprPlan)`` pairs; an empty value stays ``""``
+    so it can be reported when rendered.
+    """
+
+
+@functools.lru_cache(maxsize=1024)
+def plan_render(text, dialect="sqlite"):
+    """Split a ``#render`` directive into its partial name and ``key=expr`` pairs.
+
+    >>> p = plan_render("greet who='Bob' n=:a + 1")
+    >>> p.name, p.args, p.args[1][1].kind
+    ('greet', (('who', "'Bob'"), ('n', ':a + 1')), 'python')
+    """
+    partial_name_str, args_str = parsefirstword(text)
+    args = []
+    current_pos = 0
+    while args_str and current_pos < len(args_str):
+        args_part = args_str[current_pos:].lstrip()
+        if not args_part: break
+        eq_match = re.search(r"=", args_part)
+        if not eq_match: break # Malformed args
+
+        key = args_part[:eq_match.start()].strip()
+        if not key or not key.isidentifier(): break # Invalid key
+
+        value_start_pos = eq_match.end()
+        # Find where the value expression ends (before next ' key=' or end)
+        next_key_match = re.search(r"\s+[a-zA-Z_][a-zA-Z0-9_.]*\s*=", args_part[value_start_pos:])
+        value_end_pos = value_start_pos + next_key_match.start() if next_key_match else len(args_part)
+        value_expr = args_part[value_start_pos:value_end_pos].strip()
+        # Advance scanner position based on the slice we just processed
+        current_pos += value_end_pos
+        args.append((key, plan_expr(value_expr, dialect) if value_expr else value_expr))
+    plan = RenderPlan(text)
+    plan.name = partial_name_str
+    plan.args = tuple(args)
+    return plan
+
+
+# Directives a ``#partial ... cache`` body may not contain: their effects
+# would be lost when the memoized output is reused.
+_MEMO_UNSAFE = {
+    "#insert", "#update", "#delete", "#create", "#merge", "#attach", "#fetch", "#import",
+    "#header", "#cookie", "#statuscode", "#redirect", "#respond", "#reactive", "#param",
+}
+_MEMO_IDS = itertools.count()
+
+
+def _memo_node(name, body):
+    """Wrap a cached partial *body* in a ``#memo`` node.
+
+    The node is ``['#memo', (memo_id, names), body]`` where ``names`` are
+    the parameters *body* refers to, or ``None`` when the body renders other
+    partials and every parameter has to be part of the key.
+
+    >>> _memo_node("p", [("render_param", "a"), ("render_expression", ":b.c + 1")])[1][1]
+    ('a', 'b__c')
+    """
+    names = set()
+    renders = False
+
+    def walk(n):
+        nonlocal renders
+        if isinstance(n, str):
+            if getattr(n, "kind", None) == "param":
+                names.add(n.name)
+            for m in re.findall(r":([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)", n):
+                names.add(m.replace(".", "__"))
+        elif isinstance(n, (tuple, list)):
+            head = n[0] if n and isinstance(n[0], str) else None
+            if head in _MEMO_UNSAFE:
+                raise SyntaxError(f"cached partial '{name}' can't contain {{%{head[1:]}%}}")
+            if head == "text" and isinstance(n, tuple):
+                return
+            if head in ("render_param", "#ifdef", "#ifndef", "#each") and isinstance(n[1], str):
+                names.add(n[1].strip().lstrip(":").replace(".", "__"))
+            renders = renders or head == "#render"
+            for part in n:
+                walk(part)
+
+    walk(body)
+    return ["#memo", (next(_MEMO_IDS), None if renders else tuple(sorted(names))), body]
+
+
 def _shorten_error_token(value: str) -> str:
     """Return a short token snippet for error messages."""
     value = value.split("{{")[0]
@@ -185,7 +275,7 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
             i += 1
             then_body, i = _read_block(node_list, i, if_terms, partials, dialect, tests)
             else_body = None
-            r = [ntype, (ncontent, cond_expr), then_body] if ntype == "#if" else [ntype, ncontent, then_body]
+            r = [ntype, (plan_expr(ncontent, dialect, cond_expr), cond_expr), then_body] if ntype == "#if" else [ntype, ncontent, then_body]
             while i < len(node_list):
                 k, c = node_list[i]
                 if k == "#elif":
@@ -199,7 +289,7 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
                         )
                     except Exception as e:  # pragma: no cover - invalid SQL
                         raise SyntaxError(f"bad SQL in #elif: {e}")
-                    r.append((c, expr))
+                    r.append((plan_expr(c, dialect, expr), expr))
                     r.append(elif_body)
                     continue
                 if k == "#else":
@@ -219,11 +309,12 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
         if ntype == "#from":
             from_terms = {"#endfrom"}
             content = ncontent
+            # ``infinite`` is True, or the window size of ``infinite window N``
             infinite = False
-            m = re.search(r"\s+infinite\s*$", content, re.IGNORECASE)
+            m = re.search(r"\s+infinite(?:\s+window\s+(\d+))?\s*$", content, re.IGNORECASE)
             if m:
                 content = content[: m.start()].rstrip()
-                infinite = True
+                infinite = int(m.group(1)) if m.group(1) else True
             query = content
             try:
                 expr = sqlglot.parse_one(
@@ -267,7 +358,7 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
             except Exception as e:  # pragma: no cover - invalid SQL
                 raise SyntaxError(f"bad SQL in #let: {e}")
             i += 1
-            body.append(("#let", (var, sql, expr)))
+            body.append(("#let", (var, plan_expr(sql, dialect, expr), expr)))
             continue
 
         if ntype == "#fetch":
@@ -348,13 +439,18 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
             else:
                 partial_type = None
                 name = first
-                
+            name, *attrs = (name if partial_type else ncontent).split()
+            if attrs not in ([], ["cache"]):
+                raise SyntaxError(f"unknown #partial attributes: {' '.join(attrs)}")
+
             i += 1
             partial_partials = {}
             part_body, i = _read_block(node_list, i, part_terms, partial_partials, dialect, tests)
             if node_list[i][0] != "#endpartial":
                 raise SyntaxError("missing {%endpartial%}")
             i += 1
+            if attrs:
+                part_body = [_memo_node(name, part_body)]
             split_name = name.split('/')
             dest_partials = partials
             while len(split_name) > 1:
@@ -396,6 +492,10 @@ def _read_block(node_list, i, stop, partials, dialect, tests=None):
             continue
 
         # -------------------------------------------------------------- leaf --
+        if ntype in ("render_expression", "render_raw"):
+            ncontent = plan_expr(ncontent, dialect)
+        elif ntype == "#render":
+            ncontent = plan_render(ncontent, dialect)
         body.append((ntype, ncontent))
         i += 1
     return body, i
@@ -464,7 +564,7 @@ def _apply_add_reactive(n):
             if len(n) == 4:
                 return [name, n[1], n[2], add_reactive_elements(n[3])]
             return [name, n[1], add_reactive_elements(n[2])]
-        if name == "#each":
+        if name in {"#each", "#memo"}:
             return [name, n[1], add_reactive_elements(n[2])]
     return n
 
@@ -0,0 +1,491 @@
+"""Compile parameter-only SQL expressions to Python callables.
+
+``evalone`` uses these to skip the round trip to SQLite for expressions such
+as ``:a + 1``, ``:filter == 'all'`` or ``NOT :__first_row``.  Evaluation
+follows SQLite's rules for NULL propagation, numeric conversion of text,
+integer/real arithmetic, ``||`` and comparisons between storage classes.
+Anything else (column references, subqueries, user-defined functions, blobs)
+is left to SQLite.
+
+:func:`plan_expr` bundles this with the rest of the per-expression analysis
+so the parser can attach it to AST nodes and render time does no string
+processing.
+"""
+
+import math
+import re
+import operator
+from collections import OrderedDict
+
+import sqlglot
+from sqlglot import exp
+
+from pageql.reactive import Signal, _convert_dot_sql, get_dependencies
+
+__all__ = ["Unsupported", "compile_expr", "ExprPlan", "plan_expr"]
+
+
+class Unsupported(Exception):
+    """Raised when an expression or value has to be evaluated by SQLite."""
+
+
+_INT_MIN, _INT_MAX = -(2**63), 2**63 - 1
+_NUM_RE = re.compile(r"\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_ASCII_UPPER = str.maketrans("abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+# Compiled expressions and plans keyed by text, evicted least recently used.
+_CACHE_SIZE = 1024
+_CACHE: OrderedDict = OrderedDict()
+_MISSING = object()
+
+
+def _lru_get(cache, key):
+    try:
+        value = cache[key]
+        cache.move_to_end(key)
+    except KeyError:  # also when another thread evicted it meanwhile
+        return _MISSING
+    return value
+
+
+def _lru_put(cache, key, value):
+    cache[key] = value
+    while len(cache) > _CACHE_SIZE:
+        try:
+            cache.popitem(last=False)
+        except KeyError:
+            break
+
+
+def _int64(n):
+    return n if _INT_MIN <= n <= _INT_MAX else float(n)
+
+
+def _num(v):
+    """Convert *v* to a number the way SQLite does for arithmetic.
+
+    >>> _num("12abc"), _num("1.5"), _num("abc"), _num(" 1e3x")
+    (12, 1.5, 0, 1000.0)
+    """
+    if not isinstance(v, str):
+        return v
+    m = _NUM_RE.match(v)
+    if not m:
+        return 0
+    s = m.group(1)
+    if "." in s or "e" in s or "E" in s:
+        return float(s)
+    return _int64(int(s))
+
+
+def _text(v):
+    """Convert *v* to text the way SQLite does for ``||``.
+
+    >>> _text(1), _text(2.5), _text(3.0), _text(-0.0)
+    ('1', '2.5', '3.0', '0.0')
+    """
+    if isinstance(v, str):
+        return v
+    if isinstance(v, int):
+        return str(v)
+    if v == 0:
+        return "0.0"
+    s = "%.15g" % v
+    if "e" in s or "n" in s:
+        raise Unsupported(s)
+    return s if "." in s else s + ".0"
+
+
+def _truth(v):
+    return None if v is None else _num(v) != 0
+
+
+def _rank(v):
+    return 0 if isinstance(v, (int, float)) else 1
+
+
+def _cmp(a, b):
+    """Compare two non-NULL values: numbers sort before text."""
+    ra, rb = _rank(a), _rank(b)
+    if ra != rb:
+        return -1 if ra < rb else 1
+    return (a > b) - (a < b)
+
+
+def _value(v):
+    if isinstance(v, Signal):
+        v = v.value
+    if v is None or type(v) in (int, float, str):
+        return v
+    if isinstance(v, bool):
+        return int(v)
+    raise Unsupported(type(v).__name__)
+
+
+def _add(a, b):
+    r = a + b
+    return _int64(r) if isinstance(r, int) else r
+
+
+def _sub(a, b):
+    r = a - b
+    return _int64(r) if isinstance(r, int) else r
+
+
+def _mul(a, b):
+    r = a * b
+    return _int64(r) if isinstance(r, int) else r
+
+
+def _div(a, b):
+    if b == 0:
+        return None
+    if isinstance(a, int) and isinstance(b, int):
+        q = abs(a) // abs(b)
+        return _int64(q if (a < 0) == (b < 0) else -q)
+    return a / b
+
+
+def _mod(a, b):
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise Unsupported("non-finite operand")
+    ia, ib = int(a), int(b)
+    if ib == 0:
+        return None
+    r = abs(ia) % abs(ib)
+    r = -r if ia < 0 else r
+    return float(r) if isinstance(a, float) or isinstance(b, float) else r
+
+
+_ARITH = {exp.Add: _add, exp.Sub: _sub, exp.Mul: _mul, exp.Div: _div, exp.Mod: _mod}
+_COMPARE = {
+    exp.EQ: operator.eq, exp.NEQ: operator.ne, exp.LT: operator.lt,
+    exp.LTE: operator.le, exp.GT: operator.gt, exp.GTE: operator.ge,
+}
+_BINARY = tuple(_ARITH) + tuple(_COMPARE) + (exp.And, exp.Or, exp.Is)
+_COMPARISONS = tuple(_COMPARE) + (exp.Is, exp.In, exp.Between)
+
+
+def _compile(node):
+    """Return a ``params -> value`` callable for *node* or raise Unsupported."""
+    t = type(node)
+    if t in (exp.Paren, exp.Alias):
+        return _compile(node.this)
+    if t is exp.Literal:
+        if node.is_string:
+            v = node.this
+        else:
+            s = node.this
+            v = float(s) if any(c in s for c in ".eE") else _int64(int(s))
+        return lambda p: v
+    if t is exp.Null:
+        return lambda p: None
+    if t is exp.Boolean:
+        v = int(node.this)
+        return lambda p: v
+    if t is exp.Placeholder:
+        name = node.this
+        if not name or name.isdigit():
+            raise Unsupported(node.sql())
+
+        def param(p):
+            try:
+                return _value(p[name])
+            except KeyError:
+                raise Unsupported(name)
+        return param
+    if t in _ARITH:
+        f, a, b = _ARITH[t], _compile(node.this), _compile(node.expression)
+
+        def arith(p):
+            x, y = a(p), b(p)
+            if x is None or y is None:
+                return None
+            return f(_num(x), _num(y))
+        return arith
+    if t in _COMPARE:
+        f, a, b = _COMPARE[t], _compile(node.this), _compile(node.expression)
+
+        def compare(p):
+            x, y = a(p), b(p)
+            if x is None or y is None:
+                return None
+            return int(f(_cmp(x, y), 0))
+        return compare
+    if t is exp.Is and isinstance(node.expression, exp.Boolean):
+        a, want = _compile(node.this), node.expression.this
+
+        def is_bool(p):
+            x = _truth(a(p))
+            return 0 if x is None else int(x == want)
+        return is_bool
+    if t is exp.Is:
+        a, b = _compile(node.this), _compile(node.expression)
+
+        def is_(p):
+            x, y = a(p), b(p)
+            if x is None or y is None:
+                return int(x is y)
+            return int(_cmp(x, y) == 0)
+        return is_
+    if t is exp.Neg:
+        a = _compile(node.this)
+
+        def neg(p):
+            x = a(p)
+            return None if x is None else _mul(_num(x), -1)
+        return neg
+    if t is exp.Not:
+        a = _compile(node.this)
+
+        def not_(p):
+            x = _truth(a(p))
+            return None if x is None else int(not x)
+        return not_
+    if t in (exp.And, exp.Or):
+        a, b = _compile(node.this), _compile(node.expression)
+        short = t is exp.Or
+
+        def logic(p):
+            x = _truth(a(p))
+            if x is short:
+                return int(short)
+            y = _truth(b(p))
+            if y is short:
+                return int(short)
+            return None if x is None or y is None else int(not short)
+        return logic
+    if t is exp.DPipe:
+        for side in (node.this, node.expression, node.parent):
+            if isinstance(side, _BINARY):
+                # sqlglot and SQLite disagree on the precedence of ||
+                raise Unsupported(node.sql())
+        a, b = _compile(node.this), _compile(node.expression)
+
+        def concat(p):
+            x, y = a(p), b(p)
+            return None if x is None or y is None else _text(x) + _text(y)
+        return concat
+    if t is exp.Case:
+        subject = _compile(node.this) if node.this else None
+        ifs = [(_compile(i.this), _compile(i.args["true"])) for i in node.args["ifs"]]
+        default = _compile(node.args["default"]) if node.args.get("default") else (lambda p: None)
+
+        def case(p):
+            s = subject(p) if subject else None
+            for cond, val in ifs:
+                c = cond(p)
+                if subject:
+                    if s is not None and c is not None and _cmp(s, c) == 0:
+                        return val(p)
+                elif _truth(c):
+                    return val(p)
+            return default(p)
+        return case
+    if t is exp.If:
+        cond, true = _compile(node.this), _compile(node.args["true"])
+        false = _compile(node.args["false"]) if node.args.get("false") else (lambda p: None)
+        return lambda p: true(p) if _truth(cond(p)) else false(p)
+    if t is exp.Coalesce:
+        args = [_compile(node.this)] + [_compile(e) for e in node.expressions]
+
+        def coalesce(p):
+            for a in args:
+                v = a(p)
+                if v is not None:
+                    return v
+            return None
+        return coalesce
+    if t is exp.Nullif:
+        a, b = _compile(node.this), _compile(node.expression)
+
+        def nullif(p):
+            x, y = a(p), b(p)
+            return None if x is not None and y is not None and _cmp(x, y) == 0 else x
+        return nullif
+    if t in (exp.In, exp.Between):
+        operands = [node.this, node.parent, *node.expressions, node.args.get("low"), node.args.get("high")]
+        if any(isinstance(side, _COMPARISONS) for side in operands):
+            # sqlglot binds IN/BETWEEN tighter than comparisons, SQLite doesn't
+            raise Unsupported(node.sql())
+    if t is exp.In:
+        if node.args.get("query") or node.args.get("unnest") or node.args.get("field"):
+            raise Unsupported(node.sql())
+        a, items = _compile(node.this), [_compile(e) for e in node.expressions]
+
+        def in_(p):
+            x = a(p)
+            if x is None:
+                return None
+            seen_null = False
+            for item in items:
+                v = item(p)
+                if v is None:
+                    seen_null = True
+                elif _cmp(x, v) == 0:
+                    return 1
+            return None if seen_null else 0
+        return in_
+    if t is exp.Between:
+        a, lo, hi = _compile(node.this), _compile(node.args["low"]), _compile(node.args["high"])
+
+        def between(p):
+            x, low, high = a(p), lo(p), hi(p)
+            ge = None if x is None or low is None else _cmp(x, low) >= 0
+            le = None if x is None or high is None else _cmp(x, high) <= 0
+            if ge is False or le is False:
+                return 0
+            return None if ge is None or le is None else 1
+        return between
+    if t in (exp.Max, exp.Min):
+        if not node.expressions:
+            raise Unsupported(node.sql())
+        args = [_compile(node.this)] + [_compile(e) for e in node.expressions]
+        sign = 1 if t is exp.Max else -1
+
+        def extreme(p):
+            best = None
+            for a in args:
+                v = a(p)
+                if v is None:
+                    return None
+                if best is None or _cmp(v, best) * sign > 0:
+                    best = v
+            return best
+        return extreme
+    if t is exp.Abs:
+        a = _compile(node.this)
+
+        def abs_(p):
+            x = a(p)
+            if x is None:
+                return None
+            if isinstance(x, str):
+                return abs(float(_num(x)))
+            if x == _INT_MIN:
+                raise Unsupported("integer overflow")
+            return abs(x)
+        return abs_
+    if t in (exp.Lower, exp.Upper):
+        a = _compile(node.this)
+        table = _ASCII_LOWER if t is exp.Lower else _ASCII_UPPER
+
+        def case_(p):
+            x = a(p)
+            return None if x is None else _text(x).translate(table)
+        return case_
+    if t is exp.Length:
+        a = _compile(node.this)
+
+        def length(p):
+            x = a(p)
+            return None if x is None else len(_text(x))
+        return length
+    if t is exp.Typeof:
+        a = _compile(node.this)
+        names = {type(None): "null", int: "integer", float: "real", str: "text"}
+        return lambda p: names[type(a(p))]
+    raise Unsupported(node.sql())
+
+
+def compile_expr(sql, dialect="sqlite", tree=None):
+    """Return a callable evaluating ``select <expr>`` *sql* from params.
+
+    Returns ``None`` when the expression needs SQLite.  The callable raises
+    :class:`Unsupported` for parameter values it cannot handle (or missing
+    parameters) so the caller can fall back to the database.  *tree* may
+    pass an existing sqlglot parse of *sql* to avoid parsing it again.
+
+    >>> compile_expr("select :a + :a")({"a": 2})
+    4
+    >>> compile_expr("select :n || '/' || (:n / 2)")({"n": 7})
+    '7/3'
+    >>> compile_expr("select count(*) from t") is None
+    True
+    """
+    key = (sql, dialect)
+    fn = _lru_get(_CACHE, key)
+    if fn is not _MISSING:
+        return fn
+    fn = None
+    if dialect == "sqlite":
+        try:
+            if tree is None:
+                tree = sqlglot.parse_one(_convert_dot_sql(sql), read=dialect)
+            if (
+                isinstance(tree, exp.Select)
+                and len(tree.expressions) == 1
+                and not any(v for k, v in tree.args.items() if k != "expressions")
+            ):
+                fn = _compile(tree.expressions[0])
+        except Exception:
+            fn = None
+    _lru_put(_CACHE, key, fn)
+    return fn
+
+
+_BARE_NAME_RE = re.compile("^:?[a-zA-z._][a-zA-z._0-9]*$")
+_SELECT_RE = re.compile(r"(?i)^\s*(select|\(select)")
+_PLANS: OrderedDict = OrderedDict()
+
+
+class ExprPlan(str):
+    """Expression text with the analysis ``evalone`` needs precomputed.
+
+    A plan compares equal to the original text, so ASTs holding plans look
+    the same as before.  ``kind`` is ``"null"``, ``"param"`` (a bare
+    parameter ``name``), ``"python"`` (parameters and literals only, see
+    ``py``) or ``"sql"`` (needs the database).  ``sql`` is the ``select``
+    statement, ``dot_sql`` the same with ``:a.b`` rewritten to ``:a__b`` and
+    ``deps`` the referenced parameter names.  ``tree`` is the sqlglot parse
+    of ``dot_sql``.
+    """
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = sqlglot.parse_one(self.dot_sql, read=self.dialect)
+        return self._tree
+
+
+def plan_expr(text, dialect="sqlite", tree=None):
+    """Return the :class:`ExprPlan` for *text*, reusing earlier plans.
+
+    >>> p = plan_expr(" :a.b + 1 ")
+    >>> p == " :a.b + 1 ", p.kind, p.sql, p.deps
+    (True, 'python', 'select :a.b + 1', ['a__b'])
+    >>> plan_expr(":x.y").kind, plan_expr(":x.y").name
+    ('param', 'x__y')
+    """
+    key = (text, dialect)
+    plan = _lru_get(_PLANS, key)
+    if plan is not _MISSING:
+        if tree is not None and plan._tree is None:
+            plan._tree = tree
+        return plan
+    plan = ExprPlan(text)
+    plan.dialect = dialect
+    plan._tree = tree
+    plan.text = e = text.strip()
+    plan.name = plan.original = plan.sql = plan.dot_sql = plan.py = None
+    plan.deps = []
+    if e.upper() == "NULL":
+        plan.kind = "null"
+    elif _BARE_NAME_RE.match(e):
+        plan.kind = "param"
+        plan.original = e[1:] if e.startswith(":") else e
+        plan.name = plan.original.replace(".", "__")
+    else:
+        plan.sql = e if _SELECT_RE.match(e) else "select " + e
+        plan.dot_sql = _convert_dot_sql(plan.sql)
+        plan.deps = [n.replace(".", "__") for n in get_dependencies(plan.dot_sql)]
+        if tree is None:
+            try:
+                plan._tree = sqlglot.parse_one(plan.dot_sql, read=dialect)
+            except Exception:
+                pass  # reported when the expression is evaluated
+        plan.py = compile_expr(plan.sql, dialect, plan._tree)
+        plan.kind = "sql" if plan.py is None else "python"
+    plan.cacheable = "randomblob" not in (plan.sql or "").lower()
+    _lru_put(_PLANS, key, plan)
+    return plan
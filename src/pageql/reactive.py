@@ -1,5 +1,6 @@
 import re
-from collections import Counter
+import sqlite3
+from collections import Counter, OrderedDict
 from difflib import SequenceMatcher
 import sqlglot
 import time
@@ -9,7 +10,70 @@ def set_log_level(conn, log_level: str) -> None:
     """Associate *log_level* with *conn* for SQL execution."""
     _LOG_LEVELS[id(conn)] = log_level
 
+
+class StatementStats:
+    """Mirror sqlite3's LRU statement cache to estimate its hit rate."""
+
+    def __init__(self, size=128):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+
+    def record(self, sql):
+        if sql in self._lru:
+            self._lru.move_to_end(sql)
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._lru[sql] = None
+            if len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class StatsConnection(sqlite3.Connection):
+    """SQLite connection that can keep :class:`StatementStats`.
+
+    Pass it as ``factory`` to ``sqlite3.connect``; stats are only recorded
+    once :func:`set_statement_cache_size` enabled them.
+    """
+
+    statement_stats = None
+
+
+def set_statement_cache_size(conn, size: int) -> None:
+    """Record statement stats for *conn*, a :class:`StatsConnection` opened
+    with ``cached_statements=size``."""
+    conn.statement_stats = StatementStats(size)
+
+
+def statement_stats(conn) -> dict:
+    """Return estimated statement cache hits for SQL run through :func:`execute`.
+
+    >>> c = sqlite3.connect(":memory:", factory=StatsConnection)
+    >>> set_statement_cache_size(c, 2)
+    >>> for sql in ["select 1", "select 1", "select 2"]:
+    ...     _ = execute(c, sql, [])
+    >>> statement_stats(c)
+    {'size': 2, 'hits': 1, 'misses': 2, 'hit_rate': 0.3333333333333333}
+    """
+    st = getattr(conn, "statement_stats", None)
+    return st.stats() if st else StatementStats().stats()
+
+
 def execute(conn, sql, params, log_level: str | None = None):
+    st = getattr(conn, "statement_stats", None)
+    if st is not None:
+        st.record(sql)
     if log_level is None:
         log_level = _LOG_LEVELS.get(id(conn), "info")
     if log_level == "debug":
@@ -211,26 +275,54 @@ def _convert_dot_sql(sql: str) -> str:
     parts.append(segment)
     return "".join(parts)
 
+def load_schema(conn, table_name):
+    """Return ``(columns, unique_columns)`` of *table_name* read from the catalog."""
+    cols_info = list(execute(conn, f"PRAGMA table_info({table_name})", []))
+    columns = [col[1] for col in cols_info]
+    unique_columns = set()
+    pk_cols = [c[1] for c in sorted(cols_info, key=lambda c: c[5]) if c[5]]
+    # members of a composite key are not unique on their own
+    if pk_cols:
+        unique_columns.add(pk_cols[0] if len(pk_cols) == 1 else tuple(pk_cols))
+    for idx in execute(conn, f"PRAGMA index_list({table_name})", []):
+        if idx[2]:
+            cols = [c[2] for c in execute(conn, f"PRAGMA index_info({idx[1]})", [])]
+            unique_columns.add(cols[0] if len(cols) == 1 else tuple(cols))
+    return columns, unique_columns
+
+
+def table_version_key(name):
+    """Return the key of table *name* in version dicts.
+
+    >>> table_version_key('main."Todos"')
+    'todos'
+    """
+    return name.rsplit(".", 1)[-1].strip('"`[]').lower()
+
+
+def query_columns(conn, sql, cache=None):
+    """Return the result column names of *sql*, kept in *cache* if given."""
+    if cache is not None and sql in cache:
+        return cache[sql]
+    cur = execute(conn, f"SELECT * FROM ({sql}) LIMIT 0", [])
+    columns = [col[0] for col in cur.description]
+    if cache is not None:
+        cache[sql] = columns
+    return columns
+
+
 class ReactiveTable(Signal):
-    def __init__(self, conn, table_name):
+    def __init__(self, conn, table_name, schema=None, versions=None, column_cache=None):
         super().__init__()
         self.conn = conn
         self.table_name = table_name
-        cur = execute(self.conn, f"PRAGMA table_info({self.table_name})", [])
-        cols_info = list(cur)
-        self.columns = [col[1] for col in cols_info]
-        self.unique_columns = {col[1] for col in cols_info if col[5]}
-        pk_cols = [c[1] for c in cols_info if c[5]]
-        if len(pk_cols) > 1:
-            self.unique_columns.add(tuple(pk_cols))
-        cur = execute(self.conn, f"PRAGMA index_list({self.table_name})", [])
-        for idx in cur:
-            if idx[2]:
-                cols = [c[2] for c in execute(self.conn, f"PRAGMA index_info({idx[1]})", [])]
-                for col in cols:
-                    self.unique_columns.add(col)
-                if len(cols) > 1:
-                    self.unique_columns.add(tuple(cols))
+        # ``{sql: columns}`` of selects on this table, owned by ``Tables``.
+        self.column_cache = column_cache
+        # Shared ``{table: counter}`` dict bumped on every change, see ``PageCache``.
+        self.versions = versions
+        columns, unique_columns = schema or load_schema(conn, table_name)
+        self.columns = list(columns)
+        self.unique_columns = set(unique_columns)
         self.sql = f"SELECT * FROM {self.table_name}"
 
     def remove_listener(self, listener):
@@ -238,6 +330,11 @@ class ReactiveTable(Signal):
         if listener in self.listeners:
             self.listeners.remove(listener)
 
+    def _changed(self):
+        if self.versions is not None:
+            key = table_version_key(self.table_name)
+            self.versions[key] = self.versions.get(key, 0) + 1
+
     def insert(self, sql, params):
         params = _normalize_params(params)
         query = _convert_dot_sql(sql + " RETURNING *")
@@ -255,6 +352,7 @@ class ReactiveTable(Signal):
             # insert .. or ignore may not return a row when it affects nothing
             # In this case the statement had no effect so we don't emit events
             return
+        self._changed()
         for listener in self.listeners:
             listener([1, row])
             
@@ -270,6 +368,7 @@ class ReactiveTable(Signal):
                 row = cursor.fetchone()
                 if row is None:
                     break
+                self._changed()
                 for listener in self.listeners:
                     listener([2, row])
         except Exception as e:
@@ -306,6 +405,7 @@ class ReactiveTable(Signal):
                 raise Exception(f"Update on table {self.table_name} failed for query: {update_sql}")
             if new_row == row:
                 continue
+            self._changed()
             for listener in self.listeners:
                 listener([3, row, new_row])
             
@@ -891,6 +991,8 @@ class Order(Signal):
         self.order_sql = order_sql
         self.limit = limit
         self.offset = offset
+        # rows kept by ``set_window`` for ``infinite window N``, None to grow
+        self.window = None
 
         if hasattr(self.parent, "unique_columns"):
             self.unique_columns = set(self.parent.unique_columns)
@@ -923,12 +1025,9 @@ class Order(Signal):
 
             self._full_order_sql = ", ".join(auto_cols)
             self._all_sql = f"SELECT * FROM ({self.parent.sql}) ORDER BY {self._full_order_sql}"
-            self.sql = self._all_sql
-            if self.limit is not None:
-                self.sql += f" LIMIT {self.limit}"
-            if self.offset:
-                self.sql += f" OFFSET {self.offset}"
+            self._set_sql()
             self.columns = self.parent.columns
+            self._keyset = self._keyset_columns(auto_cols) if unique_found else None
             self.parent.listeners.append(self.onevent)
 
             placeholders = ", ".join([f'? as {c}' for c in self.columns])
@@ -937,8 +1036,7 @@ class Order(Signal):
                 f"SELECT 1 as idx, {placeholders}) ORDER BY {self._full_order_sql} LIMIT 1"
             )
 
-            cur = execute(self.conn, self.sql, [])
-            self.value = list(cur.fetchall())
+            self.value = self._fetch_rows()
             self._all_rows = None
         else:
             self.conn = None
@@ -973,14 +1071,8 @@ class Order(Signal):
 
         self.limit = limit
         if self.conn is not None:
-            self.sql = self._all_sql
-            if self.limit is not None:
-                self.sql += f" LIMIT {self.limit}"
-            if self.offset:
-                self.sql += f" OFFSET {self.offset}"
-
-            cur = execute(self.conn, self.sql, [])
-            self.value = list(cur.fetchall())
+            self._set_sql()
+            self.value = self._fetch_rows()
             new_value = self.value
         else:
             if self.limit is None:
@@ -994,6 +1086,128 @@ class Order(Signal):
             for l in self.listeners:
                 l(ev)
 
+    def load_more(self, count):
+        """Extend ``limit`` by *count*, emitting insert events for the new rows.
+
+        Only the next *count* rows are read: after the last loaded row by
+        keyset conditions on the order columns when they end in a unique
+        column, otherwise with ``OFFSET``.
+        """
+        if self.limit is None:
+            return
+        start = len(self.value)
+        if start < self.limit:
+            rows = []
+        elif self.conn is None:
+            rows = self._all_rows[self.offset + start : self.offset + start + count]
+        else:
+            rows = self._fetch_after(self.value[-1] if self.value else None, start, count)
+        self.limit += count
+        if self.conn is not None:
+            self._set_sql()
+        self.value = self.value + rows
+        for i, row in enumerate(rows):
+            for l in self.listeners:
+                l([1, start + i, row])
+
+    def set_window(self, offset, limit):
+        """Show rows *offset* to *offset* + *limit* of the full result.
+
+        Rows leaving the window are deleted and only rows entering it are
+        read, so the number of rows kept stays at most *limit*.
+        """
+        offset = max(offset, 0)
+        old_value = self.value
+        start, end = self.offset, self.offset + len(old_value)
+        if offset >= end or offset + limit <= start:
+            head_drop, kept, head = len(old_value), [], []
+            tail = self._fetch_range(offset, limit)
+        else:
+            head_drop = max(offset - start, 0)
+            kept = old_value[head_drop : len(old_value) - max(end - offset - limit, 0)]
+            head = self._fetch_range(offset, start - offset) if offset < start else []
+            missing = offset + limit - end
+            # a window shorter than its limit already ends at the last row
+            if missing <= 0 or (self.limit is not None and len(old_value) < self.limit):
+                tail = []
+            elif self.conn is None:
+                tail = self._fetch_range(end, missing)
+            else:
+                tail = self._fetch_after(old_value[-1], end - self.offset, missing)
+        tail_drop = len(old_value) - head_drop - len(kept)
+        self.offset, self.limit = offset, limit
+        if self.conn is not None:
+            self._set_sql()
+        self.value = head + kept + tail
+        events = [[2, 0] for _ in range(head_drop)]
+        events += [[2, len(kept) + i] for i in reversed(range(tail_drop))]
+        events += [[1, i, row] for i, row in enumerate(head)]
+        events += [[1, len(head) + len(kept) + i, row] for i, row in enumerate(tail)]
+        for ev in events:
+            for l in self.listeners:
+                l(ev)
+
+    def move_window(self, first, visible):
+        """Keep ``window`` rows around *visible* rows from loaded row *first*.
+
+        The window only moves once the visible rows come within half the
+        overscan of either end of the loaded rows.
+        """
+        overscan = max(self.window - visible, 0) // 2
+        margin = overscan // 2
+        near_head = self.offset > 0 and first < margin
+        near_tail = len(self.value) >= self.limit and first + visible > len(self.value) - margin
+        if near_head or near_tail or self.limit < self.window:
+            self.set_window(self.offset + first - overscan, self.window)
+
+    def _fetch_range(self, offset, count):
+        """Return *count* rows of the full result starting at *offset*."""
+        if self.conn is None:
+            return self._all_rows[offset : offset + count]
+        cur = execute(self.conn, f"{self._all_sql} LIMIT ? OFFSET ?", [count, offset])
+        return list(cur.fetchall())
+
+    def _keyset_columns(self, directives):
+        """Return ``(column index, descending)`` of plain column *directives*."""
+        keys = []
+        for directive in directives:
+            parts = directive.split()
+            if parts[0] not in self.columns or len(parts) > 2:
+                return None
+            if len(parts) == 2 and parts[1].upper() not in ("ASC", "DESC"):
+                return None
+            keys.append((self.columns.index(parts[0]), parts[-1].upper() == "DESC"))
+        return keys
+
+    def _fetch_after(self, last, start, count):
+        """Return up to *count* rows following row *last* at position *start*."""
+        # unique columns may hold several NULLs, which do not identify a row
+        if last is None or self._keyset is None or last[self._keyset[-1][0]] is None:
+            cur = execute(self.conn, f"{self._all_sql} LIMIT ? OFFSET ?", [count, self.offset + start])
+            return list(cur.fetchall())
+        # NULLs sort first: nothing follows NULL descending, everything
+        # but NULL follows it ascending
+        terms, params = [], []
+        for i, (idx, desc) in enumerate(self._keyset):
+            eq = [f"{self.columns[j]} IS ?" for j, _ in self._keyset[:i]]
+            eq_params = [last[j] for j, _ in self._keyset[:i]]
+            col, value = self.columns[idx], last[idx]
+            if value is None:
+                if desc:
+                    continue
+                after, after_params = f"{col} IS NOT NULL", []
+            elif desc:
+                after, after_params = f"({col} < ? OR {col} IS NULL)", [value]
+            else:
+                after, after_params = f"{col} > ?", [value]
+            terms.append("(" + " AND ".join(eq + [after]) + ")")
+            params += eq_params + after_params
+        if not terms:
+            return []
+        sql = (f"SELECT * FROM ({self.parent.sql}) WHERE {' OR '.join(terms)} "
+               f"ORDER BY {self._full_order_sql} LIMIT ?")
+        return list(execute(self.conn, sql, params + [count]).fetchall())
+
     def remove_listener(self, listener):
         if listener in self.listeners:
             self.listeners.remove(listener)
@@ -1001,8 +1215,18 @@ class Order(Signal):
             self.parent.remove_listener(self.onevent)
             self.listeners = None
 
+    def _set_sql(self):
+        """Set ``self.sql`` with literal bounds so parents can embed it."""
+        self.sql = self._all_sql
+        if self.limit is not None:
+            self.sql += f" LIMIT {self.limit}"
+        if self.offset:
+            self.sql += f" OFFSET {self.offset}"
+
     def _fetch_rows(self):
-        cur = execute(self.conn, self.sql, [])
+        # Bind the bounds so every page size shares one prepared statement
+        limit = -1 if self.limit is None else self.limit
+        cur = execute(self.conn, f"{self._all_sql} LIMIT ? OFFSET ?", [limit, self.offset])
         return list(cur.fetchall())
 
     def _compare(self, row1, row2):
@@ -1022,7 +1246,7 @@ class Order(Signal):
         return lo
 
     def _fetch_row(self, idx):
-        cur = execute(self.conn, f"{self._all_sql} LIMIT 1 OFFSET {idx}", [])
+        cur = execute(self.conn, f"{self._all_sql} LIMIT 1 OFFSET ?", [idx])
         return cur.fetchone()
 
     def _handle_insert(self, row, cur_value):
@@ -1115,8 +1339,7 @@ class Select(Signal):
         self.sql = f"SELECT {self.select_sql} FROM ({self.parent.sql})"
         self.parent.listeners.append(self.onevent)
         self.sql_from_row = f"SELECT {self.select_sql} FROM (SELECT {', '.join([f'? as {col}' for col in self.parent.columns])})"
-        cursor = execute(self.conn, f"SELECT * FROM ({self.sql}) LIMIT 0", [])
-        self.columns = [col[0] for col in cursor.description]
+        self.columns = query_columns(self.conn, self.sql, getattr(self.parent, "column_cache", None))
         self.deps = [self.parent]
         self.update = self.onevent
     
@@ -1144,14 +1367,66 @@ class Select(Signal):
             self.listeners = None
 
 class Tables:
-    def __init__(self, conn, dialect="sqlite"):
+    """Reactive tables of a connection plus a cache of their schema.
+
+    Columns and unique keys are read from the catalog once per table and
+    reused until :meth:`invalidate` is called, either explicitly after
+    ``#create``/``#attach`` or by :meth:`check_schema` when
+    ``PRAGMA schema_version`` changes.  ``versions`` counts changes per
+    table (key ``None`` counts invalidations) and may be shared between
+    connections to the same database.
+    """
+
+    def __init__(self, conn, dialect="sqlite", versions=None):
         self.conn = conn
         self.dialect = dialect
+        self.versions = {} if versions is None else versions
         self.tables = {}
+        self.schemas = {}
+        self.schema_version = None
+        self.column_cache = {}
+
+    def schema(self, name):
+        """Return cached ``(columns, unique_columns)`` for table *name*.
+
+        Tables that don't exist (yet) are not cached.
+        """
+        if name in self.schemas:
+            return self.schemas[name]
+        schema = load_schema(self.conn, name)
+        if schema[0]:
+            self.schemas[name] = schema
+        return schema
+
+    def invalidate(self):
+        """Drop cached schema info and refresh existing tables in place."""
+        self.schemas.clear()
+        self.column_cache.clear()
+        self.versions[None] = self.versions.get(None, 0) + 1
+        if self.dialect == "sqlite":
+            self.schema_version = self.conn.execute("PRAGMA schema_version").fetchone()[0]
+        for name, table in self.tables.items():
+            columns, unique_columns = self.schema(name)
+            table.columns = list(columns)
+            table.unique_columns = set(unique_columns)
+
+    def check_schema(self):
+        """Invalidate the cache if ``PRAGMA schema_version`` has changed.
+
+        Other dialects have no schema version; their cache is only
+        invalidated after DDL run through PageQL.
+        """
+        if self.dialect != "sqlite":
+            return
+        version = self.conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version != self.schema_version:
+            if self.schema_version is not None:
+                self.invalidate()
+            self.schema_version = version
 
     def _get(self, name):
         if name not in self.tables:
-            self.tables[name] = ReactiveTable(self.conn, name)
+            self.tables[name] = ReactiveTable(self.conn, name, self.schema(name), self.versions, self.column_cache)
         return self.tables[name]
 
     def executeone(self, sql, params):
@@ -1,7 +1,10 @@
 """Utilities and classes for managing rendering state."""
 
+import contextlib
+import html
 import json
 import re
+import threading
 
 
 def escape_script(content: str) -> str:
@@ -13,6 +16,158 @@ def embed_html_in_js(content: str) -> str:
     """Return a JSON string of *content* with ``</script>`` escaped."""
     return escape_script(json.dumps(content))
 
+_HTML_TOKEN_RE = re.compile(
+    r"""<(/?)([A-Za-z][A-Za-z0-9-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>|([^<]+)"""
+)
+_HTML_ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+# Tags whose content the browser parses specially or rewrites (e.g. <tbody>).
+_UNPATCHABLE_TAGS = {
+    "script", "style", "template", "textarea", "title", "pre", "listing",
+    "table", "noscript", "iframe", "xmp", "plaintext", "svg", "math",
+    # table parts: the browser moves markers out of them and adds <tbody>
+    "tr", "td", "th", "thead", "tbody", "tfoot", "caption", "col", "colgroup",
+}
+
+
+def _html_nodes(content: str):
+    """Return the start tags, end tags and texts of *content* in document order.
+
+    Start tags are ``(name, attrs)``, end tags ``('/' + name, None)`` and
+    texts ``(None, text)``.  Returns ``None`` for HTML the browser may not
+    parse into the same element and text node sequence.
+    """
+    nodes = []
+    pos = 0
+    for m in _HTML_TOKEN_RE.finditer(content):
+        if m.start() != pos:
+            return None
+        pos = m.end()
+        closing, name, attrs, text = m.groups()
+        if text is not None:
+            nodes.append((None, html.unescape(text)))
+            continue
+        name = name.lower()
+        if name in _UNPATCHABLE_TAGS:
+            return None
+        if closing:
+            nodes.append(("/" + name, None))
+        else:
+            nodes.append((name, {
+                a.lower(): html.unescape(next((v for v in vals if v is not None), ""))
+                for a, *vals in _HTML_ATTR_RE.findall(attrs)
+            }))
+    return nodes if pos == len(content) else None
+
+
+def html_patch(old: str, new: str):
+    """Return ``[index, value]`` patches turning rendered *old* into *new*.
+
+    *index* counts the elements and text nodes of *old* in document order;
+    *value* is the new text of a text node or the new attributes of an
+    element.  Returns ``None`` when the structure differs.
+
+    >>> html_patch('<li class="a">x<b>y</b></li>', '<li class="b">x<b>z</b></li>')
+    [[0, {'class': 'b'}], [3, 'z']]
+    >>> html_patch('<li>x</li>', '<li><b>x</b></li>') is None
+    True
+    """
+    a = _html_nodes(old)
+    b = _html_nodes(new)
+    if a is None or b is None or len(a) != len(b):
+        return None
+    patches = []
+    index = 0
+    for (name, value), (new_name, new_value) in zip(a, b):
+        if name != new_name:
+            return None
+        if name is None or name[0] != "/":
+            if value != new_value:
+                patches.append([index, new_value])
+            index += 1
+    return patches
+
+
+_MARKER_SCRIPT_RE = re.compile(
+    r"(pset|ppatch|pupdatetag|pinsert|pdelete|pupdate|orderinsert|orderdelete|orderupdate)"
+    r"\(('[^']*'|\d+)(?:,('[^']*'|\d+))?(?:,(\d+))?"
+)
+# scripts passed to and sent by ``coalesce_scripts``, for ``coalesce_stats``
+_COALESCE_STATS = {"flushes": 0, "scripts": 0, "sent": 0}
+
+
+def coalesce_scripts(scripts):
+    """Return *scripts* without updates that later scripts supersede.
+
+    Only the latest ``pset``/``pupdatetag`` of a marker is kept (``pset`` also
+    drops earlier ``ppatch``es), a ``pinsert`` followed by a ``pdelete`` of the
+    same row is dropped with everything sent to the row in between, and
+    consecutive ``orderupdate``s moving the same row are merged.  Structural
+    changes of a marker end the run of updates that can be dropped.
+
+    >>> coalesce_scripts(["pset(1,'a')", "log()", "pset(1,'b')", "pset(2,'c')"])
+    ['log()', "pset(1,'b')", "pset(2,'c')"]
+    >>> coalesce_scripts(["pinsert('0_5','x')", "pset('0_5','y')", "pdelete('0_5')"])
+    []
+    >>> coalesce_scripts(["orderupdate(3,0,4,'a')", "orderupdate(3,4,1,'b')"])
+    ["orderupdate(3,0,1,'b')"]
+    """
+    out = []
+    updates = {}  # (function, marker) -> indexes in out of droppable updates
+    inserted = {}  # row id -> index in out of its pinsert
+    order = {}  # ordered marker -> index in out of its last order script
+
+    def drop(indexes):
+        for i in indexes:
+            out[i] = None
+
+    def reset(key):
+        for fn in ("pset", "pupdatetag"):
+            updates.pop((fn, key), None)
+        inserted.pop(key, None)
+
+    for script in scripts:
+        m = _MARKER_SCRIPT_RE.match(script)
+        if m is None:
+            out.append(script)
+            continue
+        fn, key, arg2, arg3 = m.groups()
+        if fn in ("pset", "pupdatetag"):
+            drop(updates.pop((fn, key), ()))
+            updates[(fn, key)] = [len(out)]
+        elif fn == "ppatch":
+            updates.setdefault(("pset", key), []).append(len(out))
+        elif fn == "pdelete" and key in inserted:
+            drop([inserted.pop(key), *updates.pop(("pset", key), ())])
+            continue
+        elif fn in ("pinsert", "pdelete", "pupdate"):
+            reset(key)
+            if fn == "pupdate":
+                reset(arg2)
+            if fn == "pinsert":
+                inserted[key] = len(out)
+        else:
+            prev = order.get(key)
+            prev_m = _MARKER_SCRIPT_RE.match(out[prev]) if prev is not None and out[prev] else None
+            if fn == "orderupdate" and prev_m and prev_m.group(1) == "orderupdate" and prev_m.group(4) == arg2:
+                out[prev] = None
+                script = f"orderupdate({key},{prev_m.group(3)}{script[m.end(3):]}"
+            elif (fn == "orderdelete" and prev_m and prev_m.group(1) == "orderinsert"
+                    and prev_m.group(3) == arg2 and script == f"orderdelete({key},{arg2})"):
+                out[prev] = None
+                order.pop(key)
+                continue
+            order[key] = len(out)
+        out.append(script)
+    return [script for script in out if script is not None]
+
+
+def coalesce_stats() -> dict:
+    """Return how many queued scripts coalescing removed so far."""
+    stats = dict(_COALESCE_STATS)
+    stats["ratio"] = stats["sent"] / stats["scripts"] if stats["scripts"] else 1.0
+    return stats
+
+
 class RenderResult:
     """Holds the results of a render operation."""
 
@@ -27,6 +182,43 @@ class RenderResult:
         self.cookies = cookies  # List of (name, value, opts) tuples
         self.redirect_to = None
         self.context = context
+        self.streamed = False  # body holds only the tail of a streamed render
+        self.changed = False  # the render wrote inside its group commit savepoint
+
+
+class ListenerScope:
+    """Listeners registered while rendering one part of a page.
+
+    Scopes form a tree: a ``#from`` row or reactive ``#if`` branch renders in
+    a child scope that is released when the row or branch goes away.
+    """
+
+    __slots__ = ("listeners", "children", "parent")
+
+    def __init__(self, parent=None):
+        self.listeners = []
+        self.children = {}
+        self.parent = parent
+        if parent is not None:
+            parent.children[self] = None
+
+    def release(self):
+        """Remove the listeners of this scope and its descendants."""
+        for child in list(self.children):
+            child.release()
+        for signal, listener in self.listeners:
+            signal.remove_listener(listener)
+        self.listeners.clear()
+        if self.parent is not None:
+            self.parent.children.pop(self, None)
+            self.parent = None
+
+    def count(self) -> int:
+        """Return the number of listeners in this scope and its descendants."""
+        return len(self.listeners) + sum(c.count() for c in self.children)
+
+    def empty(self) -> bool:
+        return not self.listeners and not self.children
 
 
 class RenderContext:
@@ -34,15 +226,35 @@ class RenderContext:
 
     def __init__(self):
         self.next_id = 0
-        self.listeners = []
+        self.root = ListenerScope()
+        self.scope = self.root
+        # listeners registered outside any child scope
+        self.listeners = self.root.listeners
         self.out = []
         self.scripts: list[str] = []
         self.send_script = None
+        # ``schedule_flush(fn)`` makes ``append_script`` buffer scripts until
+        # ``fn`` runs, so updates superseded in the meantime are never sent.
+        self.schedule_flush = None
+        self._outbox: list[str] = []
+        self._outbox_lock = threading.Lock()
         self.rendering = True
         self.reactiveelement = None
         self.headers: list[tuple[str, str]] = []
         self.cookies: list[tuple[str, str, dict]] = []
         self.infinites: dict[int, object] = {}
+        # id(#from node) -> (key param, columns, rows by key) loaded by an
+        # enclosing ``#from`` for its current batch of rows.
+        self.prefetched: dict[int, tuple] = {}
+        # Streaming: ``stream(ctx, chunk)`` receives output at ``#from`` row
+        # boundaries once more than ``stream_threshold`` characters are buffered.
+        self.stream = None
+        self.stream_threshold = 65536
+        self.streamed = False
+        self._stream_out = self.out
+        self._stream_size = 0
+        self._stream_seen = 0
+        self._stream_carry = ""
 
     def marker_id(self) -> int:
         mid = self.next_id
@@ -51,20 +263,55 @@ class RenderContext:
 
     def add_listener(self, signal, listener):
         signal.listeners.append(listener)
-        self.listeners.append((signal, listener))
+        self.scope.listeners.append((signal, listener))
 
     def add_dependency(self, signal):
         """Track *signal* for cleanup without reacting to updates."""
         self.add_listener(signal, lambda *_: None)
 
+    @contextlib.contextmanager
+    def child_scope(self, parent=None):
+        """Register listeners added in the block in a new child scope.
+
+        The scope is created under *parent*, by default the current scope,
+        and is released with it.
+        """
+        scope = ListenerScope(parent or self.scope)
+        prev = self.scope
+        self.scope = scope
+        try:
+            yield scope
+        finally:
+            self.scope = prev
+
     def cleanup(self):
-        for signal, listener in self.listeners:
-            signal.remove_listener(listener)
-        self.listeners.clear()
+        self.root.release()
+        self.scope = self.root
 
     def clear_output(self):
         self.out.clear()
 
+    def maybe_flush(self):
+        """Pass buffered top level output to ``stream`` past the threshold."""
+        if self.stream is None or self.out is not self._stream_out:
+            return
+        self._stream_size += sum(len(s) for s in self.out[self._stream_seen:])
+        self._stream_seen = len(self.out)
+        if self._stream_size < self.stream_threshold:
+            return
+        text = self._stream_carry + "".join(self.out)
+        self.out.clear()
+        self._stream_size = self._stream_seen = 0
+        # keep trailing newlines so '\n\n' normalization matches a full render
+        chunk = text.rstrip("\n")
+        self._stream_carry = text[len(chunk):]
+        self.streamed = True
+        self.stream(self, chunk.replace("\n\n", "\n"))
+
+    def stream_tail(self) -> str:
+        """Return output not yet passed to ``stream``."""
+        return self._stream_carry + "".join(self.out)
+
     def append_script(self, content):
         """Append *content* as a script tag or queue it for later."""
 
@@ -73,11 +320,30 @@ class RenderContext:
         if not send_directly:
             self.out.append(f"<script>{content}</script>")
         else:
-            if self.send_script is not None:
+            if self.send_script is not None and self.schedule_flush is not None:
+                with self._outbox_lock:
+                    self._outbox.append(content)
+                    first = len(self._outbox) == 1
+                if first:
+                    self.schedule_flush(self.flush_scripts)
+            elif self.send_script is not None:
                 self.send_script(content)
             else:
                 self.scripts.append(content)
 
+    def flush_scripts(self):
+        """Send buffered scripts, coalesced, as a single message."""
+        with self._outbox_lock:
+            scripts, self._outbox = self._outbox, []
+        if not scripts:
+            return
+        sent = coalesce_scripts(scripts)
+        _COALESCE_STATS["flushes"] += 1
+        _COALESCE_STATS["scripts"] += len(scripts)
+        _COALESCE_STATS["sent"] += len(sent)
+        if sent and self.send_script is not None:
+            self.send_script(";".join(sent))
+
 
 class RenderResultException(Exception):
     """Exception raised when a render result is returned from a render call."""
@@ -0,0 +1,143 @@
+"""Layered parameter scopes used while rendering rows and partials."""
+
+from .reactive import ReadOnly
+
+__all__ = ["Scope"]
+
+_MISSING = object()
+_DELETED = object()
+
+
+class Scope:
+    """Copy-on-write parameter mapping layered over *parent*.
+
+    Writes and deletions go to a small local dict; reads fall through to an
+    optional row frame and then to *parent*.  A row frame maps column names
+    to positions in *row* (``columns`` is shared by every row of a query)
+    and wraps values in :class:`ReadOnly` on first access, so creating a row
+    scope costs O(columns) regardless of how many parameters are visible.
+
+    >>> base = {"a": 1, "b": 2}
+    >>> s = Scope(base, {"b": 0}, (20,))
+    >>> s["a"], s["b"].value
+    (1, 20)
+    >>> s["a"] = 10
+    >>> del s["b"]
+    >>> sorted(s.items()), base
+    ([('a', 10)], {'a': 1, 'b': 2})
+    """
+
+    __slots__ = ("parent", "local", "columns", "row", "cells")
+
+    def __init__(self, parent, columns=None, row=None, local=None):
+        self.parent = parent
+        self.local = {} if local is None else local
+        self.columns = columns
+        self.row = row
+        self.cells = None if row is None else [None] * len(row)
+
+    def __getitem__(self, key):
+        v = self.local.get(key, _MISSING)
+        if v is not _MISSING:
+            if v is _DELETED:
+                raise KeyError(key)
+            return v
+        if self.columns is not None:
+            i = self.columns.get(key)
+            if i is not None:
+                return self._cell(i)
+        return self.parent[key]
+
+    def _cell(self, i):
+        cell = self.cells[i]
+        if cell is None:
+            cell = self.cells[i] = ReadOnly(self.row[i])
+        return cell
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        v = self.local.get(key, _MISSING)
+        if v is not _MISSING:
+            return v is not _DELETED
+        if self.columns is not None and key in self.columns:
+            return True
+        return key in self.parent
+
+    def __setitem__(self, key, value):
+        self.local[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.local[key] = _DELETED
+
+    def pop(self, key, *default):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self.local[key] = _DELETED
+        return v
+
+    def update(self, other=(), **kwargs):
+        self.local.update(other, **kwargs)
+
+    def clear(self):
+        self.parent = {}
+        self.columns = self.row = self.cells = None
+        self.local.clear()
+
+    def copy(self):
+        """Return a snapshot that later writes to this scope chain won't affect."""
+        parent = self.parent.copy() if isinstance(self.parent, Scope) else self.parent
+        s = Scope(parent, local=self.local.copy())
+        s.columns, s.row, s.cells = self.columns, self.row, self.cells
+        return s
+
+    def to_dict(self):
+        """Return the merged contents as a plain dict."""
+        d = self.parent.to_dict() if isinstance(self.parent, Scope) else dict(self.parent)
+        if self.columns is not None:
+            for k, i in self.columns.items():
+                d[k] = self._cell(i)
+        for k, v in self.local.items():
+            if v is _DELETED:
+                d.pop(k, None)
+            else:
+                d[k] = v
+        return d
+
+    def __iter__(self):
+        """Yield visible keys in ``to_dict`` order without building the dict."""
+        parent, local, columns = self.parent, self.local, self.columns
+        for k in parent:
+            if local.get(k) is not _DELETED:
+                yield k
+        if columns is not None:
+            for k in columns:
+                if k not in parent and local.get(k) is not _DELETED:
+                    yield k
+        for k, v in local.items():
+            if v is not _DELETED and k not in parent and (columns is None or k not in columns):
+                yield k
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((k, self[k]) for k in self)
+
+    def values(self):
+        return (self[k] for k in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(self.to_dict())
@@ -144,6 +144,19 @@ def test_cli_parse_command_error(monkeypatch, tmp_path, capsys):
     assert "Error parsing module bad" in out
 
 
+def test_cli_parse_reports_folding(monkeypatch, tmp_path, capsys):
+    (tmp_path / "a.pageql").write_text(
+        "{{1+1}} {%if 1=1%}yes{%else%}no{%endif%}{%partial p%}hi {{upper('x')}}{%endpartial%}"
+    )
+    argv = ["pageql", str(tmp_path), "db", "--parse"]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 0
+    out = capsys.readouterr().out
+    assert "a: folded 2 expressions, 1 #if conditions, merged 3 text nodes, 1 static partials" in out
+
+
 def test_cli_parse_website(monkeypatch):
     website = Path(__file__).resolve().parent.parent / "website"
     argv = ["pageql", str(website), "db", "--parse"]
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from pageql.pageqlapp import PageQLApp
+
+
+def _app(tmp_path, **kwargs):
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items(name TEXT)")
+    conn.execute("INSERT INTO items VALUES ('a')")
+    conn.commit()
+    conn.close()
+    tpl = tmp_path / "tpl"
+    tpl.mkdir()
+    (tpl / "slow.pageql").write_text("{%reactive off%}{{slow(200)}}done")
+    (tpl / "list.pageql").write_text("{%from items%}<i>{{name}}</i>{%endfrom%}")
+    (tpl / "add.pageql").write_text("{%insert into items values ('b')%}ok")
+    app = PageQLApp(str(db), str(tpl), should_reload=False, csrf_protect=False, db_thread=True, **kwargs)
+    app.conn.create_function("slow", 1, lambda ms: time.sleep(ms / 1000) or threading.current_thread().name)
+    return app
+
+
+async def _request(app, path, method="GET", query=b""):
+    sent = []
+
+    async def send(msg):
+        sent.append(msg)
+
+    async def receive():
+        await asyncio.sleep(10)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": [], "query_string": query}
+    handler = app if path == "/healthz" else app.pageql_handler
+    await handler(scope, receive, send)
+    return b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body").decode()
+
+
+def test_event_loop_stays_responsive_during_slow_render(tmp_path):
+    app = _app(tmp_path)
+
+    async def run():
+        slow = asyncio.create_task(_request(app, "/slow"))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        assert await _request(app, "/healthz") == "OK"
+        healthz_ms = (time.perf_counter() - start) * 1000
+        assert not slow.done()
+        return healthz_ms, await slow
+
+    healthz_ms, body = asyncio.run(run())
+    assert healthz_ms < 100
+    assert "pageql-db" in body and "done" in body
+    assert app.stats()["db_thread"]["completed"] >= 1
+
+
+def test_reactive_updates_from_db_thread_reach_websocket(tmp_path):
+    app = _app(tmp_path)
+    scripts = []
+
+    async def ws_send(msg):
+        scripts.append(msg["text"])
+
+    async def run():
+        app.websockets["c1"] = ws_send
+        assert "<i>a</i>" in await _request(app, "/list", query=b"clientId=c1")
+        assert "ok" in await _request(app, "/add", "POST")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert any("b" in s and "pinsert" in s for s in scripts)
@@ -0,0 +1,43 @@
+import re
+
+import pageql.pyexpr as pyexpr
+from pageql.parser import build_ast, tokenize
+from pageql.pageql import PageQL
+from pageql.pyexpr import ExprPlan
+
+
+def test_build_ast_attaches_plans():
+    body, _ = build_ast(tokenize("{%let n = :a.b * 2%}{%if :n > 1%}{{count(*) from t}}{%endif%}"))
+    let_plan = body[0][1][1]
+    assert isinstance(let_plan, ExprPlan) and let_plan == ":a.b * 2"
+    assert let_plan.kind == "python" and let_plan.deps == ["a__b"]
+    assert let_plan.tree is body[0][1][2]
+    cond = body[1][1][0]
+    assert cond.sql == "select :n > 1" and cond.tree is body[1][1][1]
+    expr = body[1][2][0][1]
+    assert expr.kind == "sql" and expr.deps == []
+
+
+def test_render_does_no_expression_analysis(monkeypatch):
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE t(x)")
+    r.load_module("m", "{%let n = :a * 2%}{%if :n > 1%}{{:n + 1}} {{count(*) from t}}{%endif%}")
+
+    def fail(*args):
+        raise AssertionError("expression analysed at render time")
+
+    monkeypatch.setattr(pyexpr, "get_dependencies", fail)
+    monkeypatch.setattr(pyexpr, "_convert_dot_sql", fail)
+    monkeypatch.setattr(pyexpr.sqlglot, "parse_one", fail)
+    for reactive in (False, True):
+        body = r.render("/m", {"a": 2}, reactive=reactive).body
+        assert re.sub(r"<script>.*?</script>", "", body) == "5 0"
+
+
+def test_plan_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(pyexpr, "_CACHE_SIZE", 4)
+    first = pyexpr.plan_expr(":bounded0 + 1")
+    for i in range(1, 10):
+        pyexpr.plan_expr(f":bounded{i} + 1")
+    assert len(pyexpr._PLANS) <= 4 and len(pyexpr._CACHE) <= 4
+    assert pyexpr.plan_expr(":bounded0 + 1") is not first
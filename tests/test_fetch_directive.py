@@ -310,3 +310,50 @@ def test_fetch_directive_relative_url():
     finally:
         server.shutdown()
         t.join()
+
+
+def test_independent_fetches_run_concurrently(monkeypatch):
+    import time
+    from pageql import pageql as pql_mod
+
+    def fetch(url: str, headers=None, method="GET", body=None, **kwargs):
+        time.sleep(0.2)
+        return {"body": url}
+
+    monkeypatch.setattr(pql_mod, "fetch_sync", fetch)
+    r = PageQL(":memory:")
+    r.load_module(
+        "m",
+        "{%fetch a from 'x'%}-{%fetch b from 'y'%}-{%fetch c from 'z'%}{{a__body}}{{b__body}}{{c__body}}",
+    )
+    start = time.perf_counter()
+    out = r.render("/m", reactive=False).body.strip()
+    assert out == "--xyz"
+    assert time.perf_counter() - start < 0.5
+
+
+def test_dependent_fetch_waits_for_previous(monkeypatch):
+    from pageql import pageql as pql_mod
+
+    monkeypatch.setattr(pql_mod, "fetch_sync", lambda url, **kw: {"body": url + "!"})
+    r = PageQL(":memory:")
+    r.load_module("m", "{%fetch a from 'x'%}{%fetch b from :a__body%}{{b__body}}")
+    assert r._modules["m"][0].ops[0][0] is not pql_mod.PageQL._process_fetch_group
+    assert r.render("/m", reactive=False).body.strip() == "x!!"
+
+
+def test_unsafe_fetch_methods_run_in_order(monkeypatch):
+    from pageql import pageql as pql_mod
+
+    calls = []
+    monkeypatch.setattr(pql_mod, "fetch_sync", lambda url, method="GET", **kw: calls.append(method) or {"body": url})
+    r = PageQL(":memory:")
+    r.load_module(
+        "m",
+        "{%fetch a from 'x' method='POST'%}{%fetch b from 'y' method='DELETE'%}"
+        "{%fetch c from 'z' method='get'%}{%fetch d from 'w'%}{{a__body}}{{d__body}}",
+    )
+    ops = [op for op, _ in r._modules["m"][0].ops]
+    assert ops.count(pql_mod.PageQL._process_fetch_group) == 1
+    assert r.render("/m", reactive=False).body.strip() == "xw"
+    assert calls[:2] == ["POST", "DELETE"]
@@ -0,0 +1,34 @@
+import re
+
+import pageql.pageql as pageql_mod
+from pageql.pageql import PageQL
+
+
+def make_engine(body):
+    r = PageQL(":memory:")
+    fetched = []
+    r.db.create_function("tick", 1, lambda x: fetched.append(x) or x)
+    r.db.create_function("fetched", 0, lambda: len(fetched))
+    r.db.execute("CREATE TABLE t(x)")
+    r.db.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1000)])
+    r.db.execute("CREATE VIEW v AS SELECT tick(x) AS x FROM t")
+    r.load_module("m", "{%from v%}" + body + "{%endfrom%}")
+    return r
+
+
+def first_counts(r, reactive):
+    body = r.render("/m", {}, reactive=reactive).body
+    return [int(n) for n in re.sub(r"<script>.*?</script>", "", body).split()]
+
+
+def test_rows_fetched_in_batches():
+    size = pageql_mod.FROM_BATCH_SIZE
+    for reactive in (False, True):
+        counts = first_counts(make_engine("{{fetched()}}"), reactive)
+        assert len(counts) == 1000
+        assert counts[0] <= size + 1 and counts[-1] == 1000
+
+
+def test_bodies_that_write_fetch_all_rows_first():
+    r = make_engine("{{fetched()}}{%if :x < 0%}{%update t set x = 0 where 0%}{%endif%}")
+    assert first_counts(r, False)[0] == 1000
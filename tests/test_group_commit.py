@@ -0,0 +1,82 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from pageql.database import GroupCommit
+from pageql.pageql import PageQL
+from pageql.pageqlapp import PageQLApp
+
+
+def test_group_commit_shares_commit_and_isolates_failures(tmp_path):
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items(name TEXT)")
+    conn.commit()
+    conn.close()
+    tpl = tmp_path / "tpl"
+    tpl.mkdir()
+    (tpl / "add.pageql").write_text(
+        "{%param name%}{%insert into items values (:name)%}"
+        "{%if :name = 'bad'%}{%insert into missing values (1)%}{%endif%}ok"
+    )
+    (tpl / "count.pageql").write_text("{{count(*) from items}}")
+    app = PageQLApp(
+        str(db), str(tpl), should_reload=False, csrf_protect=False,
+        group_commit_window=0.05,
+    )
+
+    async def post(name, path="/add"):
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        scope = {
+            "type": "http", "method": "POST", "path": path, "headers": [],
+            "query_string": f"name={name}".encode(),
+        }
+        await app.pageql_handler(scope, receive, send)
+        return next(m for m in sent if m["type"] == "http.response.start")["status"]
+
+    async def run():
+        return await asyncio.gather(post("a"), post("bad"), post("x", "/count"), post("b"))
+
+    statuses = asyncio.run(run())
+    assert statuses == [200, 500, 200, 200]
+    # only the renders that wrote wait for the batch commit
+    assert app.stats()["group_commit"] == {"commits": 1, "requests": 2, "pending": 0}
+    other = sqlite3.connect(db)
+    assert sorted(r[0] for r in other.execute("SELECT name FROM items")) == ["a", "b"]
+
+
+def test_failed_commit_rolls_back_batch():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("CREATE TABLE p(id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE c(pid REFERENCES p(id) DEFERRABLE INITIALLY DEFERRED)")
+    conn.commit()
+    gc = GroupCommit(conn, window=0)
+    conn.execute("INSERT INTO c VALUES (1)")
+    with pytest.raises(sqlite3.IntegrityError):
+        asyncio.run(gc.wait())
+    assert not conn.in_transaction
+    conn.execute("INSERT INTO p VALUES (2)")
+    asyncio.run(gc.wait())
+    assert conn.execute("SELECT count(*) FROM c").fetchone()[0] == 0
+
+
+def test_direct_renders_leave_commit_to_caller():
+    r = PageQL(":memory:")
+    r.group_commit = True
+    r.db.execute("CREATE TABLE items(name TEXT)")
+    r.db.commit()
+    r.load_module("add", "{%insert into items values ('a')%}")
+    r.load_module("count", "{{count(*) from items}}")
+    assert r.render("/add", reactive=False).changed
+    assert not r.render("/count", reactive=False).changed
+    assert r.db.in_transaction
+    r.db.commit()
@@ -0,0 +1,159 @@
+import asyncio
+import http.server
+import threading
+import time
+
+from pageql.http_utils import HttpPool
+
+
+def _serve(handler_body):
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            hits.append((self.client_address, self.headers.get("If-None-Match")))
+            handler_body(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", hits
+
+
+def _reply(h, body=b"ok", status=200, **headers):
+    h.send_response(status)
+    for k, v in headers.items():
+        h.send_header(k.replace("_", "-"), v)
+    h.send_header("Content-Length", str(len(body)))
+    h.end_headers()
+    h.wfile.write(body)
+
+
+def test_connections_are_reused():
+    server, url, hits = _serve(_reply)
+    try:
+        pool = HttpPool()
+        assert pool.request_sync(url + "/a")[2] == b"ok"
+        assert pool.request_sync(url + "/b", method="POST")[0] == 501
+
+        async def run():
+            await pool.request(url + "/a")
+            return await pool.request(url + "/b")
+
+        assert asyncio.run(run())[2] == b"ok"
+        stats = pool.stats()["pool"]
+        assert stats["requests"] == 4
+        assert stats["connections"] == 2
+        assert stats["reused"] == 2
+        assert len({addr for addr, _ in hits}) == 2
+    finally:
+        server.shutdown()
+
+
+def test_cache_honours_max_age_and_etag():
+    def body(h):
+        if h.path == "/fresh":
+            _reply(h, b"fresh", Cache_Control="max-age=60")
+        elif h.headers.get("If-None-Match") == '"v1"':
+            _reply(h, b"", status=304, ETag='"v1"')
+        else:
+            _reply(h, b"tagged", Cache_Control="no-cache", ETag='"v1"')
+
+    server, url, hits = _serve(body)
+    try:
+        pool = HttpPool(cache_size=8)
+        for _ in range(3):
+            assert pool.request_sync(url + "/fresh")[2] == b"fresh"
+            assert pool.request_sync(url + "/tagged")[2] == b"tagged"
+        assert [tag for _, tag in hits] == [None, None, '"v1"', '"v1"']
+        assert pool.stats()["cache"] == {"size": 2, "hits": 2, "misses": 4, "revalidated": 2}
+    finally:
+        server.shutdown()
+
+
+def test_concurrent_identical_gets_share_one_request():
+    def body(h):
+        time.sleep(0.2)
+        _reply(h)
+
+    server, url, hits = _serve(body)
+    try:
+        pool = HttpPool()
+
+        async def run():
+            return await asyncio.gather(*(pool.request(url + "/slow") for _ in range(3)))
+
+        assert [r[2] for r in asyncio.run(run())] == [b"ok"] * 3
+        assert len(hits) == 1
+        assert pool.stats()["pool"]["deduplicated"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_only_idempotent_requests_resent_on_dead_connection():
+    import socket
+    import struct
+
+    import pytest
+
+    methods = []
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def handle(sock):
+        buf = b""
+        for n in range(2):
+            while b"\r\n\r\n" not in buf:
+                data = sock.recv(65536)
+                if not data:
+                    return sock.close()
+                buf += data
+            head, _, buf = buf.partition(b"\r\n\r\n")
+            methods.append(head.split(b" ", 1)[0].decode())
+            if n == 0:
+                sock.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        # the server dies after reading the second request: reset the connection
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        sock.close()
+
+    def accept():
+        while True:
+            sock, _ = listener.accept()
+            threading.Thread(target=handle, args=(sock,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+    try:
+        pool = HttpPool()
+        pool.request_sync(url + "/a")
+        assert pool.request_sync(url + "/b", method="PUT")[2] == b"ok"
+        with pytest.raises(ConnectionError):
+            pool.request_sync(url + "/c", method="POST")
+        assert methods == ["GET", "PUT", "PUT", "POST"]
+
+        async def run():
+            await pool.request(url + "/a")
+            with pytest.raises(ConnectionError):
+                await pool.request(url + "/c", method="POST")
+
+        methods.clear()
+        asyncio.run(run())
+        assert methods == ["GET", "POST"]
+    finally:
+        listener.close()
+
+
+def test_each_app_has_its_own_pool(tmp_path):
+    from pageql.http_utils import http_pool
+    from pageql.pageqlapp import PageQLApp
+
+    size = http_pool.cache.size
+    a = PageQLApp(":memory:", tmp_path, create_db=True, should_reload=False, http_cache_size=5)
+    b = PageQLApp(":memory:", tmp_path, create_db=True, should_reload=False, http_cache_size=7)
+    assert a.http_pool.cache.size == 5 and b.http_pool.cache.size == 7
+    assert a.pageql_engine.http_pool is a.http_pool
+    assert http_pool.cache.size == size
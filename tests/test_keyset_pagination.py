@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from pageql.reactive import Order, ReactiveTable
+
+
+ROWS = [(1, "b", None), (2, "a", 3), (3, None, 1), (4, "b", 2), (5, "a", None), (6, None, None), (7, "c", 2)]
+
+
+def make_order(order_sql, limit=2):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT, n INTEGER)")
+    conn.executemany("INSERT INTO items VALUES (?, ?, ?)", ROWS)
+    order = Order(ReactiveTable(conn, "items"), order_sql, limit=limit)
+    queries = []
+    conn.set_trace_callback(queries.append)
+    return conn, order, queries
+
+
+@pytest.mark.parametrize("order_sql", ["name", "name DESC", "n DESC, name", "n, name DESC", "id DESC"])
+def test_pages_match_full_query(order_sql):
+    conn, order, queries = make_order(order_sql)
+    seen = []
+    order.listeners.append(seen.append)
+    expected = conn.execute(order._all_sql).fetchall()
+    while len(order.value) < len(expected):
+        order.load_more(2)
+    assert order.value == expected and order.limit == 8
+    assert [ev[2] for ev in seen] == expected[2:]
+    assert all("OFFSET" not in q for q in queries)
+
+
+def test_offset_fallback_and_exhausted_pages():
+    conn, order, queries = make_order("lower(name)")
+    order.load_more(3)
+    assert len(order.value) == 5 and "OFFSET" in queries[-1]
+    order.load_more(3)
+    order.load_more(3)
+    assert len(order.value) == 7 and order.limit == 11
+
+
+def test_new_rows_keep_receiving_events():
+    conn, order, _ = make_order("id")
+    order.load_more(2)
+    seen = []
+    order.listeners.append(seen.append)
+    order.parent.insert("INSERT INTO items VALUES (0, 'z', 0)", {})
+    assert order.value[0] == (0, "z", 0) and len(order.value) == 4
+    assert seen == [[1, 0, (0, "z", 0)], [2, 4]]
@@ -0,0 +1,55 @@
+from pageql.pageql import PageQL
+
+
+def make_engine(source):
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.execute("CREATE TABLE tags(item_id INTEGER, tag TEXT)")
+    r.db.executemany("INSERT INTO items(name) VALUES (?)", [("a",), ("b",)])
+    r.load_module("m", "{%reactive on%}" + source)
+    ctx = r.render("/m", reactive=False).context
+    return r, ctx
+
+
+def run(r, sql):
+    r.tables.executeone(sql, {})
+
+
+ROW = "{{name}}:{{count(*) from tags where item_id = :id}}"
+
+
+def test_row_listeners_released_with_rows():
+    for source in (
+        "{%from items%}" + ROW + "{%endfrom%}",
+        "{%from items order by name%}" + ROW + "{%endfrom%}",
+    ):
+        r, ctx = make_engine(source)
+        base = ctx.root.count()
+        run(r, "INSERT INTO items(name) VALUES ('c')")
+        grown = ctx.root.count()
+        assert grown > base
+        for i in range(5):
+            run(r, f"UPDATE items SET name = 'x{i}' WHERE id = 3")
+        assert ctx.root.count() == grown
+        run(r, "DELETE FROM items WHERE id = 3")
+        assert ctx.root.count() == base
+        run(r, "INSERT INTO tags VALUES (1, 't')")
+        assert any("1" in s for s in ctx.scripts)
+        ctx.cleanup()
+        assert ctx.root.count() == 0
+
+
+def test_if_branch_listeners_released_on_switch():
+    r, ctx = make_engine(
+        "{%let n = count(*) from items%}"
+        "{%if :n > 2%}{{count(*) from tags}}{%else%}{{name from items where id = 1}}{%endif%}"
+    )
+    base = ctx.root.count()
+    for _ in range(3):
+        run(r, "INSERT INTO items(name) VALUES ('c')")
+        run(r, "DELETE FROM items WHERE name = 'c'")
+    assert ctx.root.count() == base
+    run(r, "INSERT INTO items(name) VALUES ('c')")
+    ctx.scripts.clear()
+    run(r, "INSERT INTO tags VALUES (1, 't')")
+    assert len(ctx.scripts) == 1 and ctx.scripts[0].endswith(',"1")')
@@ -0,0 +1,57 @@
+import pageql.pageql as pageql_mod
+from pageql.pageql import PageQL
+
+
+def make_engine(source, monkeypatch, batch=2):
+    monkeypatch.setattr(pageql_mod, "FROM_BATCH_SIZE", batch)
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE orders(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, order_id INTEGER, sku TEXT)")
+    r.db.executemany("INSERT INTO orders(name) VALUES (?)", [("a",), ("b",), ("c",)])
+    r.db.executemany(
+        "INSERT INTO items(order_id, sku) VALUES (?, ?)",
+        [(1, "x"), (2, "y"), (1, "z"), ("3", "w")],
+    )
+    r.load_module("m", source)
+    queries = []
+    r.db.set_trace_callback(lambda sql: sql.lstrip().lower().startswith("select") and queries.append(sql))
+    return r, queries
+
+
+def render(r, reactive=False):
+    return r.render("/m", {}, reactive=reactive).body.replace("\n", "")
+
+
+def test_correlated_inner_from_loads_per_batch(monkeypatch):
+    r, queries = make_engine(
+        "{%from orders order by id%}{{name}}:{%from items where order_id = :id order by sku desc%}{{sku}}{%endfrom%};{%endfrom%}",
+        monkeypatch,
+    )
+    assert render(r) == "a:zx;b:y;c:w;"
+    # the outer query plus one inner query for each batch of two orders
+    assert len(queries) == 3
+
+
+def test_uncorrelated_inner_from_runs_once(monkeypatch):
+    r, queries = make_engine(
+        "{%from orders order by id%}{{name}}{%from items where sku = :s order by id%}{{id}}{%endfrom%}{%endfrom%}",
+        monkeypatch,
+    )
+    assert r.render("/m", {"s": "x"}, reactive=False).body.replace("\n", "") == "a1b1c1"
+    assert len(queries) == 2
+
+
+def test_assigned_or_reactive_inner_from_runs_per_row(monkeypatch):
+    source = (
+        "{%from orders order by id%}{%let k = :id + 0%}"
+        "{%from items where order_id = :k%}{{sku}}{%endfrom%}{%endfrom%}"
+    )
+    r, queries = make_engine(source, monkeypatch)
+    assert render(r) == "xzyw"
+    assert len(queries) == 4
+    r, queries = make_engine(
+        "{%from orders order by id%}{%from items where order_id = :id%}{{sku}}{%endfrom%}{%endfrom%}",
+        monkeypatch,
+    )
+    body = render(r, reactive=True)
+    assert all(sku in body for sku in "xyzw")
@@ -0,0 +1,90 @@
+import time
+
+from pageql.database import PageCache
+from pageql.pageql import PageQL
+
+
+def make_engine(source, name="m"):
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.execute("CREATE TABLE other(x)")
+    r.db.execute("INSERT INTO items(name) VALUES ('a')")
+    r.db.commit()
+    r.page_cache = PageCache(8, r.tables.versions)
+    r.load_module(name, source)
+    r.load_module("w", "{%insert into items(name) values (:name)%}{%insert into other values (1)%}")
+    return r
+
+
+def get(r, params=None, path="/m"):
+    return r.render(path, params or {}, None, "GET", reactive=False).body.replace("\n", "")
+
+
+def test_reused_until_read_table_changes():
+    r = make_engine("{%from items order by id%}{{name}}{%endfrom%}:{{:q}}")
+    assert get(r, {"q": 1, "unused": 2}) == "a:1"
+    assert get(r, {"q": 1, "unused": 3}) == "a:1"
+    assert r.page_cache.stats()["hits"] == 1
+    assert get(r, {"q": 2}) == "a:2"
+    r.render("/w", {"name": "b"}, None, "POST", reactive=False)
+    r.db.commit()
+    assert get(r, {"q": 1}) == "ab:1"
+    assert r.page_cache.stats()["stale"] == 1
+
+
+def test_unrelated_writes_keep_entries():
+    r = make_engine("{{count(*) from other}}")
+    r.load_module("w2", "{%insert into items(name) values ('c')%}")
+    assert get(r) == "0"
+    r.render("/w2", {}, None, "POST", reactive=False)
+    r.db.commit()
+    assert get(r) == "0"
+    assert r.page_cache.stats()["hits"] == 1
+
+
+def test_ttl_and_volatile_functions(monkeypatch):
+    r = make_engine("{{random()}}")
+    first = get(r)
+    assert get(r) != first and r.page_cache.stats()["entries"] == 0
+
+    r.load_module("m", "{%cache 10%}{{random()}}")
+    first = get(r)
+    assert get(r) == first
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert get(r) != first
+
+
+def test_cache_off_writes_and_transactions():
+    r = make_engine("{%cache off%}{{count(*) from items}}")
+    get(r)
+    get(r)
+    r.load_module("p", "{{count(*) from items}}")
+    r.db.execute("INSERT INTO other VALUES (1)")
+    get(r, path="/p")
+    assert r.page_cache.stats()["entries"] == 0
+    r.db.commit()
+    get(r, path="/p")
+    assert get(r, path="/p") == "1"
+    assert r.page_cache.stats() == {"size": 8, "entries": 1, "hits": 1, "misses": 2, "stale": 0}
+
+
+def test_update_params_renders_bypass_cache():
+    r = make_engine("{%reactive off%}{%let user = 'alice'%}")
+    for _ in range(2):
+        params = {}
+        r.render("/m", params, None, "GET", reactive=False, update_params=True)
+        assert params["user"] == "alice"
+
+
+def test_pages_reusing_cached_partials_track_their_tables():
+    r = make_engine(
+        "{%partial badge cache%}[{{name from items where id = 1}}]{%endpartial%}{%render badge%}{{:other}}"
+    )
+    r.load_module("u", "{%update items set name = 'cat' where id = 1%}")
+    assert get(r, {"other": 1}) == "[a]1"
+    assert get(r, {"other": 2}) == "[a]2"
+    r.render("/u", {}, None, "POST", reactive=False)
+    r.db.commit()
+    assert get(r, {"other": 1}) == "[cat]1"
+    assert get(r, {"other": 2}) == "[cat]2"
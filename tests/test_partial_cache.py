@@ -0,0 +1,53 @@
+import pytest
+
+from pageql.pageql import PageQL
+from pageql.parser import RenderPlan, build_ast, tokenize
+
+
+def make_engine():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE users(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.execute("CREATE TABLE posts(id INTEGER PRIMARY KEY, uid INTEGER)")
+    r.db.executemany("INSERT INTO users(name) VALUES (?)", [("ann",), ("bob",)])
+    r.db.executemany("INSERT INTO posts(uid) VALUES (?)", [(1,), (2,), (1,), (1,)])
+    r.db.commit()
+    r.load_module(
+        "m",
+        "{%partial badge cache%}[{{name from users where id = :uid}}{{:mark}}]{%endpartial%}"
+        "{%from posts order by id%}{%render badge uid=:uid%}{%endfrom%}",
+    )
+    r.load_module("w", "{%update users set name = 'cat' where id = 1%}")
+    return r
+
+
+def render(r, params=None, reactive=False):
+    return r.render("/m", {"mark": "", **(params or {})}, reactive=reactive).body.replace("\n", "")
+
+
+def test_render_args_parsed_at_load():
+    body, _ = build_ast(tokenize("{%render badge uid=:a.b mark='x'%}"))
+    plan = body[0][1]
+    assert isinstance(plan, RenderPlan) and plan == "badge uid=:a.b mark='x'"
+    assert plan.name == "badge" and plan.args[0][1].name == "a__b"
+
+
+def test_output_reused_until_table_changes():
+    r = make_engine()
+    assert render(r) == "[ann][bob][ann][ann]"
+    assert r.partial_cache.stats()["hits"] == 2
+    assert render(r, {"mark": "!"}) == "[ann!][bob!][ann!][ann!]"
+    r.render("/w", {}, reactive=False)
+    r.db.commit()
+    assert render(r) == "[cat][bob][cat][cat]"
+    assert r.partial_cache.stats()["stale"] == 2
+
+
+def test_reactive_renders_are_not_memoized():
+    r = make_engine()
+    body = render(r, reactive=True)
+    assert body.count("ann") == 3 and r.partial_cache.stats()["entries"] == 0
+
+
+def test_cached_partials_reject_side_effects():
+    with pytest.raises(SyntaxError):
+        build_ast(tokenize("{%partial p cache%}{%header X 1%}{%endpartial%}"))
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from pageql.database import evalone
+from pageql.pyexpr import Unsupported, compile_expr
+from pageql.reactive import ReadOnly
+
+EXPRESSIONS = [
+    ":a + :a", ":a - :b", ":a * :b", ":a / :b", ":a % :b", "-:a", ":a / 0",
+    ":a + 1.5", ":s + 1", ":n + 1", "9223372036854775807 + :a",
+    ":a = :b", ":a == 2", ":a <> :s", ":a < :s", ":s > 'abc'", ":a = :n", ":n = :n",
+    ":a is :n", ":n is null", ":a is not null", ":n is not :n",
+    "not :a", "not :s", "not :n", ":n and 0", ":n or 1", ":a and :n", ":z or :n",
+    ":s || :a", ":a || '/' || :b", ":s || :n", ":f || ''",
+    "case when :a > 1 then 'big' when :n then 'n' else 'small' end",
+    "case :a when 1 then 'one' when 2 then 'two' end",
+    "coalesce(:n, :a)", "ifnull(:n, 'x')", "nullif(:a, 2)", "iif(:z, 'y', 'n')",
+    ":a in (1, 2)", ":a in (5, :n)", ":a not in (5, 6)", ":a between 1 and 3",
+    ":a between :n and 1", "max(:a, :b, 3)", "min(:a, :s)", "max(:a, :n)",
+    "abs(:s)", "abs(-:b)", "lower(:s)", "upper('äb' || :s)", "length(:f)",
+    "typeof(:a / 2.0)", "typeof(:n)", ":f % 2", "(:a + :b) * 2",
+    ":z = 1 between 0 and 1", ":z = 2 in (1)", ":a < :b in (1)", "(:a < :b) in (1)",
+    ":a is true", ":s is false", "'x' is false", ":n is true", ":z is not true", ":n is not false",
+]
+PARAMS = {"a": 2, "b": 5, "s": "12ab", "n": None, "z": 0, "f": 2.5}
+# parsed with a different precedence than SQLite's, so left to the database
+NEEDS_SQLITE = {":z = 1 between 0 and 1", ":z = 2 in (1)", ":a < :b in (1)"}
+
+
+@pytest.mark.parametrize("expr", EXPRESSIONS)
+def test_matches_sqlite(expr):
+    fn = compile_expr("select " + expr)
+    expected = sqlite3.connect(":memory:").execute("select " + expr, PARAMS).fetchone()[0]
+    if expr in NEEDS_SQLITE:
+        assert fn is None and evalone(sqlite3.connect(":memory:"), expr, dict(PARAMS)) == expected
+        return
+    assert fn is not None, expr
+    got = fn(PARAMS)
+    assert got == expected and type(got) is type(expected), expr
+
+
+def test_evalone_skips_database_for_parameter_expressions():
+    class NoDb:
+        def execute(self, *args):
+            raise AssertionError("database used")
+
+    assert evalone(NoDb(), ":a.b + 1", {"a__b": ReadOnly(4)}) == 5
+    assert evalone(NoDb(), "NOT :__first_row", {"__first_row": True}) == 0
+    assert compile_expr("select html_escape(:a)") is None
+    conn = sqlite3.connect(":memory:")
+    assert evalone(conn, ":a || 'x'", {"a": b"\x01"}) == "\x01x"
+
+
+def test_non_finite_modulo_needs_sqlite():
+    with pytest.raises(Unsupported):
+        compile_expr("select :x % 2")({"x": float("inf")})
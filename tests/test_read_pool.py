@@ -0,0 +1,72 @@
+import asyncio
+import sqlite3
+import threading
+
+from pageql.pageqlapp import PageQLApp
+
+
+def _get(app, path):
+    sent = []
+
+    async def send(msg):
+        sent.append(msg)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+    asyncio.run(app.pageql_handler(scope, receive, send))
+    return next(m for m in sent if m["type"] == "http.response.body")["body"].decode()
+
+
+def test_read_only_pages_render_on_pool(tmp_path):
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items(name TEXT)")
+    conn.execute("INSERT INTO items VALUES ('apple')")
+    conn.commit()
+    conn.close()
+    tpl = tmp_path / "tpl"
+    tpl.mkdir()
+    (tpl / "list.pageql").write_text(
+        "{%reactive off%}{%from items%}{{name}} {{html_escape('<b>')}}{%endfrom%}"
+    )
+    (tpl / "add.pageql").write_text("{%reactive off%}{%insert into items values ('pear')%}ok")
+    app = PageQLApp(str(db), str(tpl), should_reload=False, read_pool_size=2)
+
+    threads = []
+    reader = app.pageql_engine.reader
+    app.pageql_engine.reader = lambda: (threads.append(threading.current_thread().name), reader())[1]
+
+    assert "apple &amp;lt;b&amp;gt;" in _get(app, "/list")
+    assert app.stats()["read_pool"]["completed"] == 1
+    assert threads and threads[0].startswith("pageql-read")
+
+    assert "ok" in _get(app, "/add")
+    assert app.stats()["read_pool"]["completed"] == 1
+    assert "pear" in _get(app, "/list")
+
+
+def test_reader_connection_is_query_only(tmp_path):
+    db = tmp_path / "data.db"
+    app = PageQLApp(str(db), str(tmp_path), create_db=True, should_reload=False)
+    engine = app.pageql_engine.reader()
+    assert engine.db is not app.pageql_engine.db
+    assert engine._modules is app.pageql_engine._modules
+    main = app.pageql_engine
+    assert engine.tables is not main.tables and engine._from_cache is not main._from_cache
+    assert engine._attached is not main._attached
+    try:
+        engine.db.execute("CREATE TABLE t(x)")
+        assert False, "write should fail"
+    except sqlite3.OperationalError:
+        pass
+
+
+def test_read_only_decided_at_load(monkeypatch):
+    from pageql.pageql import PageQL
+
+    r = PageQL(":memory:")
+    r.load_module("a", "{%reactive off%}{{1}}")
+    monkeypatch.setattr(PageQL, "_scan_read_only", lambda *a: 1 / 0)
+    assert r.is_read_only("a") and r.is_read_only("a", reactive=False)
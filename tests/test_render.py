@@ -3,7 +3,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 
-from pageql.pageql import PageQL, RenderContext, _row_hash
+from pageql.pageql import PageQL, RenderContext
 from pageql.reactive import DerivedSignal
 
 
@@ -106,13 +106,11 @@ def test_from_reactive_uses_parse(monkeypatch):
     r.load_module("m", "{%reactive on%}{%from items%}[{{id}}]{%endfrom%}")
     result = r.render("/m", reactive=False)
     assert seen == ["SELECT * FROM items"]
-    h1 = _row_hash((1, "a"))
-    h2 = _row_hash((2, "b"))
     expected = (
         ""
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1}')</script>[1]<script>pend('0_{h1}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[2]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[1]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[2]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
     )
     assert result.body == expected
@@ -248,15 +246,13 @@ def test_from_reactive_delete_event():
     r.db.executemany("INSERT INTO items(name) VALUES (?)", [("a",), ("b",)])
     r.load_module("m", "{%reactive on%}{%from items%}[{{id}}]{%endfrom%}{%delete from items where id=1%}")
     result = r.render("/m", reactive=False)
-    h1 = _row_hash((1, "a"))
-    h2 = _row_hash((2, "b"))
     expected = (
         ""
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1}')</script>[1]<script>pend('0_{h1}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[2]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[1]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[2]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pdelete('0_{h1}')</script>"
+        f"<script>pdelete('0_1')</script>"
     )
     assert result.body == expected
 
@@ -271,15 +267,12 @@ def test_from_reactive_update_event():
     )
     result = r.render("/m", reactive=False)
 
-    h1_old = _row_hash((1, "a"))
-    h1_new = _row_hash((1, "c"))
-    h2 = _row_hash((2, "b"))
     expected = (
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1_old}')</script>[a]<script>pend('0_{h1_old}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[b]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[a]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[b]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pupdate('0_{h1_old}','0_{h1_new}',\"[c]\")</script>"
+        f"<script>pset('0_1',\"[c]\")</script>"
     )
     assert result.body == expected
 
@@ -293,15 +286,12 @@ def test_from_reactive_insert_event():
     )
     result = r.render("/m", reactive=False)
 
-    h1 = _row_hash((1, "a"))
-    h2 = _row_hash((2, "b"))
-    h3 = _row_hash((3, "c"))
     expected = (
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1}')</script>[a]<script>pend('0_{h1}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[b]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[a]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[b]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pinsert('0_{h3}',\"[c]\")</script>"
+        f"<script>pinsert('0_3',\"[c]\")</script>"
     )
     assert result.body == expected
 
@@ -316,15 +306,13 @@ def test_from_nonreactive_delete_event():
     )
     result = r.render("/m")
 
-    h1 = _row_hash((1, "a"))
-    h2 = _row_hash((2, "b"))
     expected = (
         ""
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1}')</script>[1]<script>pend('0_{h1}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[2]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[1]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[2]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pdelete('0_{h1}')</script>"
+        f"<script>pdelete('0_1')</script>"
     )
     assert result.body == expected
 
@@ -339,15 +327,12 @@ def test_from_nonreactive_update_event():
     )
     result = r.render("/m")
 
-    h1_old = _row_hash((1, "a"))
-    h1_new = _row_hash((1, "c"))
-    h2 = _row_hash((2, "b"))
     expected = (
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1_old}')</script>[a]<script>pend('0_{h1_old}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[b]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[a]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[b]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pupdate('0_{h1_old}','0_{h1_new}',\"[c]\")</script>"
+        f"<script>pset('0_1',\"[c]\")</script>"
     )
     assert result.body == expected
 
@@ -362,15 +347,12 @@ def test_from_nonreactive_insert_event():
     )
     result = r.render("/m")
 
-    h1 = _row_hash((1, "a"))
-    h2 = _row_hash((2, "b"))
-    h3 = _row_hash((3, "c"))
     expected = (
         f"<script>pstart(0)</script>"
-        f"<script>pstart('0_{h1}')</script>[a]<script>pend('0_{h1}')</script>\n"
-        f"<script>pstart('0_{h2}')</script>[b]<script>pend('0_{h2}')</script>\n"
+        f"<script>pstart('0_1')</script>[a]<script>pend('0_1')</script>\n"
+        f"<script>pstart('0_2')</script>[b]<script>pend('0_2')</script>\n"
         f"<script>pend(0)</script>"
-        f"<script>pinsert('0_{h3}',\"[c]\")</script>"
+        f"<script>pinsert('0_3',\"[c]\")</script>"
     )
     assert result.body == expected
 
@@ -0,0 +1,54 @@
+from pageql.pageql import PageQL, _row_hash
+
+
+def render(schema, source, rows=()):
+    r = PageQL(":memory:")
+    r.db.execute(schema)
+    for row in rows:
+        r.db.execute(f"INSERT INTO t VALUES ({','.join('?' * len(row))})", row)
+    r.load_module("m", "{%reactive on%}" + source)
+    return r.render("/m", reactive=False).body
+
+
+def test_primary_key_ids_and_in_place_updates():
+    body = render(
+        "CREATE TABLE t(id INTEGER PRIMARY KEY, name TEXT)",
+        "{%from t%}{{name}}{%endfrom%}{%update t set name = 'z' where id = 1%}"
+        "{%update t set id = 5 where id = 2%}",
+        [(1, "a"), (2, "b")],
+    )
+    assert "pstart('0_1')" in body and "pset('0_1',\"z\")" in body
+    assert "pupdate('0_2','0_5',\"b\")" in body
+
+
+def test_composite_and_unique_keys():
+    body = render(
+        "CREATE TABLE t(a TEXT, b INTEGER, c TEXT UNIQUE, PRIMARY KEY (a, b))",
+        "{%from t%}{{c}}{%endfrom%}",
+        [("x", 1, "p")],
+    )
+    # single unique columns are preferred over composite keys
+    assert "pstart('0_~p')" in body
+    body = render(
+        "CREATE TABLE t(a TEXT, b INTEGER, PRIMARY KEY (a, b))",
+        "{%from t%}{{b}}{%endfrom%}",
+        [("x", 1)],
+    )
+    assert "pstart('0_~x,1')" in body
+
+
+def test_hash_fallback():
+    body = render("CREATE TABLE t(x, y)", "{%from t%}{{x}}{%endfrom%}", [(1, 2)])
+    assert f"pstart('0_{_row_hash((1, 2))}')" in body
+    body = render(
+        "CREATE TABLE t(k TEXT PRIMARY KEY, v)",
+        "{%from t%}{{v}}{%endfrom%}",
+        [("it's", 1)],
+    )
+    h = _row_hash(("it's", 1))
+    assert f"pstart('0_{h}')" in body
+
+
+def test_text_and_integer_keys_differ():
+    body = render("CREATE TABLE t(k UNIQUE, v)", "{%from t%}{{v}}{%endfrom%}", [(1, "a"), ("1", "b")])
+    assert "pstart('0_1')" in body and "pstart('0_~1')" in body
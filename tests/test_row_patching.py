@@ -0,0 +1,55 @@
+import json
+import re
+
+from pageql.pageql import PageQL
+from pageql.render_context import html_patch
+
+
+def make_engine(body):
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE todos(id INTEGER PRIMARY KEY, text TEXT, completed INTEGER)")
+    r.db.execute("INSERT INTO todos(text, completed) VALUES ('write a long description', 0)")
+    r.load_module("m", "{%reactive on%}{%from todos%}" + body + "{%endfrom%}")
+    return r
+
+
+def update(r, sql):
+    ctx = r.render("/m", reactive=False).context
+    ctx.scripts.clear()
+    r.tables.executeone(sql, {})
+    return ctx.scripts
+
+
+BODY = (
+    '<li class="{%if completed%}done{%endif%}">'
+    '<input type="checkbox" hx-post="/toggle?id={{id}}"{%if completed%} checked{%endif%}>'
+    "<label>{{text}}</label></li>"
+)
+
+
+def test_changed_attributes_and_texts_are_patched():
+    r = make_engine(BODY)
+    scripts = update(r, "UPDATE todos SET completed = 1 WHERE id = 1")
+    assert len(scripts) == 1
+    m = re.fullmatch(r"ppatch\('0_1',(.*)\)", scripts[0])
+    assert json.loads(m.group(1)) == [
+        [0, {"class": "done"}],
+        [1, {"type": "checkbox", "hx-post": "/toggle?id=1", "checked": ""}],
+    ]
+    scripts = update(r, "UPDATE todos SET text = 'x&y' WHERE id = 1")
+    assert scripts == ["ppatch('0_1',[[3, \"x&y\"]])"]
+
+
+def test_unchanged_rows_send_nothing_and_structure_changes_resend():
+    r = make_engine("<b>{{text}}</b>{%if :completed > 1%}<i>!</i>{%endif%}")
+    assert update(r, "UPDATE todos SET completed = 1 WHERE id = 1") == []
+    assert update(r, "UPDATE todos SET completed = 2 WHERE id = 1") == [
+        "pset('0_1',\"<b>write a long description</b><i>!</i>\")"
+    ]
+
+
+def test_html_patch_rejects_special_content():
+    assert html_patch("<p>a</p><script>x</script>", "<p>b</p><script>x</script>") is None
+    assert html_patch("a < b", "a < c") is None
+    assert html_patch("<!-- a -->x", "<!-- a -->y") is None
+    assert html_patch('<tr class="a"><td>x</td></tr>', '<tr class="b"><td>x</td></tr>') is None
@@ -0,0 +1,67 @@
+import sqlite3
+
+from pageql.reactive import StatsConnection, Tables, Select, set_statement_cache_size, statement_stats
+from pageql.pageql import PageQL
+
+
+def _pragmas(conn):
+    st = statement_stats(conn)
+    return st["hits"] + st["misses"]
+
+
+def test_catalog_loaded_once_and_select_columns_cached():
+    conn = sqlite3.connect(":memory:", factory=StatsConnection)
+    set_statement_cache_size(conn, 128)
+    conn.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    tables = Tables(conn)
+    assert tables.schema("items") == (["id", "name"], {"id", "name"})
+    before = _pragmas(conn)
+    tables.tables.clear()
+    t = tables._get("items")
+    assert t.unique_columns == {"id", "name"}
+    s1 = Select(t, "name")
+    s2 = Select(t, "name")
+    assert s1.columns == s2.columns == ["name"]
+    assert _pragmas(conn) == before + 1
+
+
+def test_schema_version_change_refreshes_tables():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE items(id INTEGER PRIMARY KEY)")
+    tables = Tables(conn)
+    tables.check_schema()
+    t = tables._get("items")
+    conn.execute("ALTER TABLE items ADD COLUMN name TEXT")
+    assert t.columns == ["id"]
+    tables.check_schema()
+    assert t.columns == ["id", "name"]
+    assert tables._get("items") is t
+
+
+def test_create_directive_invalidates_catalog():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY)")
+    r.load_module("m", "{%create index idx_items on items(id)%}"
+                       "{%create table other(x TEXT UNIQUE)%}")
+    assert r.tables.schema("other") == ([], set())
+    r.render("/m", reactive=False)
+    assert r.tables.schema("other") == (["x"], {"x"})
+
+
+def test_other_dialects_skip_schema_version():
+    class NoPragma:
+        def execute(self, sql, *args):
+            assert not sql.startswith("PRAGMA")
+
+    tables = Tables(NoPragma(), "postgres")
+    tables.check_schema()
+    tables.invalidate()
+    assert tables.versions[None] == 1
+
+
+def test_missing_tables_not_cached():
+    conn = sqlite3.connect(":memory:")
+    tables = Tables(conn)
+    assert tables.schema("later") == ([], set())
+    conn.execute("CREATE TABLE later(id INTEGER PRIMARY KEY)")
+    assert tables.schema("later") == (["id"], {"id"})
@@ -0,0 +1,41 @@
+from pageql.pageql import PageQL
+from pageql.reactive import ReadOnly
+from pageql.scope import Scope
+
+
+def test_copy_is_isolated_from_later_writes():
+    row = Scope({"a": 1}, {"id": 0}, (7,))
+    snap = Scope(row).copy()
+    row["a"] = 2
+    row.pop("id")
+    assert snap["a"] == 1
+    assert snap["id"].value == 7
+    assert "id" not in row and row.get("id") is None
+    assert isinstance(snap.to_dict()["id"], ReadOnly)
+
+
+def test_rows_layer_over_params():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.executemany("INSERT INTO items(name) VALUES (?)", [("a",), ("b",)])
+    r.load_module(
+        "m",
+        "{%partial public show%}{{name}}-{{y}}-{{x}}{%endpartial%}"
+        "{%let x = 1%}{%from items order by id%}{%let y = :id * 10%}{%render show%};{%endfrom%}"
+        "{%ifdef y%}leak{%endif%}",
+    )
+    params = {"headers": {"host": "h"}}
+    assert r.render("/m", params, reactive=False).body.split() == ["a-10-1;", "b-20-1;"]
+    body = r.render("/m", params, reactive=True).body
+    assert "a-10-1;" in body and "b-20-1;" in body and "leak" not in body
+    assert params == {"headers": {"host": "h"}}
+
+
+def test_iteration_is_lazy_and_matches_to_dict(monkeypatch):
+    base = Scope({"a": 1, "b": 2, "c": 3}, {"b": 0, "id": 1}, (20, 7))
+    s = Scope(base, local={"c": 30, "d": 4})
+    del s["a"]
+    expected = s.to_dict()
+    monkeypatch.setattr(Scope, "to_dict", lambda self: 1 / 0)
+    assert list(s) == list(expected) == ["b", "c", "id", "d"]
+    assert dict(s.items()) == expected and len(s) == 4
@@ -0,0 +1,60 @@
+from pageql.pageql import PageQL
+from pageql.render_context import coalesce_scripts, coalesce_stats
+
+
+def test_latest_state_per_marker_kept():
+    scripts = [
+        "pset(1,'a')",
+        "ppatch('0_1',[[0, \"x\"]])",
+        "pupdatetag(2,'<b>')",
+        "pset('0_1','y')",
+        "pset(1,'b')",
+        "pupdatetag(2,'<i>')",
+        "console.log(1)",
+    ]
+    assert coalesce_scripts(scripts) == [
+        "pset('0_1','y')",
+        "pset(1,'b')",
+        "pupdatetag(2,'<i>')",
+        "console.log(1)",
+    ]
+
+
+def test_structural_changes_end_runs():
+    scripts = ["pset('0_1','a')", "pupdate('0_1','0_2','b')", "pset('0_2','c')", "pset('0_1','d')"]
+    assert coalesce_scripts(scripts) == scripts
+    scripts = ["pdelete('0_1')", "pinsert('0_1','a')"]
+    assert coalesce_scripts(scripts) == scripts
+
+
+def test_insert_delete_pairs_cancel():
+    scripts = ["pinsert('0_3','a')", "ppatch('0_3',[])", "pset(0,'n')", "pdelete('0_3')"]
+    assert coalesce_scripts(scripts) == ["pset(0,'n')"]
+    scripts = ["orderinsert(4,2,'a')", "orderdelete(4,2)", "orderinsert(4,0,'b')"]
+    assert coalesce_scripts(scripts) == ["orderinsert(4,0,'b')"]
+
+
+def test_order_moves_merged():
+    scripts = ["orderupdate(4,0,2,'a')", "orderupdate(5,1,0,'x')", "orderupdate(4,2,3,'b')"]
+    assert coalesce_scripts(scripts) == ["orderupdate(5,1,0,'x')", "orderupdate(4,0,3,'b')"]
+    scripts = ["orderupdate(4,0,2,'a')", "orderinsert(4,0,'c')", "orderupdate(4,2,3,'b')"]
+    assert coalesce_scripts(scripts) == scripts
+
+
+def test_updates_sent_once_per_flush():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE c(id INTEGER PRIMARY KEY, n INTEGER)")
+    r.db.execute("INSERT INTO c(n) VALUES (0)")
+    r.load_module("m", "{%reactive on%}{{n from c where id = 1}}")
+    ctx = r.render("/m", reactive=False).context
+    sent, flushes = [], []
+    ctx.send_script = sent.append
+    ctx.schedule_flush = flushes.append
+    before = coalesce_stats()
+    for i in range(1, 6):
+        r.tables.executeone("UPDATE c SET n = :n WHERE id = 1", {"n": i})
+    assert sent == [] and len(flushes) == 1
+    flushes[0]()
+    assert sent == ['pset(0,"5")']
+    stats = coalesce_stats()
+    assert stats["scripts"] - before["scripts"] == 5 and stats["sent"] - before["sent"] == 1
@@ -0,0 +1,53 @@
+import sqlite3
+
+from pageql.pageql import PageQL
+from pageql.pageqlapp import PageQLApp
+
+
+def test_profile_applied_to_existing_database(tmp_path):
+    db = tmp_path / "old.db"
+    sqlite3.connect(db).execute("CREATE TABLE t(x)").connection.close()
+    engine = PageQL(str(db), {"busy_timeout": 1234, "mmap_size": 4096})
+    pragma = lambda name: engine.db.execute(f"PRAGMA {name}").fetchone()[0]
+    assert pragma("journal_mode") == "wal"
+    assert pragma("busy_timeout") == 1234
+    assert pragma("mmap_size") == 4096
+    assert pragma("temp_store") == 2
+    assert engine.sqlite_profile["cache_size"] == 10000
+
+
+def test_background_checkpoint_reports_latency(tmp_path):
+    db = tmp_path / "data.db"
+    app = PageQLApp(str(db), str(tmp_path), create_db=True, should_reload=False, checkpoint_interval=1)
+    assert app.conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+    app.conn.execute("CREATE TABLE t(x)")
+    app.conn.commit()
+    app.checkpointer.checkpoint()
+    stats = app.stats()["checkpoint"]
+    assert stats["count"] == 1
+    assert stats["last_ms"] >= 0
+    assert stats["wal_frames"][0] == stats["wal_frames"][1]
+
+
+def test_checkpoint_failures_reported_through_app(tmp_path):
+    import asyncio
+
+    db = tmp_path / "data.db"
+    app = PageQLApp(str(db), str(tmp_path), create_db=True, should_reload=False, checkpoint_interval=0.001)
+    errors = []
+    checkpointer = app.checkpointer
+    assert checkpointer.on_error == app._error
+    checkpointer.on_error = errors.append
+
+    def fail():
+        raise sqlite3.OperationalError("database is locked")
+
+    checkpointer.checkpoint = fail
+
+    async def run():
+        task = asyncio.create_task(checkpointer.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run())
+    assert errors and errors[0] == "WAL checkpoint failed: database is locked"
@@ -0,0 +1,35 @@
+import sqlite3
+
+from pageql.reactive import execute, Order, StatsConnection, Tables, set_statement_cache_size, statement_stats
+from pageql.database import connect_database
+
+
+def test_order_binds_limit_and_offset():
+    conn = sqlite3.connect(":memory:", factory=StatsConnection)
+    conn.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items(name) VALUES (?)", [(str(i),) for i in range(10)])
+    set_statement_cache_size(conn, 16)
+    order = Order(Tables(conn)._get("items"), "id", limit=2)
+    before = statement_stats(conn)
+    for limit in range(3, 8):
+        order.set_limit(limit)
+    after = statement_stats(conn)
+    assert after["misses"] == before["misses"]
+    assert after["hits"] == before["hits"] + 5
+    assert order.sql.endswith("LIMIT 7")
+    assert order._fetch_row(8) == (9, "8")
+
+
+def test_connect_database_sets_cache_size():
+    conn, _ = connect_database(":memory:", cached_statements=64)
+    assert statement_stats(conn)["size"] == 64
+
+
+def test_stats_only_recorded_when_enabled():
+    conn = sqlite3.connect(":memory:", factory=StatsConnection)
+    Tables(conn)
+    execute(conn, "select 1", [])
+    assert conn.statement_stats is None and statement_stats(conn)["misses"] == 0
+    plain = sqlite3.connect(":memory:")
+    execute(plain, "select 1", [])
+    assert statement_stats(plain)["misses"] == 0
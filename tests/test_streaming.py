@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+
+from pageql.pageql import PageQL
+from pageql import pageqlapp
+from pageql.pageqlapp import PageQLApp
+
+
+def test_stream_chunks_match_buffered_render():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.executemany("INSERT INTO items(name) VALUES (?)", [(f"n{i}",) for i in range(50)])
+    r.load_module("m", "<ul>\n\n{%from items%}\n<li>{{name}}</li>\n\n{%endfrom%}</ul>")
+    chunks = []
+    result = r.render("/m", reactive=False, stream=lambda ctx, c: chunks.append(c), stream_threshold=100)
+    assert result.streamed and len(chunks) > 5
+    assert "".join(chunks) + result.body == r.render("/m", reactive=False).body
+
+
+def test_app_streams_read_only_pages(tmp_path):
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items(name TEXT)")
+    conn.executemany("INSERT INTO items VALUES (?)", [(f"item{i}",) for i in range(200)])
+    conn.commit()
+    conn.close()
+    tpl = tmp_path / "tpl"
+    tpl.mkdir()
+    (tpl / "list.pageql").write_text("{%reactive off%}{%header X-Test 'a'%}{%from items%}{{name}}{%endfrom%}")
+    (tpl / "late.pageql").write_text("{%reactive off%}{%from items%}{{name}}{%endfrom%}{%header X-Test 'b'%}")
+    app = PageQLApp(str(db), str(tpl), should_reload=False, read_pool_size=1, stream_threshold=500)
+
+    def get(path):
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+        asyncio.run(app.pageql_handler(scope, receive, send))
+        return sent
+
+    sent = get("/list")
+    assert (b"X-Test", b"a") in sent[0]["headers"]
+    bodies = [m for m in sent if m["type"] == "http.response.body"]
+    assert len(bodies) > 2
+    assert all(m.get("more_body") for m in bodies[:-1]) and not bodies[-1].get("more_body")
+    html = b"".join(m["body"] for m in bodies).decode()
+    assert html.startswith("<html><body>") and html.endswith("</body></html>")
+    assert html.count("item") == 200 and "item199" in html
+
+    sent = get("/late")
+    assert (b"X-Test", b"b") in sent[0]["headers"]
+    assert len([m for m in sent if m["type"] == "http.response.body"]) == 1
+
+
+def test_db_thread_not_blocked_by_slow_stream_reader(tmp_path, monkeypatch):
+    monkeypatch.setattr(pageqlapp, "STREAM_QUEUE_LIMIT", 250)
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE items(name TEXT)")
+    conn.executemany("INSERT INTO items VALUES (?)", [(f"item{i}",) for i in range(200)])
+    conn.commit()
+    conn.close()
+    tpl = tmp_path / "tpl"
+    tpl.mkdir()
+    (tpl / "list.pageql").write_text("{%reactive off%}{%from items%}{{name}}{%endfrom%}")
+    app = PageQLApp(str(db), str(tpl), should_reload=False, db_thread=True, stream_threshold=100)
+
+    async def run():
+        gate = asyncio.Event()
+        sent = []
+
+        async def send(msg):
+            await gate.wait()
+            sent.append(msg)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        scope = {"type": "http", "method": "GET", "path": "/list", "headers": [], "query_string": b""}
+        request = asyncio.create_task(app.pageql_handler(scope, receive, send))
+        await asyncio.sleep(0.05)
+        # the render finished although the client has not read a chunk yet
+        assert await asyncio.wait_for(app.db_thread.submit(lambda: 1), 1) == 1
+        gate.set()
+        await request
+        return [m.get("body", b"").decode() for m in sent if m["type"] == "http.response.body"]
+
+    bodies = asyncio.run(run())
+    app.db_thread.close()
+    assert "".join(bodies).count("item") == 200
+    # only the chunks up to the limit were queued, the rest was sent at once
+    assert 2 < len(bodies) <= 5 and len(bodies[-1]) > 1000
@@ -0,0 +1,35 @@
+from pageql.pageql import PageQL, CompiledNodes
+
+
+SOURCES = {
+    "text": "a{{!-- c --}}b",
+    "param": "{%param name default='x'%}<{{name}}>{{{name}}}",
+    "if": "{%let n = 3%}{%if :n > 5%}big{%elif :n > 2%}mid{%else%}small{%endif%}",
+    "from": "{%from items order by id%}<li>{{name}}</li>{%ifdef name%}!{%endif%}{%endfrom%}",
+    "partial": "{%partial public greet%}hi {{who}}{%endpartial%}{%render greet who='Bob'%}",
+    "update": "{%insert into items(name) values ('z')%}{{count(*) from items}}",
+}
+
+
+def _render(compiled, name, reactive):
+    r = PageQL(":memory:")
+    r.compiled = compiled
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    r.db.executemany("INSERT INTO items(name) VALUES (?)", [("a",), ("<b>",)])
+    r.load_module(name, SOURCES[name])
+    return r.render("/" + name, reactive=reactive).body
+
+
+def test_compiled_matches_interpreter():
+    for name in SOURCES:
+        for reactive in (False, True):
+            assert _render(True, name, reactive) == _render(False, name, reactive), name
+
+
+def test_bodies_are_compiled_at_load_time():
+    r = PageQL(":memory:")
+    r.load_module("m", "x{%if :y%}a{{!-- c --}}b{%endif%}y")
+    body = r._modules["m"][0]
+    assert isinstance(body, CompiledNodes)
+    assert isinstance(body[1][2], CompiledNodes)
+    assert body[1][2].ops == [(None, "ab")]
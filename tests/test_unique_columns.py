@@ -47,6 +47,7 @@ def test_unique_columns_with_composite_index():
     rt = ReactiveTable(conn, "items")
     assert ("item_id", "tag") in rt.unique_columns
     assert ("tag", "value") in rt.unique_columns
+    assert "tag" not in rt.unique_columns
 
     w = Where(rt, "tag IS NOT NULL")
     assert ("item_id", "tag") in w.unique_columns
@@ -0,0 +1,88 @@
+import asyncio
+import random
+import sqlite3
+
+import pageql.pageqlapp
+from pageql.pageql import PageQL, RenderContext
+from pageql.reactive import Order, ReactiveTable
+
+
+def make_order(limit=10, order_sql="name, id"):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE items(id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items(name) VALUES (?)", [(f"n{i % 7}",) for i in range(100)])
+    order = Order(ReactiveTable(conn, "items"), order_sql, limit=limit)
+    mirror = list(order.value)
+
+    def apply(ev):
+        if ev[0] == 1:
+            mirror.insert(ev[1], ev[2])
+        elif ev[0] == 2:
+            mirror.pop(ev[1])
+        else:
+            mirror.pop(ev[1])
+            mirror.insert(ev[2], ev[3])
+
+    order.listeners.append(apply)
+    full = conn.execute(order._all_sql).fetchall()
+    return order, mirror, full
+
+
+def test_set_window_matches_full_result():
+    for order_sql in ("name, id", "lower(name)"):
+        order, mirror, full = make_order(order_sql=order_sql)
+        rng = random.Random(1)
+        for _ in range(50):
+            offset, limit = rng.randrange(-5, 110), rng.randrange(1, 30)
+            order.set_window(offset, limit)
+            expected = full[max(offset, 0) : max(offset, 0) + limit]
+            assert order.value == expected and mirror == expected
+
+
+def test_move_window_keeps_rows_bounded():
+    order, mirror, full = make_order()
+    order.window = 20
+    # scroll down one row at a time, then back up
+    for pos in [*range(97), *range(96, -1, -1)]:
+        order.move_window(pos - order.offset, 4)
+        assert len(order.value) <= 20 and mirror == order.value
+        assert order.value[pos - order.offset : pos - order.offset + 4] == full[pos : pos + 4]
+        if pos == 96:
+            assert order.value[-1] == full[-1]
+    assert order.offset == 0 and mirror == full[:20]
+
+
+def test_infinite_window_directive():
+    r = PageQL(":memory:")
+    r.db.execute("CREATE TABLE items(id INTEGER PRIMARY KEY)")
+    r.db.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(100)])
+    r.load_module("m", "{%from items order by id infinite window 30%}{{id}}{%endfrom%}")
+    result = r.render("/m")
+    order = result.context.infinites[0]
+    assert order.window == 30 and len(order.value) == 30
+    assert "maybe_load_more(document.body, 0, 1)" in result.body
+
+
+def test_pageqlapp_moves_window(tmp_path):
+    app = pageql.pageqlapp.PageQLApp(":memory:", tmp_path, create_db=True, should_reload=False)
+    order, mirror, full = make_order()
+    order.window = 10
+    ctx = RenderContext()
+    mid = ctx.marker_id()
+    ctx.infinites[mid] = order
+    app.render_contexts["cid"].append(ctx)
+    messages = [
+        {"type": "websocket.connect"},
+        {"type": "websocket.receive", "text": f"infinite_window {mid} 9 1"},
+        {"type": "websocket.disconnect"},
+    ]
+
+    async def send(msg):
+        pass
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "websocket", "path": "/reload-request-ws", "query_string": b"clientId=cid"}
+    asyncio.run(app._handle_reload_websocket(scope, receive, send))
+    assert order.offset == 5 and mirror == full[5:15]
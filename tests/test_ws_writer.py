@@ -0,0 +1,132 @@
+import asyncio
+import random
+
+from pageql.pageqlapp import WsWriter
+
+
+def test_scripts_sent_in_order_by_one_task():
+    sent = []
+
+    async def send(msg):
+        await asyncio.sleep(random.random() / 1000)
+        sent.append(msg["text"])
+
+    async def run():
+        w = WsWriter(send)
+        for i in range(50):
+            w.put(f"s{i}")
+        task = w._task
+        while w.queue or w.pending:
+            await asyncio.sleep(0.001)
+        assert w._task is task
+        return w
+
+    w = asyncio.run(run())
+    assert sent == [f"s{i}" for i in range(50)]
+    stats = w.stats()
+    assert stats["sent"] == 50 and stats["depth"] == 0 and stats["max_depth"] >= 49
+    assert stats["max_latency_ms"] >= stats["avg_latency_ms"] > 0
+
+
+def test_slow_client_coalesced_then_reloaded():
+    sent = []
+    gate = None
+
+    async def send(msg):
+        await gate.wait()
+        sent.append(msg["text"])
+
+    async def run():
+        nonlocal gate
+        gate = asyncio.Event()
+        w = WsWriter(send, low_water=10, high_water=20, reload_water=60)
+        for i in range(4):
+            w.put(f"script{i}")
+        assert w.state == "coalescing" and len(w.queue) == 1
+        await asyncio.sleep(0)
+        w.put("script4")
+        w.put("script5")
+        assert len(w.queue) == 1
+        gate.set()
+        while w.pending:
+            await asyncio.sleep(0)
+        assert w.state == "ok"
+        assert sent == ["script0;script1;script2;script3", "script4;script5"]
+
+        gate.clear()
+        for i in range(10):
+            w.put(f"script{i}")
+        assert w.state == "reloading" and list(w.queue) == [("reload", w.queue[0][1])]
+        w.put("dropped")
+        gate.set()
+        while w.pending:
+            await asyncio.sleep(0)
+        return w
+
+    w = asyncio.run(run())
+    assert sent[-1] == "reload" and "dropped" not in sent
+    assert w.stats()["reloads"] == 1 and w.stats()["coalesced"] == 11
+
+
+def test_stalled_send_closes_connection():
+    messages = []
+
+    async def send(msg):
+        messages.append(msg)
+        if msg["type"] == "websocket.send":
+            await asyncio.sleep(10)
+
+    async def run():
+        w = WsWriter(send, send_timeout=0.01)
+        w.put("a")
+        w.put("b")
+        await w._task
+        w.put("c")
+        return w
+
+    w = asyncio.run(run())
+    assert w.state == "closed" and w.stats()["depth"] == 0
+    assert [m["type"] for m in messages] == ["websocket.send", "websocket.close"]
+
+
+def test_app_reports_queue_stats(tmp_path):
+    import pageql.pageqlapp
+
+    app = pageql.pageqlapp.PageQLApp(":memory:", tmp_path, create_db=True, should_reload=False)
+
+    async def send(msg):
+        pass
+
+    app.websockets["c1"] = send
+    writer = app._ws_writer("c1")
+    assert app._ws_writer("c1") is writer
+    assert app.stats()["websockets"]["c1"]["state"] == "ok"
+
+
+def test_disconnect_stops_writer(tmp_path):
+    import pageql.pageqlapp
+
+    app = pageql.pageqlapp.PageQLApp(":memory:", tmp_path, create_db=True, should_reload=False)
+    sent = []
+    messages = [{"type": "websocket.disconnect"}]
+
+    async def send(msg):
+        sent.append(msg)
+
+    async def receive():
+        await asyncio.sleep(0.01)
+        return messages.pop()
+
+    async def run():
+        scope = {"type": "websocket", "path": "/reload-request-ws", "query_string": b"clientId=c1"}
+        task = asyncio.create_task(app._handle_reload_websocket(scope, receive, send))
+        await asyncio.sleep(0)
+        writer = app.ws_writers["c1"]
+        await task
+        writer.put("late()")
+        await asyncio.sleep(0.01)
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.state == "closed" and "c1" not in app.ws_writers
+    assert [m for m in sent if m["type"] == "websocket.send"] == []